@@ -121,7 +121,7 @@ def _prepare_structure(network_function_details, ports_info,
 def get_network_function_details(context, network_function_id):
     network_function_details = None
     try:
-        rpc_nso_client = transport.RPCClient(a_topics.NFP_NSO_TOPIC)
+        rpc_nso_client = transport.RPCClient.get(a_topics.NFP_NSO_TOPIC)
         network_function_details = rpc_nso_client.cctxt.call(
             context,
             'get_network_function_details',
@@ -138,7 +138,7 @@ def get_network_function_details(context, network_function_id):
 def get_network_function_map(context, network_function_id):
     request_data = None
     try:
-        rpc_nso_client = transport.RPCClient(a_topics.NFP_NSO_TOPIC)
+        rpc_nso_client = transport.RPCClient.get(a_topics.NFP_NSO_TOPIC)
         nf_context = rpc_nso_client.cctxt.call(
             context,
             'get_network_function_context',
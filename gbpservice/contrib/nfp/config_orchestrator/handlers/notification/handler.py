@@ -87,7 +87,7 @@ class FirewallNotifier(object):
         LOG.info(msg)
 
         # RPC call to plugin to set firewall status
-        rpcClient = transport.RPCClient(a_topics.FW_NFP_PLUGIN_TOPIC)
+        rpcClient = transport.RPCClient.get(a_topics.FW_NFP_PLUGIN_TOPIC)
         rpcClient.cctxt.cast(context, 'set_firewall_status',
                              host=resource_data['host'],
                              firewall_id=firewall_id,
@@ -111,7 +111,7 @@ class FirewallNotifier(object):
         LOG.info(msg)
 
         # RPC call to plugin to update firewall deleted
-        rpcClient = transport.RPCClient(a_topics.FW_NFP_PLUGIN_TOPIC)
+        rpcClient = transport.RPCClient.get(a_topics.FW_NFP_PLUGIN_TOPIC)
         rpcClient.cctxt.cast(context, 'firewall_deleted',
                              host=resource_data['host'],
                              firewall_id=firewall_id)
@@ -144,13 +144,13 @@ class LoadbalancerNotifier(object):
         nfp_logging.clear_logging_context()
 
         # RPC call to plugin to update status of the resource
-        rpcClient = transport.RPCClient(a_topics.LB_NFP_PLUGIN_TOPIC)
-        rpcClient.cctxt = rpcClient.client.prepare(
+        rpcClient = transport.RPCClient.get(a_topics.LB_NFP_PLUGIN_TOPIC)
+        cctxt = rpcClient.client.prepare(
             version=const.LOADBALANCER_RPC_API_VERSION)
-        rpcClient.cctxt.cast(context, 'update_status',
-                             obj_type=obj_type,
-                             obj_id=obj_id,
-                             status=status)
+        cctxt.cast(context, 'update_status',
+                   obj_type=obj_type,
+                   obj_id=obj_id,
+                   status=status)
 
     def update_pool_stats(self, context, notification_data):
         notification = notification_data['notification'][0]
@@ -171,13 +171,13 @@ class LoadbalancerNotifier(object):
         LOG.info(msg)
 
         # RPC cast to plugin to update stats of pool
-        rpcClient = transport.RPCClient(a_topics.LB_NFP_PLUGIN_TOPIC)
-        rpcClient.cctxt = rpcClient.client.prepare(
+        rpcClient = transport.RPCClient.get(a_topics.LB_NFP_PLUGIN_TOPIC)
+        cctxt = rpcClient.client.prepare(
             version=const.LOADBALANCER_RPC_API_VERSION)
-        rpcClient.cctxt.cast(context, 'update_pool_stats',
-                             pool_id=pool_id,
-                             stats=stats,
-                             host=host)
+        cctxt.cast(context, 'update_pool_stats',
+                   pool_id=pool_id,
+                   stats=stats,
+                   host=host)
         nfp_logging.clear_logging_context()
 
     def vip_deleted(self, context, notification_data):
@@ -202,8 +202,8 @@ class LoadbalancerV2Notifier(object):
         obj_type = resource_data['obj_type']
         obj_id = resource_data['obj_id']
 
-        rpcClient = transport.RPCClient(a_topics.LBV2_NFP_PLUGIN_TOPIC)
-        rpcClient.cctxt = rpcClient.client.prepare(
+        rpcClient = transport.RPCClient.get(a_topics.LBV2_NFP_PLUGIN_TOPIC)
+        cctxt = rpcClient.client.prepare(
             version=const.LOADBALANCERV2_RPC_API_VERSION)
 
         lb_p_status = const.ACTIVE
@@ -220,22 +220,22 @@ class LoadbalancerV2Notifier(object):
                 obj_o_status = None
 
         if obj_type != 'loadbalancer':
-            rpcClient.cctxt.cast(context, 'update_status',
-                                 obj_type=obj_type,
-                                 obj_id=obj_id,
-                                 provisioning_status=obj_p_status,
-                                 operating_status=obj_o_status)
+            cctxt.cast(context, 'update_status',
+                       obj_type=obj_type,
+                       obj_id=obj_id,
+                       provisioning_status=obj_p_status,
+                       operating_status=obj_o_status)
         else:
             lb_o_status = lbv2_const.ONLINE
             if obj_p_status == const.ERROR:
                 lb_p_status = const.ERROR
                 lb_o_status = lbv2_const.OFFLINE
 
-        rpcClient.cctxt.cast(context, 'update_status',
-                             obj_type='loadbalancer',
-                             obj_id=resource_data['root_lb_id'],
-                             provisioning_status=lb_p_status,
-                             operating_status=lb_o_status)
+        cctxt.cast(context, 'update_status',
+                   obj_type='loadbalancer',
+                   obj_id=resource_data['root_lb_id'],
+                   provisioning_status=lb_p_status,
+                   operating_status=lb_o_status)
         nfp_logging.clear_logging_context()
 
     # TODO(jiahao): implememnt later
@@ -262,7 +262,7 @@ class VpnNotifier(object):
                "making an update_status RPC cast to plugin for object"
                "with status %s" % (status))
         LOG.info(msg)
-        rpcClient = transport.RPCClient(a_topics.VPN_NFP_PLUGIN_TOPIC)
+        rpcClient = transport.RPCClient.get(a_topics.VPN_NFP_PLUGIN_TOPIC)
         rpcClient.cctxt.cast(context, 'update_status',
                              status=status)
         nfp_logging.clear_logging_context()
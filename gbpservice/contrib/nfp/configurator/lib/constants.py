@@ -24,6 +24,8 @@ EVENT_PROCESS_BATCH = 'PROCESS_BATCH'
 NFD_NOTIFICATION = 'network_function_device_notification'
 RABBITMQ_HOST = '127.0.0.1'  # send notifications to 'RABBITMQ_HOST'
 NOTIFICATION_QUEUE = 'configurator-notifications'
+# Max num of notifications returned by one get_notifications call
+MAX_NOTIFICATIONS = 1000
 FIREWALL = 'firewall'
 VPN = 'vpn'
 LOADBALANCER = 'loadbalancer'
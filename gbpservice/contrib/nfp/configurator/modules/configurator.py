@@ -301,7 +301,8 @@ class ConfiguratorRpcManager(object):
 
         """
 
-        events = self.sc.get_stashed_events()
+        events = self.sc.get_stashed_events(
+            max_events=const.MAX_NOTIFICATIONS)
         notifications = []
         for event in events:
             notification = event.data
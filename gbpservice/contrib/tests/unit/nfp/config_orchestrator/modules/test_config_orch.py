@@ -819,6 +819,20 @@ class LoadbalancerNotifierTestCase(base.BaseTestCase):
         self.n_handler.handle_notification(self.context,
                                            notification_data)
 
+    def test_update_status_keeps_shared_client_context(self):
+        notification_data = self.get_notification_data()
+        rpc_client = mock.Mock()
+        cctxt = rpc_client.cctxt
+        with mock.patch.object(transport, 'RPCClient') as rpc_client_class:
+            rpc_client_class.get.return_value = rpc_client
+            self.n_handler.handle_notification(self.context,
+                                               notification_data)
+        # The client is shared by the topic users, its context is left as is
+        self.assertIs(cctxt, rpc_client.cctxt)
+        rpc_client.client.prepare.return_value.cast.assert_called_once_with(
+            self.context, 'update_status', obj_type='lb', obj_id='123',
+            status='set_firewall_status')
+
 
 class VpnNotifierTestCase(base.BaseTestCase):
 
@@ -107,6 +107,23 @@ class ControllerTestCase(base.BaseTestCase, rest.RestController):
             'create_network_function_config', self.data)
         self.assertEqual(response.status_code, 200)
 
+    def test_post_uncompressed_network_function_config(self):
+        """Tests HTTP post request with a plain json body.
+
+        Returns: none
+
+        """
+
+        with mock.patch.object(
+                controller.RPCClient, 'cast') as rpc_mock:
+            response = self.app.post(
+                '/v1/nfp/create_network_function_config',
+                jsonutils.dumps(self.data),
+                content_type='application/json')
+        rpc_mock.assert_called_with(
+            'create_network_function_config', self.data)
+        self.assertEqual(response.status_code, 200)
+
     def test_post_delete_network_function_device_config(self):
         """Tests HTTP post request delete_network_function_device_config.
 
@@ -11,11 +11,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+
+from neutron._i18n import _
 from neutron._i18n import _LE
 from neutron._i18n import _LW
 from neutron.api.rpc.agentnotifiers import dhcp_rpc_agent_api
+from neutron.callbacks import events
+from neutron.callbacks import exceptions as callbacks_exc
+from neutron.callbacks import registry
+from neutron.callbacks import resources
 from neutron.common import constants as const
 from neutron.common import exceptions as n_exc
+from neutron.db import securitygroups_db
+from neutron.db import securitygroups_rpc_base as sg_rpc_base
 from neutron.extensions import l3
 from neutron.extensions import securitygroup as ext_sg
 from neutron import manager
@@ -80,6 +89,12 @@ def discard_notifications_after_rollback(transaction_key):
     NOTIFICATION_QUEUE.pop(transaction_key, None)
 
 
+def _plural(resource):
+    if resource.endswith('y'):
+        return resource[:-1] + 'ies'
+    return resource + 's'
+
+
 class dummy_context_mgr(object):
 
     def __enter__(self):
@@ -181,24 +196,76 @@ class LocalAPI(object):
                 # explicit resource creation request, and hence the above
                 # method will be invoked in the API layer.
             if do_notify:
-                if BATCH_NOTIFICATIONS and not clean_session:
-                    outer_transaction = (_get_outer_transaction(
-                        context._session.transaction))
-                else:
-                    outer_transaction = None
-                args = [action, {}, {resource: obj}]
-                send_or_queue_notification(
-                    outer_transaction, self._nova_notifier,
-                    'send_network_change', args)
                 # REVISIT(rkukura): Do create.end notification?
-                if cfg.CONF.dhcp_agent_notification:
-                    args = [context, {resource: obj},
-                            resource + '.create.end']
-                    send_or_queue_notification(
-                        outer_transaction, self._dhcp_agent_notifier,
-                        'notify', args)
+                self._send_notifications(context, resource, action, [obj],
+                                         'create', clean_session)
         return obj
 
+    def _send_notifications(self, context, resource, action, objs, event,
+                            clean_session):
+        """Send or queue the nova & DHCP notifications for objs.
+
+        Queued till the outer transaction commits when notifications
+        are batched and the caller is in a transaction.
+        """
+        if BATCH_NOTIFICATIONS and not clean_session:
+            outer_transaction = (_get_outer_transaction(
+                context._session.transaction))
+        else:
+            outer_transaction = None
+        for obj in objs:
+            args = [action, {}, {resource: obj}]
+            send_or_queue_notification(
+                outer_transaction, self._nova_notifier,
+                'send_network_change', args)
+            if cfg.CONF.dhcp_agent_notification:
+                args = [context, {resource: obj},
+                        resource + '.' + event + '.end']
+                send_or_queue_notification(
+                    outer_transaction, self._dhcp_agent_notifier,
+                    'notify', args)
+
+    def _create_resources_bulk(self, plugin, context, resource, attrs_list,
+                               do_notify=True, clean_session=True):
+        """Create many resources of a type, with one quota reservation.
+
+        The plugin's native bulk create is used when it has one.
+        """
+        if not attrs_list:
+            return []
+        with utils.clean_session(context.session) if clean_session else (
+            dummy_context_mgr()):
+            reservation = None
+            if plugin in [self._group_policy_plugin,
+                    self._servicechain_plugin]:
+                reservation = quota.QUOTAS.make_reservation(
+                        context, context.tenant_id,
+                        {resource: len(attrs_list)}, plugin)
+            action = 'create_' + resource
+            bulk_creator = getattr(plugin, action + '_bulk', None)
+            try:
+                if bulk_creator:
+                    objs = bulk_creator(
+                        context, {_plural(resource): [
+                            {resource: attrs} for attrs in attrs_list]})
+                else:
+                    obj_creator = getattr(plugin, action)
+                    objs = [obj_creator(context, {resource: attrs})
+                            for attrs in attrs_list]
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    if reservation:
+                        quota.QUOTAS.cancel_reservation(
+                                context, reservation.reservation_id)
+            if reservation:
+                # See _create_resource about the dirty quota resources
+                quota.QUOTAS.commit_reservation(
+                        context, reservation.reservation_id)
+            if do_notify:
+                self._send_notifications(context, resource, action, objs,
+                                         'create', clean_session)
+        return objs
+
     def _update_resource(self, plugin, context, resource, resource_id, attrs,
                          do_notify=True, clean_session=True):
         # REVISIT(rkukura): Do update.start notification?
@@ -240,6 +307,42 @@ class LocalAPI(object):
                                                      {resource: obj},
                                                      resource + '.delete.end')
 
+    def _delete_resources_bulk(self, plugin, context, resource, objs=None,
+                               resource_ids=None, do_notify=True,
+                               clean_session=True, bulk_deleter=None):
+        """Delete many resources of a type.
+
+        objs are the resources already held by the caller, only the
+        resource_ids are fetched first, all with one query. Resources
+        already deleted are skipped. bulk_deleter, when given, deletes
+        all the objs at once and returns those deleted, otherwise they
+        are deleted one by one by the plugin.
+        """
+        objs = list(objs or [])
+        with utils.clean_session(context.session) if clean_session else (
+            dummy_context_mgr()):
+            if resource_ids:
+                obj_getter = getattr(plugin, 'get_' + _plural(resource))
+                objs.extend(obj_getter(context,
+                                       {'id': list(resource_ids)}))
+            action = 'delete_' + resource
+            if bulk_deleter:
+                deleted = bulk_deleter(context, objs) if objs else []
+            else:
+                obj_deleter = getattr(plugin, action)
+                deleted = []
+                for obj in objs:
+                    try:
+                        obj_deleter(context, obj['id'])
+                        deleted.append(obj)
+                    except n_exc.NotFound:
+                        LOG.warning(
+                            _LW('%(resource)s %(id)s already deleted'),
+                            {'resource': resource, 'id': obj['id']})
+            if do_notify:
+                self._send_notifications(context, resource, action,
+                                         deleted, 'delete', clean_session)
+
     def _get_resource(self, plugin, context, resource, resource_id,
                       clean_session=True):
         with utils.clean_session(context.session) if clean_session else (
@@ -276,6 +379,12 @@ class LocalAPI(object):
         return self._create_resource(self._core_plugin, plugin_context, 'port',
                                      attrs, clean_session=clean_session)
 
+    def _create_ports_bulk(self, plugin_context, attrs_list,
+                           clean_session=True):
+        return self._create_resources_bulk(self._core_plugin, plugin_context,
+                                           'port', attrs_list,
+                                           clean_session=clean_session)
+
     def _update_port(self, plugin_context, port_id, attrs, clean_session=True):
         return self._update_resource(self._core_plugin, plugin_context, 'port',
                                      port_id, attrs,
@@ -289,6 +398,12 @@ class LocalAPI(object):
         except n_exc.PortNotFound:
             LOG.warning(_LW('Port %s already deleted'), port_id)
 
+    def _delete_ports_bulk(self, plugin_context, ports=None, port_ids=None,
+                           clean_session=True):
+        self._delete_resources_bulk(self._core_plugin, plugin_context,
+                                    'port', objs=ports, resource_ids=port_ids,
+                                    clean_session=clean_session)
+
     def _get_subnet(self, plugin_context, subnet_id, clean_session=True):
         return self._get_resource(self._core_plugin, plugin_context, 'subnet',
                                   subnet_id, clean_session=clean_session)
@@ -463,6 +578,69 @@ class LocalAPI(object):
             LOG.warning(_LW('Security Group already exists %s'), ex.message)
             return
 
+    def _create_sg_rules_bulk(self, plugin_context, attrs_list,
+                              clean_session=True):
+        # Security group rules are neither of interest to nova nor to the
+        # DHCP agent, hence no notifications are sent. The native bulk
+        # create only accepts rules of a single security group per call.
+        sg_rules = collections.OrderedDict()
+        for attrs in attrs_list:
+            sg_rules.setdefault(attrs['security_group_id'], []).append(attrs)
+        created = []
+        for sg_attrs_list in sg_rules.values():
+            try:
+                created.extend(self._create_resources_bulk(
+                    self._core_plugin, plugin_context, 'security_group_rule',
+                    sg_attrs_list, do_notify=False,
+                    clean_session=clean_session))
+            except ext_sg.SecurityGroupRuleExists:
+                # Some rule was created meanwhile, go one by one
+                for attrs in sg_attrs_list:
+                    obj = self._create_sg_rule(plugin_context, attrs,
+                                               clean_session=clean_session)
+                    if obj:
+                        created.append(obj)
+        return created
+
+    def _delete_sg_rules_in_db(self, plugin_context, sg_rules):
+        # Same as the core plugin deleting each rule, with a single DELETE
+        # statement and agent notification for all of them
+        plugin = self._core_plugin
+        for sg_rule in sg_rules:
+            try:
+                registry.notify(
+                    resources.SECURITY_GROUP_RULE, events.BEFORE_DELETE,
+                    plugin, context=plugin_context,
+                    security_group_rule_id=sg_rule['id'])
+            except callbacks_exc.CallbackFailure as e:
+                raise ext_sg.SecurityGroupRuleInUse(
+                    id=sg_rule['id'], reason=_('cannot be deleted due to '
+                                               '%s') % e)
+        with plugin_context.session.begin(subtransactions=True):
+            plugin_context.session.query(
+                securitygroups_db.SecurityGroupRule).filter(
+                    securitygroups_db.SecurityGroupRule.id.in_(
+                        [sg_rule['id'] for sg_rule in sg_rules])).delete(
+                            synchronize_session=False)
+        for sg_rule in sg_rules:
+            registry.notify(
+                resources.SECURITY_GROUP_RULE, events.AFTER_DELETE, plugin,
+                context=plugin_context, security_group_rule_id=sg_rule['id'])
+        if isinstance(plugin, sg_rpc_base.SecurityGroupServerRpcMixin):
+            plugin.notifier.security_groups_rule_updated(
+                plugin_context,
+                list(set(sg_rule['security_group_id']
+                         for sg_rule in sg_rules)))
+        return sg_rules
+
+    def _delete_sg_rules_bulk(self, plugin_context, sg_rule_ids,
+                              clean_session=True):
+        self._delete_resources_bulk(
+            self._core_plugin, plugin_context, 'security_group_rule',
+            resource_ids=sg_rule_ids, do_notify=False,
+            clean_session=clean_session,
+            bulk_deleter=self._delete_sg_rules_in_db)
+
     def _update_sg_rule(self, plugin_context, sg_rule_id, attrs,
                         clean_session=True):
         return self._update_resource(self._core_plugin, plugin_context,
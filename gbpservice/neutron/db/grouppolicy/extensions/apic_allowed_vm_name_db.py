@@ -30,6 +30,13 @@ class ApicAllowedVMNameDBMixin(object):
                 l3_policy_id=l3_policy_id).all())
         return rows
 
+    def get_l3_policies_allowed_vm_names(self, session, l3_policy_ids):
+        if not l3_policy_ids:
+            return []
+        rows = (session.query(ApicAllowedVMNameDB).filter(
+                ApicAllowedVMNameDB.l3_policy_id.in_(l3_policy_ids)).all())
+        return rows
+
     def get_l3_policy_allowed_vm_name(self, session, l3_policy_id,
                                       allowed_vm_name):
         row = (session.query(ApicAllowedVMNameDB).filter_by(
@@ -30,6 +30,13 @@ class ApicReuseBdDBMixin(object):
                l2_policy_id=l2_policy_id).first())
         return row
 
+    def get_reuse_bd_l2policies(self, session, l2_policy_ids):
+        if not l2_policy_ids:
+            return []
+        rows = (session.query(ApicReuseBdDB).filter(
+                ApicReuseBdDB.l2_policy_id.in_(l2_policy_ids)).all())
+        return rows
+
     def add_reuse_bd_l2policy(self, session, l2_policy_id,
                               target_l2_policy_id):
         with session.begin(subtransactions=True):
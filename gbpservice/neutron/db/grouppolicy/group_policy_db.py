@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 import netaddr
 from neutron.api.v2 import attributes as attr
 from neutron import context
@@ -365,6 +367,19 @@ class ExternalPolicy(model_base.BASEV2, BaseSharedGbpResource):
         backref='consuming_external_policies',
         cascade='all, delete-orphan')
 
+RESOURCE_MODELS = {'policy_target': PolicyTarget,
+                   'policy_target_group': PolicyTargetGroup,
+                   'l2_policy': L2Policy,
+                   'l3_policy': L3Policy,
+                   'network_service_policy': NetworkServicePolicy,
+                   'policy_classifier': PolicyClassifier,
+                   'policy_action': PolicyAction,
+                   'policy_rule': PolicyRule,
+                   'policy_rule_set': PolicyRuleSet,
+                   'external_segment': ExternalSegment,
+                   'external_policy': ExternalPolicy,
+                   'nat_pool': NATPool}
+
 
 class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
                           common_db_mixin.CommonDbMixin):
@@ -470,6 +485,37 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
             context, NATPool, nat_pool_id,
             gpolicy.NATPoolNotFound)
 
+    def _update_resources_status(self, context, resource_name, resources):
+        """Persist the status of many resources of the same type.
+
+        Resources sharing the same status are updated by a single
+        statement, all of them within one transaction.
+        """
+        model = RESOURCE_MODELS[resource_name]
+        statuses = collections.defaultdict(list)
+        for resource in resources:
+            statuses[(resource['status'],
+                      resource['status_details'])].append(resource['id'])
+        session = context.session
+        with session.begin(subtransactions=True):
+            for (status, status_details), ids in statuses.items():
+                session.query(model).filter(model.id.in_(ids)).update(
+                    {'status': status, 'status_details': status_details},
+                    synchronize_session='fetch')
+
+    def _get_child_policy_rule_set_ids(self, context, policy_rule_set_ids):
+        """Map each of the given policy rule sets to its children ids."""
+        child_prs_ids = dict((prs_id, []) for prs_id in policy_rule_set_ids)
+        if not policy_rule_set_ids:
+            return child_prs_ids
+        with context.session.begin(subtransactions=True):
+            query = context.session.query(PolicyRuleSet.id,
+                                          PolicyRuleSet.parent_id).filter(
+                PolicyRuleSet.parent_id.in_(policy_rule_set_ids))
+            for child_id, parent_id in query:
+                child_prs_ids[parent_id].append(child_id)
+        return child_prs_ids
+
     @staticmethod
     def _get_min_max_ports_from_range(port_range):
         if not port_range:
@@ -871,14 +917,15 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
                                    pr['policy_rule_sets']]
         return self._fields(res, fields)
 
-    def _make_policy_rule_set_dict(self, prs, fields=None):
+    def _make_policy_rule_set_dict(self, prs, fields=None,
+                                   child_prs_ids=None):
         res = self._populate_common_fields_in_dict(prs)
-        if prs['parent']:
-            res['parent_id'] = prs['parent']['id']
-        else:
-            res['parent_id'] = None
+        res['parent_id'] = prs['parent_id']
         ctx = context.get_admin_context()
-        if 'child_policy_rule_sets' in prs:
+        if child_prs_ids is not None:
+            # They have been loaded for the whole collection
+            res['child_policy_rule_sets'] = child_prs_ids
+        elif 'child_policy_rule_sets' in prs:
             # They have been updated
             res['child_policy_rule_sets'] = [
                 child_prs['id'] for child_prs in prs['child_policy_rule_sets']]
@@ -1077,6 +1124,17 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
             pt_db = self._get_policy_target(context, policy_target_id)
             context.session.delete(pt_db)
 
+    def _delete_policy_targets(self, context, policy_target_ids):
+        """Delete many policy targets with a single statement."""
+        with context.session.begin(subtransactions=True):
+            context.session.flush()
+            context.session.query(PolicyTarget).filter(
+                PolicyTarget.id.in_(policy_target_ids)).delete(
+                    synchronize_session=False)
+            # Policy targets loaded in the session, and the groups holding
+            # them, are stale
+            context.session.expire_all()
+
     @log.log_method_call
     def get_policy_target(self, context, policy_target_id, fields=None):
         pt = self._get_policy_target(context, policy_target_id)
@@ -1635,12 +1693,19 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
                              page_reverse=False):
         marker_obj = self._get_marker_obj(context, 'policy_rule_set', limit,
                                           marker)
-        return self._get_collection(context, PolicyRuleSet,
-                                    self._make_policy_rule_set_dict,
-                                    filters=filters, fields=fields,
-                                    sorts=sorts, limit=limit,
-                                    marker_obj=marker_obj,
-                                    page_reverse=page_reverse)
+        query = self._get_collection_query(context, PolicyRuleSet,
+                                           filters=filters, sorts=sorts,
+                                           limit=limit, marker_obj=marker_obj,
+                                           page_reverse=page_reverse)
+        prs_dbs = query.all()
+        child_prs_ids = self._get_child_policy_rule_set_ids(
+            context, [prs_db['id'] for prs_db in prs_dbs])
+        items = [self._make_policy_rule_set_dict(
+            prs_db, fields, child_prs_ids=child_prs_ids[prs_db['id']])
+            for prs_db in prs_dbs]
+        if limit and page_reverse:
+            items.reverse()
+        return items
 
     @log.log_method_call
     def get_policy_rule_sets_count(self, context, filters=None):
@@ -46,6 +46,8 @@ from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
     apic_mapping as amap)
 from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
     apic_mapping_lib as alib)
+from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
+    nova_client as nclient)
 from gbpservice.neutron.services.grouppolicy import plugin as gbp_plugin
 
 
@@ -82,6 +84,14 @@ opts = [
                 help=_("Automatically create a PTG when a L2 Policy "
                        "gets created. This is currently an aim_mapping "
                        "policy driver specific feature.")),
+    cfg.IntOpt('vm_name_cache_ttl',
+               default=300,
+               help=_("Number of seconds a Nova VM name is cached for "
+                      "the get_gbp_details RPC.")),
+    cfg.IntOpt('vm_name_cache_size',
+               default=10000,
+               help=_("Maximum number of Nova VM names cached for the "
+                      "get_gbp_details RPC.")),
 ]
 
 cfg.CONF.register_opts(opts, "aim_mapping")
@@ -130,6 +140,9 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
         self._apic_aim_mech_driver = None
         self._apic_segmentation_label_driver = None
         self.create_auto_ptg = cfg.CONF.aim_mapping.create_auto_ptg
+        self.vm_name_cache = nclient.ServerNameCache(
+            ttl=cfg.CONF.aim_mapping.vm_name_cache_ttl,
+            max_size=cfg.CONF.aim_mapping.vm_name_cache_size)
         if self.create_auto_ptg:
             LOG.info(_LI('Auto PTG creation configuration set, '
                          'this will result in automatic creation of a PTG '
@@ -1450,8 +1463,32 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
             session = context._plugin_context.session
         return aim_context.AimContext(session)
 
-    def _is_port_promiscuous(self, plugin_context, port):
-        pt = self._port_id_to_pt(plugin_context, port['id'])
+    def _port_id_to_ptg_cached(self, plugin_context, port_id, cache):
+        if 'gbp_map_ptg' not in cache:
+            cache['gbp_map_ptg'] = self._port_id_to_ptg(plugin_context,
+                                                        port_id)
+        return cache['gbp_map_ptg']
+
+    def _prefetch_port_details(self, plugin_context, ports, caches):
+        # The policy targets of all the ports, and their groups, are
+        # retrieved at once
+        pts = self.gbp_plugin.get_policy_targets(
+            plugin_context, {'port_id': [port['id'] for port in ports]})
+        ptg_ids = set(pt['policy_target_group_id'] for pt in pts)
+        ptgs = {}
+        if ptg_ids:
+            ptgs = dict((ptg['id'], ptg) for ptg in
+                        self.gbp_plugin.get_policy_target_groups(
+                            plugin_context, {'id': list(ptg_ids)}))
+        for port in ports:
+            caches[port['id']]['gbp_map_ptg'] = (None, None)
+        for pt in pts:
+            caches[pt['port_id']]['gbp_map_ptg'] = (
+                ptgs.get(pt['policy_target_group_id']), pt)
+
+    def _is_port_promiscuous(self, plugin_context, port, details):
+        pt = self._port_id_to_ptg_cached(plugin_context, port['id'],
+                                         details['_cache'])[1]
         if (pt and pt.get('cluster_id') and
                 pt.get('cluster_id') != pt['id']):
             master = self._get_policy_target(plugin_context, pt['cluster_id'])
@@ -1467,8 +1504,9 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
     def _is_metadata_optimized(self, plugin_context, port):
         return self.aim_mech_driver.enable_metadata_opt
 
-    def _get_port_epg(self, plugin_context, port):
-        ptg, pt = self._port_id_to_ptg(plugin_context, port['id'])
+    def _get_port_epg(self, plugin_context, port, details):
+        ptg, pt = self._port_id_to_ptg_cached(plugin_context, port['id'],
+                                              details['_cache'])
         if ptg:
             return self._get_aim_endpoint_group(plugin_context.session, ptg)
         else:
@@ -1539,7 +1577,8 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
         return subnets
 
     def _get_aap_details(self, plugin_context, port, details):
-        pt = self._port_id_to_pt(plugin_context, port['id'])
+        pt = self._port_id_to_ptg_cached(plugin_context, port['id'],
+                                         details['_cache'])[1]
         aaps = port['allowed_address_pairs']
         if pt:
             # Set the correct address ownership for this port
@@ -1612,7 +1651,8 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
         return subnets
 
     def _get_segmentation_labels(self, plugin_context, port, details):
-        pt = self._port_id_to_pt(plugin_context, port['id'])
+        pt = self._port_id_to_ptg_cached(plugin_context, port['id'],
+                                         details['_cache'])[1]
         if self.apic_segmentation_label_driver and pt and (
             'segmentation_labels' in pt):
             return pt['segmentation_labels']
@@ -14,15 +14,14 @@ from apic_ml2.neutron.db import port_ha_ipaddress_binding as ha_ip_db
 
 from neutron._i18n import _LE
 from neutron._i18n import _LW
+from neutron.common import constants as n_constants
 from neutron.common import rpc as n_rpc
 from neutron.common import topics
+from neutron.extensions import portbindings
 from neutron.plugins.ml2 import rpc as ml2_rpc
 from opflexagent import rpc as o_rpc
 from oslo_log import log
 
-from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
-    nova_client as nclient)
-
 LOG = log.getLogger(__name__)
 
 
@@ -86,72 +85,145 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
             LOG.exception(e)
             return None
 
+    def get_gbp_details_list(self, context, **kwargs):
+        LOG.debug("APIC AIM MD handling get_gbp_details_list for: %s",
+                  kwargs)
+        requests = [{'device': device,
+                     'host': kwargs.get('host'),
+                     'agent_id': kwargs.get('agent_id')}
+                    for device in kwargs.get('devices', [])]
+        return self._get_gbp_details_list(context, requests)
+
+    def request_endpoint_details_list(self, context, **kwargs):
+        LOG.debug("APIC AIM handling get_endpoint_details_list for: %s",
+                  kwargs)
+        requests = kwargs.get('requests', [])
+        gbp_details = self._get_gbp_details_list(context, requests)
+        result = []
+        for request, details in zip(requests, gbp_details):
+            try:
+                result.append(
+                    {'device': request['device'],
+                     'timestamp': request['timestamp'],
+                     'request_id': request['request_id'],
+                     'gbp_details': details,
+                     'neutron_details': ml2_rpc.RpcCallbacks(
+                         None, None).get_device_details(context, **request)})
+            except Exception as e:
+                LOG.error(_LE("An exception has occurred while requesting "
+                              "device gbp details for %s"),
+                          request.get('device'))
+                LOG.exception(e)
+        return result
+
+    def _get_gbp_details_list(self, context, requests):
+        """Return the GBP details of each request, in the same order.
+
+        The ports of all the requests, along with their bindings, are
+        retrieved at once, and the child class prefetches whatever else
+        it needs for all of them (eg. policy targets and groups). Ports
+        not found by their ID, or that still need to be bound, go
+        through the same path as get_gbp_details.
+        """
+        core_plugin = self._core_plugin
+        port_ids = [core_plugin._device_to_port_id(context,
+                                                   request.get('device'))
+                    for request in requests]
+        # The port bindings are eagerly loaded along with the ports
+        ports = dict((port['id'], port) for port in core_plugin.get_ports(
+            context, filters={'id': list(set(port_ids))}))
+        caches = dict((port_id, {}) for port_id in ports)
+        if ports:
+            self._prefetch_port_details(context, ports.values(), caches)
+        result = []
+        for request, port_id in zip(requests, port_ids):
+            device = request.get('device')
+            try:
+                result.append(self._get_port_gbp_details(
+                    context, request, port_id, port=ports.get(port_id),
+                    cache=caches.get(port_id)))
+            except Exception as e:
+                LOG.error(_LE("An exception has occurred while retrieving "
+                              "device gbp details for %s"), device)
+                LOG.exception(e)
+                result.append({'device': device})
+        return result
+
     # Things you need in order to run this Mixin:
     # - self._core_plugin: attribute that points to the Neutron core plugin;
-    # - self._is_port_promiscuous(context, port): define whether or not
-    # a port should be put in promiscuous mode;
-    # - self._get_port_epg(context, port): returns the AIM EPG for the specific
-    # port
+    # - self._is_port_promiscuous(context, port, details): define whether or
+    # not a port should be put in promiscuous mode;
+    # - self._get_port_epg(context, port, details): returns the AIM EPG for the
+    # specific port
     # for both Neutron and GBP.
+    # - self._prefetch_port_details(context, ports, caches): fills the cache
+    # of each port of a bulk request, keyed by port ID, with what would
+    # otherwise be looked up port by port;
     # - self._is_dhcp_optimized(context, port);
     # - self._is_metadata_optimized(context, port);
     # - self._get_vrf_id(context, port, details): VRF identified for the port;
+    # - self.vm_name_cache: nova_client.ServerNameCache of the VM names.
     def _get_gbp_details(self, context, request):
+        port_id = self._core_plugin._device_to_port_id(
+            context, request.get('device'))
+        return self._get_port_gbp_details(context, request, port_id)
+
+    def _get_port_gbp_details(self, context, request, port_id, port=None,
+                              cache=None):
         # TODO(ivar): should this happen within a single transaction? what are
         # the concurrency risks?
-        device = request.get('device')
         host = request.get('host')
 
-        core_plugin = self._core_plugin
-        port_id = core_plugin._device_to_port_id(context, device)
-        port_context = core_plugin.get_bound_port_context(context, port_id,
-                                                          host)
-        if not port_context:
-            LOG.warning(_LW("Device %(device)s requested by agent "
-                            "%(agent_id)s not found in database"),
-                        {'device': port_id,
-                         'agent_id': request.get('agent_id')})
-            return {'device': request.get('device')}
-        port = port_context.current
+        if not port or self._port_needs_binding(port):
+            core_plugin = self._core_plugin
+            port_context = core_plugin.get_bound_port_context(context, port_id,
+                                                              host)
+            if not port_context:
+                LOG.warning(_LW("Device %(device)s requested by agent "
+                                "%(agent_id)s not found in database"),
+                            {'device': port_id,
+                             'agent_id': request.get('agent_id')})
+                return {'device': request.get('device')}
+            port = port_context.current
 
         # NOTE(ivar): removed the PROXY_PORT_PREFIX hack.
         # This was needed to support network services without hotplug.
 
-        epg = self._get_port_epg(context, port)
-
-        details = {'device': request.get('device'),
-                   'enable_dhcp_optimization': self._is_dhcp_optimized(
-                       context, port),
-                   'enable_metadata_optimization': self._is_metadata_optimized(
-                       context, port),
-                   'port_id': port_id,
-                   'mac_address': port['mac_address'],
-                   'app_profile_name': epg.app_profile_name,
-                   'tenant_id': port['tenant_id'],
-                   'host': host,
-                   # TODO(ivar): scope names, possibly through AIM or the name
-                   # mapper
-                   'ptg_tenant': epg.tenant_name,
-                   'endpoint_group_name': epg.name,
-                   'promiscuous_mode': self._is_port_promiscuous(context,
-                                                                 port),
-                   'extra_ips': [],
-                   'floating_ip': [],
-                   'ip_mapping': [],
-                   # Put per mac-address extra info
-                   'extra_details': {}}
-
-        # Set VM name if needed.
-        if port['device_owner'].startswith('compute:') and port['device_id']:
-            vm = nclient.NovaClient().get_server(port['device_id'])
-            details['vm-name'] = vm.name if vm else port['device_id']
-
         # NOTE(ivar): having these methods cleanly separated actually makes
         # things less efficient by requiring lots of calls duplication.
         # we could alleviate this by passing down a cache that stores commonly
         # requested objects (like EPGs). 'details' itself could be used for
         # such caching.
-        details['_cache'] = {}
+        details = {'_cache': cache if cache is not None else {}}
+        epg = self._get_port_epg(context, port, details)
+
+        details.update({
+            'device': request.get('device'),
+            'enable_dhcp_optimization': self._is_dhcp_optimized(context, port),
+            'enable_metadata_optimization': self._is_metadata_optimized(
+                context, port),
+            'port_id': port_id,
+            'mac_address': port['mac_address'],
+            'app_profile_name': epg.app_profile_name,
+            'tenant_id': port['tenant_id'],
+            'host': host,
+            # TODO(ivar): scope names, possibly through AIM or the name
+            # mapper
+            'ptg_tenant': epg.tenant_name,
+            'endpoint_group_name': epg.name,
+            'promiscuous_mode': self._is_port_promiscuous(context, port,
+                                                          details),
+            'extra_ips': [],
+            'floating_ip': [],
+            'ip_mapping': [],
+            # Put per mac-address extra info
+            'extra_details': {}})
+
+        # Set VM name if needed.
+        if port['device_owner'].startswith('compute:') and port['device_id']:
+            details['vm-name'] = self.vm_name_cache.get_server_name(
+                port['device_id'])
+
         details['l3_policy_id'] = self._get_vrf_id(context, port, details)
         self._add_subnet_details(context, port, details)
         self._add_allowed_address_pairs_details(context, port, details)
@@ -164,6 +236,14 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
         LOG.debug("Details for port %s : %s" % (port['id'], details))
         return details
 
+    def _port_needs_binding(self, port):
+        # Only bound ports can be described without the port context, DVR
+        # ports have a binding per host
+        return (port['device_owner'] == n_constants.DEVICE_OWNER_DVR_INTERFACE
+                or port[portbindings.VIF_TYPE] in (
+                    portbindings.VIF_TYPE_UNBOUND,
+                    portbindings.VIF_TYPE_BINDING_FAILED))
+
     def _get_owned_addresses(self, plugin_context, port_id):
         return set(self.ha_ip_handler.get_ha_ipaddresses_for_port(port_id))
 
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import time
+
 from keystoneauth1 import loading as ks_loading
 from neutron._i18n import _LW
 from neutron.notifiers import nova as n_nova
@@ -42,3 +45,41 @@ class NovaClient(object):
                         server_id)
         except Exception as e:
             LOG.exception(e)
+
+
+class ServerNameCache(object):
+    """Cache of Nova server ID to server name mappings.
+
+    Entries expire after ttl seconds, and the least recently used entries
+    are evicted once the cache holds more than max_size servers. The Nova
+    client is built once and reused for every lookup.
+    """
+
+    def __init__(self, ttl=300, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.server_names = collections.OrderedDict()
+        self.nclient = None
+
+    def get_server_name(self, server_id):
+        now = time.time()
+        entry = self.server_names.pop(server_id, None)
+        if entry and entry[1] > now:
+            # Re-insert to mark it as the most recently used
+            self.server_names[server_id] = entry
+            return entry[0]
+
+        if self.nclient is None:
+            self.nclient = NovaClient()
+        vm = self.nclient.get_server(server_id)
+        if not vm:
+            # Do not cache misses, the server might just be booting
+            return server_id
+
+        self.server_names[server_id] = (vm.name, now + self.ttl)
+        while len(self.server_names) > self.max_size:
+            self.server_names.popitem(last=False)
+        return vm.name
+
+    def clear(self):
+        self.server_names.clear()
@@ -83,3 +83,12 @@ class ApicAllowedVMNameExtensionDriver(api.ExtensionDriver,
             session, l3_policy_id=result['id'])
         allowed_vm_names = [r.allowed_vm_name for r in rows]
         result['allowed_vm_names'] = allowed_vm_names
+
+    def extend_l3_policy_dicts(self, session, results):
+        allowed_vm_names = dict((result['id'], []) for result in results)
+        rows = self.get_l3_policies_allowed_vm_names(
+            session, l3_policy_ids=list(allowed_vm_names))
+        for r in rows:
+            allowed_vm_names[r.l3_policy_id].append(r.allowed_vm_name)
+        for result in results:
+            result['allowed_vm_names'] = allowed_vm_names[result['id']]
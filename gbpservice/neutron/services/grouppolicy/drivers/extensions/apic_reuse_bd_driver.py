@@ -53,3 +53,12 @@ class ApicReuseBdExtensionDriver(api.ExtensionDriver,
         row = self.get_reuse_bd_l2policy(session, l2_policy_id=result['id'])
         if row:
             result['reuse_bd'] = row.target_l2_policy_id
+
+    def extend_l2_policy_dicts(self, session, results):
+        rows = self.get_reuse_bd_l2policies(
+            session, l2_policy_ids=[result['id'] for result in results])
+        targets = dict((row.l2_policy_id, row.target_l2_policy_id)
+                       for row in rows)
+        for result in results:
+            if result['id'] in targets:
+                result['reuse_bd'] = targets[result['id']]
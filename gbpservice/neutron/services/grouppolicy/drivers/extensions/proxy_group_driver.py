@@ -73,6 +73,10 @@ class ProxyGroupDriver(api.ExtensionDriver):
     def extend_policy_target_group_dict(self, session, result):
         pass
 
+    @api.default_extension_behavior(db.GroupProxyMapping)
+    def extend_policy_target_group_dicts(self, session, results):
+        pass
+
     @api.default_extension_behavior(db.ProxyGatewayMapping)
     def process_create_policy_target(self, session, data, result):
         self._validate_proxy_gateway(session, data, result)
@@ -85,6 +89,10 @@ class ProxyGroupDriver(api.ExtensionDriver):
     def extend_policy_target_dict(self, session, result):
         pass
 
+    @api.default_extension_behavior(db.ProxyGatewayMapping)
+    def extend_policy_target_dicts(self, session, results):
+        pass
+
     def _validate_proxy_gateway(self, session, data, result):
         data = data['policy_target']
         if data.get('proxy_gateway'):
@@ -116,3 +124,7 @@ class ProxyGroupDriver(api.ExtensionDriver):
     @api.default_extension_behavior(db.ProxyIPPoolMapping)
     def extend_l3_policy_dict(self, session, result):
         pass
+
+    @api.default_extension_behavior(db.ProxyIPPoolMapping)
+    def extend_l3_policy_dicts(self, session, results):
+        pass
@@ -95,9 +95,35 @@ class ImplicitPolicyBase(api.PolicyDriver, local_api.LocalAPI):
         self._default_proxy_subnet_prefix_length = (
             gpproxy.default_proxy_subnet_prefix_length)
         self._default_es_name = gpip.default_external_segment_name
+        # Default L3 policy ID by tenant, and IDs of the policies known to
+        # be owned, saving their lookup on every implicit create and cleanup
+        self._default_l3ps = {}
+        self._owned_l2ps = set()
+        self._owned_l3ps = set()
+
+    def _get_cached_default_l3_policy(self, context):
+        tenant_id = context.current['tenant_id']
+        l3p_id = self._default_l3ps.get(tenant_id)
+        if not l3p_id:
+            return
+        # The default L3 policy may have been deleted or renamed through
+        # another server, check it by ID rather than searching it again
+        try:
+            l3p_db = context._plugin._get_l3_policy(context._plugin_context,
+                                                    l3p_id)
+        except gbp_ext.L3PolicyNotFound:
+            l3p_db = None
+        if (l3p_db and l3p_db['tenant_id'] == tenant_id and
+                l3p_db['name'] == self._default_l3p_name):
+            return l3p_db
+        self._default_l3ps.pop(tenant_id, None)
 
     def _create_implicit_l3_policy(self, context, clean_session=True):
         tenant_id = context.current['tenant_id']
+        l3p = self._get_cached_default_l3_policy(context)
+        if l3p:
+            context.current['l3_policy_id'] = l3p['id']
+            return
         filter = {'tenant_id': [tenant_id],
                   'name': [self._default_l3p_name]}
         l3ps = self._get_l3_policies(context._plugin_context, filter,
@@ -142,6 +168,7 @@ class ImplicitPolicyBase(api.PolicyDriver, local_api.LocalAPI):
                                  "OverlappingIPPoolsinSameTenantNotAllowed "
                                  "during creation of default L3 policy for "
                                  "tenant %s"), tenant_id)
+        self._default_l3ps[tenant_id] = l3p['id']
         context.current['l3_policy_id'] = l3p['id']
 
     def _use_implicit_l3_policy(self, context):
@@ -176,23 +203,45 @@ class ImplicitPolicyBase(api.PolicyDriver, local_api.LocalAPI):
         with session.begin(subtransactions=True):
             owned = OwnedL2Policy(l2_policy_id=l2p_id)
             session.add(owned)
+        self._owned_l2ps.add(l2p_id)
 
     def _l2_policy_is_owned(self, session, l2p_id):
+        # Ownership is only recorded on creation, so once known it holds
+        # until the policy is deleted
+        if l2p_id in self._owned_l2ps:
+            return True
         with session.begin(subtransactions=True):
-            return (session.query(OwnedL2Policy).
-                    filter_by(l2_policy_id=l2p_id).
-                    first() is not None)
+            owned = (session.query(OwnedL2Policy).
+                     filter_by(l2_policy_id=l2p_id).
+                     first() is not None)
+        if owned:
+            self._owned_l2ps.add(l2p_id)
+        return owned
 
     def _mark_l3_policy_owned(self, session, l3p_id):
         with session.begin(subtransactions=True):
             owned = OwnedL3Policy(l3_policy_id=l3p_id)
             session.add(owned)
+        self._owned_l3ps.add(l3p_id)
 
     def _l3_policy_is_owned(self, session, l3p_id):
+        if l3p_id in self._owned_l3ps:
+            return True
         with session.begin(subtransactions=True):
-            return (session.query(OwnedL3Policy).
-                    filter_by(l3_policy_id=l3p_id).
-                    first() is not None)
+            owned = (session.query(OwnedL3Policy).
+                     filter_by(l3_policy_id=l3p_id).
+                     first() is not None)
+        if owned:
+            self._owned_l3ps.add(l3p_id)
+        return owned
+
+    def _forget_l2_policy(self, l2p):
+        self._owned_l2ps.discard(l2p['id'])
+
+    def _forget_l3_policy(self, l3p):
+        self._owned_l3ps.discard(l3p['id'])
+        if self._default_l3ps.get(l3p['tenant_id']) == l3p['id']:
+            del self._default_l3ps[l3p['tenant_id']]
 
     def _cleanup_l3_policy(self, context, l3p_id, clean_session=True):
         if self._l3_policy_is_owned(context._plugin_context.session, l3p_id):
@@ -260,6 +309,7 @@ class ImplicitPolicyDriver(ImplicitPolicyBase):
 
     @log.log_method_call
     def delete_l2_policy_postcommit(self, context):
+        self._forget_l2_policy(context.current)
         l3p_id = context.current['l3_policy_id']
         self._cleanup_l3_policy(context, l3p_id)
 
@@ -306,6 +356,10 @@ class ImplicitPolicyDriver(ImplicitPolicyBase):
     def update_l3_policy_postcommit(self, context):
         pass
 
+    @log.log_method_call
+    def delete_l3_policy_postcommit(self, context):
+        self._forget_l3_policy(context.current)
+
     def _use_implicit_external_segment(self, context):
         if not self._default_es_name:
             return
@@ -125,6 +125,14 @@ class NetworkServicePolicyMappingMixin(object):
             return (session.query(PolicyTargetFloatingIPMapping).
                     filter_by(policy_target_id=policy_target_id).all())
 
+    def _get_pts_floating_ip_mapping(self, session, policy_target_ids):
+        if not policy_target_ids:
+            return []
+        with session.begin(subtransactions=True):
+            return (session.query(PolicyTargetFloatingIPMapping).filter(
+                PolicyTargetFloatingIPMapping.policy_target_id.in_(
+                    policy_target_ids)).all())
+
     def _delete_pt_floating_ip_mapping(self, session, policy_target_id):
         with session.begin(subtransactions=True):
             fip_mappings = session.query(
@@ -26,6 +26,10 @@ od_driver_opts = [
     cfg.StrOpt('odl_port',
                default='8080',
                help=_("OpenDaylight Controller Rest API port number")),
+    cfg.IntOpt('odl_endpoint_batch_size',
+               default=100,
+               help=_("Maximum number of endpoints unregistered from the "
+                      "OpenDaylight Controller in a single request")),
 ]
 
 
@@ -41,6 +41,29 @@ cfg.CONF.import_opt(
     'gbpservice.neutron.services.grouppolicy.drivers.odl.config',
     group='odl_driver'
 )
+cfg.CONF.import_opt(
+    'odl_endpoint_batch_size',
+    'gbpservice.neutron.services.grouppolicy.drivers.odl.config',
+    group='odl_driver'
+)
+
+# Policy objects of a tenant, by name of their list in the tenant tree:
+# key attribute, create or update method, delete method
+POLICY_OBJECTS = {
+    'action-instance': ('name', 'create_action', 'delete_action'),
+    'classifier-instance': ('name', 'create_classifier',
+                            'delete_classifier'),
+    'l3-context': ('id', 'create_update_l3_context', 'delete_l3_context'),
+    'l2-bridge-domain': ('id', 'create_update_l2_bridge_domain',
+                         'delete_l2_bridge_domain'),
+    'l2-flood-domain': ('id', 'create_update_l2_flood_domain',
+                        'delete_l2_flood_domain'),
+    'endpoint-group': ('id', 'create_update_endpoint_group',
+                       'delete_endpoint_group'),
+    'subnet': ('id', 'create_update_subnet', 'delete_subnet'),
+    'contract': ('id', 'create_update_contract', None),
+}
+SUBJECT_FEATURE_INSTANCES = ['action-instance', 'classifier-instance']
 
 
 class OdlManager(object):
@@ -70,6 +93,13 @@ class OdlManager(object):
             'Content-type': 'application/yang.data+json',
             'Accept': 'application/yang.data+json',
         }
+        self._ep_batch_size = cfg.CONF.odl_driver.odl_endpoint_batch_size
+        # Connections to the controller are kept alive and reused
+        # across requests
+        self._auth = auth.HTTPBasicAuth(self._username, self._password)
+        self._session = requests.Session()
+        # Tenants known to exist on the controller
+        self._tenants = set()
 
         self._base_url = (
             "http://%(host)s:%(port)s/restconf" %
@@ -145,24 +175,22 @@ class OdlManager(object):
                   {'method': method, 'url': url})
         LOG.debug("(%(data)s)", {'data': data})
         LOG.debug("=========================================================")
-        r = requests.request(
+        r = self._session.request(
             method,
             url=url,
             headers=headers,
             data=data,
-            auth=auth.HTTPBasicAuth(self._username,
-                                    self._password)
+            auth=self._auth
         )
         r.raise_for_status()
 
     def _is_tenant_created(self, tenant_id):
         url = self._convert2ascii(self._policy_url % {'tenant_id': tenant_id})
-        r = requests.request(
+        r = self._session.request(
             'get',
             url=url,
             headers=self._headers,
-            auth=auth.HTTPBasicAuth(self._username,
-                                    self._password)
+            auth=self._auth
         )
         if r.status_code == 200:
             return True
@@ -172,12 +200,24 @@ class OdlManager(object):
             r.raise_for_status()
 
     def register_endpoints(self, endpoints):
+        # The register RPC takes a single endpoint, the requests share the
+        # session connections
         for ep in endpoints:
             data = {"input": ep}
             self._sendjson('post', self._reg_ep_url, self._headers, data)
 
     def unregister_endpoints(self, endpoints):
-        for ep in endpoints:
+        # The unregister RPC takes lists of L2 and L3 endpoint keys, the
+        # endpoints are removed in batches
+        for index in range(0, len(endpoints), self._ep_batch_size):
+            batch = endpoints[index:index + self._ep_batch_size]
+            if len(batch) == 1:
+                ep = batch[0]
+            else:
+                ep = {"l2": [], "l3": []}
+                for key in ep:
+                    for batched in batch:
+                        ep[key].extend(batched.get(key) or [])
             data = {"input": ep}
             self._sendjson('post', self._unreg_ep_url, self._headers, data)
 
@@ -185,6 +225,38 @@ class OdlManager(object):
         url = (self._policy_url % {'tenant_id': tenant_id})
         data = {"tenant": tenant}
         self._sendjson('put', url, self._headers, data)
+        self._tenants.add(tenant_id)
+
+    def create_update_tenant_policy(self, tenant_id, policy):
+        """Create or update policy objects of a tenant
+
+        policy is a list of (kind, object) tuples, kind being the name of
+        the object list in the tenant tree. A tenant not existing yet is
+        created along with all its objects in a single request, the objects
+        of an existing tenant are updated one at a time not to replace the
+        others.
+        """
+        if len(policy) > 1 and tenant_id not in self._tenants:
+            if not self._is_tenant_created(tenant_id):
+                tenant = {
+                    "id": tenant_id
+                }
+                for kind, obj in policy:
+                    parent = tenant
+                    if kind in SUBJECT_FEATURE_INSTANCES:
+                        parent = tenant.setdefault(
+                            "subject-feature-instances", {})
+                    parent.setdefault(kind, []).append(obj)
+                self.create_update_tenant(tenant_id, tenant)
+                return
+            self._tenants.add(tenant_id)
+        for kind, obj in policy:
+            getattr(self, POLICY_OBJECTS[kind][1])(tenant_id, obj)
+
+    def delete_tenant_policy(self, tenant_id, policy):
+        """Delete policy objects of a tenant"""
+        for kind, obj in policy:
+            getattr(self, POLICY_OBJECTS[kind][2])(tenant_id, obj)
 
     def create_action(self, tenant_id, action):
         """Create policy action"""
@@ -281,8 +353,11 @@ class OdlManager(object):
         self._sendjson('put', url, self._headers, data)
 
     def _touch_tenant(self, tenant_id):
+        if tenant_id in self._tenants:
+            return
         tenant = {
             "id": tenant_id
         }
         if not self._is_tenant_created(tenant_id):
             self.create_update_tenant(tenant_id, tenant)
+        self._tenants.add(tenant_id)
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
 import uuid
 
 from neutron.common import constants
@@ -18,6 +20,8 @@ from oslo_concurrency import lockutils  # noqa
 from oslo_log import log as logging
 
 from gbpservice.neutron.db.grouppolicy import group_policy_mapping_db as gpdb
+from gbpservice.neutron.services.grouppolicy import (
+    group_policy_context as p_context)
 from gbpservice.neutron.services.grouppolicy.common import constants as g_const
 from gbpservice.neutron.services.grouppolicy.common import exceptions as gpexc
 from gbpservice.neutron.services.grouppolicy.drivers import (
@@ -27,6 +31,9 @@ from gbpservice.neutron.services.grouppolicy.drivers.odl import odl_manager
 
 LOG = logging.getLogger(__name__)
 
+# ODL changes of the request being processed by the current thread
+_request = threading.local()
+
 
 class ExternalSegmentNotSupportedOnOdlDriver(gpexc.GroupPolicyBadRequest):
     message = _("External Segment currently not supported on ODL GBP "
@@ -104,6 +111,114 @@ class ClassifierUnknownIPProtocolNotSupportedOnOdlDriver(
     message = _("Unknown IP Protocol is not supported on ODL GBP driver.")
 
 
+class OdlChangeBuffer(object):
+    """ODL changes made while processing a request.
+
+    Successive changes of the same ODL object are merged, and the objects
+    of a tenant are pushed together when the buffer is flushed.
+    """
+
+    def __init__(self, odl_manager):
+        self._odl_manager = odl_manager
+        self._updates = collections.OrderedDict()
+        self._deletes = collections.OrderedDict()
+        self._registered = []
+        self._unregistered = []
+
+    def _key(self, tenant_id, kind, obj):
+        return tenant_id, kind, obj[odl_manager.POLICY_OBJECTS[kind][0]]
+
+    def update(self, tenant_id, kind, obj):
+        self._updates[self._key(tenant_id, kind, obj)] = obj
+
+    def delete(self, tenant_id, kind, obj):
+        key = self._key(tenant_id, kind, obj)
+        self._updates.pop(key, None)
+        self._deletes[key] = obj
+
+    def register_endpoints(self, endpoints):
+        self._registered.extend(endpoints)
+
+    def unregister_endpoints(self, endpoints):
+        self._unregistered.extend(endpoints)
+
+    def _tenant_policies(self, changes):
+        policies = collections.OrderedDict()
+        for (tenant_id, kind, key), obj in changes.items():
+            policies.setdefault(tenant_id, []).append((kind, obj))
+        return policies.items()
+
+    def flush(self):
+        if self._unregistered:
+            self._odl_manager.unregister_endpoints(self._unregistered)
+        for tenant_id, policy in self._tenant_policies(self._deletes):
+            self._odl_manager.delete_tenant_policy(tenant_id, policy)
+        for tenant_id, policy in self._tenant_policies(self._updates):
+            self._odl_manager.create_update_tenant_policy(tenant_id, policy)
+        if self._registered:
+            self._odl_manager.register_endpoints(self._registered)
+
+
+def _odl_request(plugin_context):
+    # A request made through the plugin is identified by its state, a new
+    # one is started with every outermost operation. Operations not made
+    # through the plugin are identified by their plugin context.
+    key = p_context.get_request_state(plugin_context)
+    if key is None:
+        key = plugin_context
+    if getattr(_request, 'key', None) is not key:
+        _request.key = key
+        _request.changes = None
+        _request.flushed = False
+        _request.postcommits = 0
+    return _request
+
+
+def _odl_postcommit(cls, method_name):
+    method = cls.__dict__.get(method_name)
+    # Bulk hooks are given the contexts of all the resources
+    bulk = '_bulk_' in method_name
+
+    def postcommit(self, context):
+        plugin_context = (context[0] if bulk else context)._plugin_context
+        request = _odl_request(plugin_context)
+        request.postcommits += 1
+        try:
+            if method:
+                return method(self, context)
+            return getattr(super(cls, self), method_name)(context)
+        finally:
+            # Changes of the operations nested in the outermost one, like
+            # those of implicit resources, are pushed along with its own.
+            # Operations nested after that are pushed right away. The
+            # postcommits called by another one, like those of each policy
+            # target of a bulk hook, leave the push to it.
+            request.postcommits -= 1
+            if not request.postcommits and (
+                    request.flushed or
+                    p_context.is_outermost_operation(plugin_context)):
+                request.flushed = True
+                changes, request.changes = request.changes, None
+                if changes:
+                    changes.flush()
+
+    postcommit.__name__ = method_name
+    return postcommit
+
+
+def _buffer_odl_changes(cls):
+    """Push ODL changes once the outermost operation of a request is done.
+
+    The changes are collected in an OdlChangeBuffer by the driver
+    postcommit methods.
+    """
+    for method_name in dir(cls):
+        if method_name.endswith('_postcommit'):
+            setattr(cls, method_name, _odl_postcommit(cls, method_name))
+    return cls
+
+
+@_buffer_odl_changes
 class OdlMappingDriver(api.ResourceMappingDriver):
     """ODL Mapping driver for Group Policy plugin.
 
@@ -138,6 +253,12 @@ class OdlMappingDriver(api.ResourceMappingDriver):
     def get_initialized_instance():
         return OdlMappingDriver.me
 
+    def _get_odl_changes(self, context):
+        request = _odl_request(context._plugin_context)
+        if request.changes is None:
+            request.changes = OdlChangeBuffer(self.odl_manager)
+        return request.changes
+
     def create_dhcp_policy_target_if_needed(self, plugin_context, port):
         session = plugin_context.session
         if (self._port_is_owned(session, port['id'])):
@@ -208,7 +329,7 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             "port-name": pt['neutron_port_id'],
             "tenant": pt['tenant_id']
         }
-        self.odl_manager.register_endpoints([ep])
+        self._get_odl_changes(context).register_endpoints([ep])
 
     def update_policy_target_precommit(self, context):
         raise UpdatePTNotSupportedOnOdlDriver()
@@ -219,7 +340,7 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             "l2": pt['l2_list'],
             "l3": pt['l3_list']
         }
-        self.odl_manager.unregister_endpoints([ep])
+        self._get_odl_changes(context).unregister_endpoints([ep])
         # Delete Neutron's port
         super(OdlMappingDriver, self).delete_policy_target_postcommit(context)
 
@@ -230,7 +351,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             "name": context.current['name'],
             "description": context.current['description']
         }
-        self.odl_manager.create_update_l3_context(tenant_id, l3ctx)
+        self._get_odl_changes(context).update(
+            tenant_id, 'l3-context', l3ctx)
 
     def update_l3_policy_precommit(self, context):
         raise UpdateL3PolicyNotSupportedOnOdlDriver()
@@ -240,7 +362,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
         l3ctx = {
             "id": context.current['id']
         }
-        self.odl_manager.delete_l3_context(tenant_id, l3ctx)
+        self._get_odl_changes(context).delete(
+            tenant_id, 'l3-context', l3ctx)
 
     def create_l2_policy_postcommit(self, context):
         super(OdlMappingDriver, self).create_l2_policy_postcommit(context)
@@ -253,7 +376,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             "description": context.current['description'],
             "parent": context.current['l3_policy_id']
         }
-        self.odl_manager.create_update_l2_bridge_domain(tenant_id, l2bd)
+        self._get_odl_changes(context).update(
+            tenant_id, 'l2-bridge-domain', l2bd)
 
         # Implicit network within l2 policy mapped to l2 FD in ODL
         net_id = context.current['network_id']
@@ -264,7 +388,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             "name": network['name'],
             "parent": context.current['id']
         }
-        self.odl_manager.create_update_l2_flood_domain(tenant_id, l2fd)
+        self._get_odl_changes(context).update(
+            tenant_id, 'l2-flood-domain', l2fd)
 
     def update_l2_policy_precommit(self, context):
         raise UpdateL2PolicyNotSupportedOnOdlDriver()
@@ -277,14 +402,16 @@ class OdlMappingDriver(api.ResourceMappingDriver):
         l2bd = {
             "id": context.current['id']
         }
-        self.odl_manager.delete_l2_bridge_domain(tenant_id, l2bd)
+        self._get_odl_changes(context).delete(
+            tenant_id, 'l2-bridge-domain', l2bd)
 
         # Implicit network within l2 policy mapped to l2 FD in ODL
         net_id = context.current['network_id']
         l2fd = {
             "id": net_id,
         }
-        self.odl_manager.delete_l2_flood_domain(tenant_id, l2fd)
+        self._get_odl_changes(context).delete(
+            tenant_id, 'l2-flood-domain', l2fd)
 
     def create_policy_target_group_postcommit(self, context):
         super(OdlMappingDriver, self).create_policy_target_group_postcommit(
@@ -327,7 +454,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             "provider-named-selector": provider_named_selectors
         }
         tenant_id = uuid.UUID(context.current['tenant_id']).urn[9:]
-        self.odl_manager.create_update_endpoint_group(tenant_id, epg)
+        self._get_odl_changes(context).update(
+            tenant_id, 'endpoint-group', epg)
 
         # Implicit subnet within policy target group mapped to subnet in ODL
         for subnet_id in subnets:
@@ -340,7 +468,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
                 "parent": neutron_subnet['network_id'],
                 "virtual-router-ip": neutron_subnet['gateway_ip']
             }
-            self.odl_manager.create_update_subnet(tenant_id, odl_subnet)
+            self._get_odl_changes(context).update(
+                tenant_id, 'subnet', odl_subnet)
 
     def update_policy_target_group_precommit(self, context):
         raise UpdatePTGNotSupportedOnOdlDriver()
@@ -355,13 +484,15 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             odl_subnet = {
                 "id": subnet_id
             }
-            self.odl_manager.delete_subnet(tenant_id, odl_subnet)
+            self._get_odl_changes(context).delete(
+                tenant_id, 'subnet', odl_subnet)
 
         # delete mapped EPG in ODL
         epg = {
             "id": context.current['id'],
         }
-        self.odl_manager.delete_endpoint_group(tenant_id, epg)
+        self._get_odl_changes(context).delete(
+            tenant_id, 'endpoint-group', epg)
 
     def create_policy_action_precommit(self, context):
         # TODO(odl): allow redirect for service chaining
@@ -417,7 +548,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
                 "name": classifier['name'],
                 "parameter-value": classifier['parameter-value']
             }
-            self.odl_manager.create_classifier(tenant_id, classifier_instance)
+            self._get_odl_changes(context).update(
+                tenant_id, 'classifier-instance', classifier_instance)
 
     def _make_odl_classifiers(self, stack_classifier):
         classifiers = []
@@ -487,7 +619,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             classifier_instance = {
                 "name": context.current['name']
             }
-            self.odl_manager.delete_classifier(tenant_id, classifier_instance)
+            self._get_odl_changes(context).delete(
+                tenant_id, 'classifier-instance', classifier_instance)
             return
 
         # fill in classifier instance data
@@ -495,7 +628,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
             classifier_instance = {
                 "name": context.current['name'] + '-' + port,
             }
-            self.odl_manager.delete_classifier(tenant_id, classifier_instance)
+            self._get_odl_changes(context).delete(
+                tenant_id, 'classifier-instance', classifier_instance)
 
     def create_policy_rule_precommit(self, context):
         if ('policy_actions' in context.current and
@@ -539,7 +673,8 @@ class OdlMappingDriver(api.ResourceMappingDriver):
         }
 
         tenant_id = uuid.UUID(context.current['tenant_id']).urn[9:]
-        self.odl_manager.create_update_contract(tenant_id, contract)
+        self._get_odl_changes(context).update(
+            tenant_id, 'contract', contract)
 
     def _make_odl_subject(self, context, rule_id):
         gbp_rule = context._plugin.get_policy_rule(
@@ -10,8 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import bisect
+import collections
 import netaddr
-import operator
 
 from keystoneclient import exceptions as k_exceptions
 from keystoneclient.v2_0 import client as k_client
@@ -46,6 +47,10 @@ from gbpservice.neutron.services.grouppolicy.drivers import nsp_manager
 
 LOG = logging.getLogger(__name__)
 DEFAULT_SG_PREFIX = 'gbp_%s'
+# Attributes identifying a security group rule
+SG_RULE_KEYS = ('security_group_id', 'direction', 'ethertype', 'protocol',
+                'port_range_min', 'port_range_max', 'remote_ip_prefix',
+                'remote_group_id')
 SCI_CONSUMER_NOT_AVAILABLE = 'N/A'
 
 opts = [
@@ -133,6 +138,50 @@ class CidrInUse(exc.GroupPolicyInternalError):
     message = _("CIDR %(cidr)s in-use within L3 policy %(l3p_id)s")
 
 
+class SubnetAllocator(object):
+    """Free blocks of an L3 policy IP pool, by prefix length.
+
+    Blocks are split in halves down to the prefix length requested,
+    the free half is kept for the next allocations. Released blocks
+    are merged back with their free buddy.
+    """
+
+    def __init__(self, pool, allocated):
+        self.pool = pool
+        # {prefixlen: sorted list of free blocks}
+        self._free = collections.defaultdict(list)
+        available = netaddr.IPSet(iterable=[pool]) - netaddr.IPSet(
+            iterable=allocated)
+        for cidr in available.iter_cidrs():
+            self._free[cidr.prefixlen].append(cidr)
+        for blocks in self._free.values():
+            blocks.sort()
+
+    def allocate(self, prefixlen):
+        """Lowest free block of prefixlen, None if none is left. """
+        for length in range(prefixlen, -1, -1):
+            if self._free.get(length):
+                cidr = self._free[length].pop(0)
+                while cidr.prefixlen < prefixlen:
+                    cidr, free = cidr.subnet(cidr.prefixlen + 1)
+                    bisect.insort(self._free[free.prefixlen], free)
+                return cidr
+
+    def release(self, cidr):
+        cidr = netaddr.IPNetwork(cidr)
+        while cidr.prefixlen:
+            parent = cidr.supernet(cidr.prefixlen - 1)[0]
+            low, high = parent.subnet(cidr.prefixlen)
+            buddy = high if cidr == low else low
+            blocks = self._free[cidr.prefixlen]
+            index = bisect.bisect_left(blocks, buddy)
+            if index == len(blocks) or blocks[index] != buddy:
+                break
+            del blocks[index]
+            cidr = parent
+        bisect.insort(self._free[cidr.prefixlen], cidr)
+
+
 class OwnedResourcesOperations(object):
 
     # TODO(Sumit): All the following operations can be condensed into
@@ -150,6 +199,13 @@ class OwnedResourcesOperations(object):
                     filter_by(port_id=port_id).
                     first() is not None)
 
+    def _get_owned_port_ids(self, session, port_ids):
+        if not port_ids:
+            return set()
+        with session.begin(subtransactions=True):
+            return set(owned.port_id for owned in session.query(OwnedPort).
+                       filter(OwnedPort.port_id.in_(port_ids)))
+
     def _mark_subnet_owned(self, session, subnet_id):
         with session.begin(subtransactions=True):
             owned = OwnedSubnet(subnet_id=subnet_id)
@@ -388,6 +444,30 @@ class ImplicitResourceOperations(local_api.LocalAPI):
             context.add_subnet(subnet_id)
         return subnets
 
+    def _get_subnet_allocator(self, context, l3p, is_proxy,
+                              clean_session=True):
+        """Allocator of the free L3 policy CIDRs, built once per pool.
+
+        It is only a hint of the free CIDRs, the CIDR is reserved by
+        _validate_and_add_subnet.
+        """
+        if getattr(self, '_subnet_allocators', None) is None:
+            self._subnet_allocators = {}
+        pool = l3p['proxy_ip_pool'] if is_proxy else l3p['ip_pool']
+        key = (l3p['id'], is_proxy)
+        allocator = self._subnet_allocators.get(key)
+        if not allocator or allocator.pool != pool:
+            allocator = SubnetAllocator(
+                pool, self._get_l3p_allocated_subnets(
+                    context, l3p['id'], clean_session=clean_session))
+            self._subnet_allocators[key] = allocator
+        return allocator
+
+    def _invalidate_subnet_allocators(self, l3p_id):
+        for is_proxy in [False, True]:
+            getattr(self, '_subnet_allocators', {}).pop(
+                (l3p_id, is_proxy), None)
+
     def _use_normal_implicit_subnet(self, context, is_proxy, prefix_len,
                                     subnet_specifics, l2p, l3p,
                                     clean_session=True):
@@ -398,30 +478,34 @@ class ImplicitResourceOperations(local_api.LocalAPI):
         # algorithm that should be replaced with use of a neutron
         # subnet pool.
 
-        pool = netaddr.IPSet(
-            iterable=[l3p['proxy_ip_pool'] if is_proxy else
-                      l3p['ip_pool']])
         prefixlen = prefix_len or (
             l3p['proxy_subnet_prefix_length'] if is_proxy
             else l3p['subnet_prefix_length'])
         l3p_id = l3p['id']
-        allocated = netaddr.IPSet(
-            iterable=self._get_l3p_allocated_subnets(
-                context, l3p_id, clean_session=clean_session))
-        available = pool - allocated
-        available.compact()
-
-        for cidr in sorted(available.iter_cidrs(),
-                           key=operator.attrgetter('prefixlen'),
-                           reverse=True):
-            if prefixlen < cidr.prefixlen:
-                # Close the loop, no remaining subnet is big enough
-                # for this allocation
-                break
-            generator = self._generate_subnets_from_cidrs(
-                context, l2p, l3p, cidr.subnet(prefixlen),
-                subnet_specifics, clean_session=clean_session)
-            for subnet in generator:
+        # The allocator is rebuilt from the allocated subnets once it
+        # runs out of CIDRs, in case it missed CIDRs freed meanwhile.
+        rebuilt = False
+        while True:
+            allocator = self._get_subnet_allocator(
+                context, l3p, is_proxy, clean_session=clean_session)
+            cidr = allocator.allocate(prefixlen)
+            if not cidr:
+                if rebuilt:
+                    raise exc.NoSubnetAvailable()
+                self._invalidate_subnet_allocators(l3p_id)
+                rebuilt = True
+                continue
+            try:
+                generator = self._generate_subnets_from_cidrs(
+                    context, l2p, l3p, [str(cidr)], subnet_specifics,
+                    clean_session=clean_session)
+                subnets = [subnet for subnet in generator]
+            except Exception:
+                with excutils.save_and_reraise_exception():
+                    allocator.release(cidr)
+            # A CIDR which fails is left out of the allocator, it is
+            # in use by a subnet unknown to it.
+            for subnet in subnets:
                 LOG.debug("Trying subnet %s for PTG %s", subnet,
                           context.current['id'])
                 subnet_id = subnet['id']
@@ -449,8 +533,8 @@ class ImplicitResourceOperations(local_api.LocalAPI):
                     self._delete_subnet(context._plugin_context,
                                         subnet['id'],
                                         clean_session=clean_session)
+                    allocator.release(cidr)
                     raise exc.GroupPolicyInternalError()
-        raise exc.NoSubnetAvailable()
 
     def _use_implicit_subnet(self, context, is_proxy=False, prefix_len=None,
                              subnet_specifics=None, clean_session=True):
@@ -979,6 +1063,69 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
             self._unset_proxy_gateway_routes(context, context.current)
         self._cleanup_port(context._plugin_context, port_id)
 
+    def _deletes_policy_targets_in_bulk(self):
+        # Drivers extending the deletion of a single policy target get
+        # their own hooks called for each one
+        return all(getattr(type(self), method_name) ==
+                   getattr(ResourceMappingDriver, method_name)
+                   for method_name in ['delete_policy_target_precommit',
+                                       'delete_policy_target_postcommit'])
+
+    @log.log_method_call
+    def delete_policy_targets_bulk_precommit(self, contexts):
+        if not self._deletes_policy_targets_in_bulk():
+            return super(ResourceMappingDriver,
+                         self).delete_policy_targets_bulk_precommit(contexts)
+        plugin_context = contexts[0]._plugin_context
+        pt_ids = set(context.current['id'] for context in contexts)
+        # Cluster masters can only go along with all their members
+        if [x for x in self._get_policy_targets(
+                plugin_context.elevated(), {'cluster_id': list(pt_ids)})
+                if x['id'] not in pt_ids]:
+            raise exc.PolicyTargetInUse()
+        fips = collections.defaultdict(list)
+        for fip in self._get_pts_floating_ip_mapping(plugin_context.session,
+                                                     list(pt_ids)):
+            fips[fip.policy_target_id].append(fip)
+        for context in contexts:
+            context.fips = fips[context.current['id']]
+
+    @log.log_method_call
+    def delete_policy_targets_bulk_postcommit(self, contexts):
+        if not self._deletes_policy_targets_in_bulk():
+            return super(ResourceMappingDriver,
+                         self).delete_policy_targets_bulk_postcommit(contexts)
+        plugin_context = contexts[0]._plugin_context
+        port_ids = [context.current['port_id'] for context in contexts
+                    if context.current['port_id']]
+        owned_port_ids = self._get_owned_port_ids(plugin_context.session,
+                                                  port_ids)
+        sg_lists = {}
+        for context in contexts:
+            pt = context.current
+            # A policy target failing to be cleaned up doesn't keep the
+            # others, nor the owned ports, from being deleted
+            try:
+                # Ports owned are deleted with their SG associations
+                if pt['port_id'] and pt['port_id'] not in owned_port_ids:
+                    ptg_id = pt['policy_target_group_id']
+                    if ptg_id not in sg_lists:
+                        sg_lists[ptg_id] = (
+                            self._generate_list_of_sg_from_ptg(context,
+                                                               ptg_id))
+                    self._disassoc_sgs_from_port(
+                        plugin_context, pt['port_id'], sg_lists[ptg_id])
+                for fip in context.fips:
+                    self._delete_fip(plugin_context, fip.floatingip_id)
+                if pt.get('proxy_gateway'):
+                    self._unset_proxy_gateway_routes(context, pt)
+            except Exception:
+                LOG.exception(_LE("Cleaning up policy target %s failed"),
+                              pt['id'])
+        if owned_port_ids:
+            self._delete_ports_bulk(plugin_context,
+                                    port_ids=list(owned_port_ids))
+
     @log.log_method_call
     def create_policy_target_group_precommit(self, context):
         self._reject_cross_tenant_ptg_l2p(context)
@@ -1272,6 +1419,8 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
             for subnet_id in context.current['subnets']:
                 self._cleanup_subnet(context._plugin_context, subnet_id,
                                      l3p['routers'][0])
+            # CIDRs of the deleted subnets are free again
+            self._invalidate_subnet_allocators(l3p['id'])
         self._delete_default_security_group(
             context._plugin_context, context.current['id'],
             context.current['tenant_id'])
@@ -1402,6 +1551,7 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         for router_id in context.current['routers']:
             self._cleanup_router(context._plugin_context, router_id)
         self._process_remove_l3p_ip_pool(context, context.current['ip_pool'])
+        self._invalidate_subnet_allocators(context.current['id'])
 
     @log.log_method_call
     def create_policy_classifier_precommit(self, context):
@@ -2064,6 +2214,7 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                                      new_classifier=None):
         policy_rule_set_list = context._plugin.get_policy_rule_sets(
                 context._plugin_context, filters={'id': policy_rule_sets})
+        rule_batch = []
         for policy_rule_set in policy_rule_set_list:
             filtered_rules = self._get_enforced_prs_rules(
                 context, policy_rule_set, subset=[policy_rule['id']])
@@ -2077,10 +2228,12 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                 self._add_or_remove_policy_rule_set_rule(
                     context, policy_rule, policy_rule_set_sg_mappings,
                     cidr_mapping, unset=True, unset_egress=True,
-                    classifier=old_classifier)
+                    classifier=old_classifier, rule_batch=rule_batch)
                 self._add_or_remove_policy_rule_set_rule(
                     context, policy_rule, policy_rule_set_sg_mappings,
-                    cidr_mapping, classifier=new_classifier)
+                    cidr_mapping, classifier=new_classifier,
+                    rule_batch=rule_batch)
+        self._apply_sg_rule_batch(context._plugin_context, rule_batch)
 
     def _get_rule_ids_for_actions(self, context, action_id):
         policy_rule_qry = context.session.query(
@@ -2168,7 +2321,7 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
 
     def _sg_rule(self, plugin_context, tenant_id, sg_id, direction,
                  protocol=None, port_range=None, cidr=None,
-                 ethertype=const.IPv4, unset=False):
+                 ethertype=const.IPv4, unset=False, rule_batch=None):
         if port_range:
             port_min, port_max = (gpdb.GroupPolicyDbPlugin.
                                   _get_min_max_ports_from_range(port_range))
@@ -2184,7 +2337,10 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                  'port_range_max': port_max,
                  'remote_ip_prefix': cidr,
                  'remote_group_id': None}
-        if unset:
+        if rule_batch is not None:
+            # Applied later on by _apply_sg_rule_batch
+            rule_batch.append((attrs, unset))
+        elif unset:
             filters = {}
             for key in attrs:
                 value = attrs[key]
@@ -2197,16 +2353,72 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
             return self._create_sg_rule(plugin_context, attrs)
 
     def _sg_ingress_rule(self, context, sg_id, protocol, port_range, cidr,
-                         tenant_id, unset=False):
+                         tenant_id, unset=False, rule_batch=None):
         return self._sg_rule(
             context._plugin_context, tenant_id, sg_id,
-            'ingress', protocol, port_range, cidr, unset=unset)
+            'ingress', protocol, port_range, cidr, unset=unset,
+            rule_batch=rule_batch)
 
     def _sg_egress_rule(self, context, sg_id, protocol, port_range,
-                        cidr, tenant_id, unset=False):
+                        cidr, tenant_id, unset=False, rule_batch=None):
         return self._sg_rule(
             context._plugin_context, tenant_id, sg_id,
-            'egress', protocol, port_range, cidr, unset=unset)
+            'egress', protocol, port_range, cidr, unset=unset,
+            rule_batch=rule_batch)
+
+    @staticmethod
+    def _sg_rule_value(value):
+        return None if value is None else str(value).lower()
+
+    def _sg_rule_key(self, rule):
+        return tuple(self._sg_rule_value(rule.get(key))
+                     for key in SG_RULE_KEYS)
+
+    def _sg_rule_matches(self, rule, attrs):
+        # Same matching as a GET filtered on the attributes that are set
+        return all(self._sg_rule_value(rule.get(key)) ==
+                   self._sg_rule_value(value)
+                   for key, value in attrs.iteritems() if value)
+
+    def _apply_sg_rule_batch(self, plugin_context, rule_batch):
+        """Apply a batch of SG rule changes with bulk calls.
+
+        Only the last change requested for each rule is applied. The rules
+        of all the affected security groups are fetched with a single query,
+        then the missing rules are created and the unset ones are deleted
+        in bulk.
+        """
+        if not rule_batch:
+            return
+        desired = collections.OrderedDict()
+        for attrs, unset in rule_batch:
+            desired[self._sg_rule_key(attrs)] = (attrs, unset)
+        sg_ids = set(attrs['security_group_id'] for attrs, _ in rule_batch)
+        existing = self._get_sg_rules(
+            plugin_context, filters={'security_group_id': list(sg_ids)})
+        existing_keys = set(self._sg_rule_key(rule) for rule in existing)
+        set_keys = set(key for key, (attrs, unset) in desired.iteritems()
+                       if not unset)
+
+        to_delete = []
+        to_create = []
+        for key, (attrs, unset) in desired.iteritems():
+            if not unset:
+                if key not in existing_keys:
+                    to_create.append(attrs)
+                continue
+            for rule in existing:
+                # An unset matching a rule also set in the batch would
+                # leave the port without it, the rule is kept instead
+                if (rule['id'] not in to_delete and
+                        self._sg_rule_key(rule) not in set_keys and
+                        self._sg_rule_matches(rule, attrs)):
+                    to_delete.append(rule['id'])
+                    break
+        if to_delete:
+            self._delete_sg_rules_bulk(plugin_context, to_delete)
+        if to_create:
+            self._create_sg_rules_bulk(plugin_context, to_create)
 
     def _assoc_sgs_to_pt(self, context, pt_id, sg_list):
         try:
@@ -2351,6 +2563,7 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                                       provided_policy_rule_sets,
                                       consumed_policy_rule_sets, unset=False):
         prov_cons = ['providing_cidrs', 'consuming_cidrs']
+        rule_batch = []
         for pos, policy_rule_sets in enumerate(
                 [provided_policy_rule_sets, consumed_policy_rule_sets]):
             for policy_rule_set_id in policy_rule_sets:
@@ -2372,7 +2585,8 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                 for policy_rule in policy_rules:
                     self._add_or_remove_policy_rule_set_rule(
                         context, policy_rule, policy_rule_set_sg_mappings,
-                        cidr_mapping, unset=unset)
+                        cidr_mapping, unset=unset, rule_batch=rule_batch)
+        self._apply_sg_rule_batch(context._plugin_context, rule_batch)
 
     def _manage_policy_rule_set_rules(self, context, policy_rule_set,
                                       policy_rules, unset=False,
@@ -2382,16 +2596,20 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         policy_rule_set = context._plugin.get_policy_rule_set(
             context._plugin_context, policy_rule_set['id'])
         cidr_mapping = self._get_cidrs_mapping(context, policy_rule_set)
+        rule_batch = []
         for policy_rule in policy_rules:
             self._add_or_remove_policy_rule_set_rule(
                 context, policy_rule, policy_rule_set_sg_mappings,
-                cidr_mapping, unset=unset, unset_egress=unset_egress)
+                cidr_mapping, unset=unset, unset_egress=unset_egress,
+                rule_batch=rule_batch)
+        self._apply_sg_rule_batch(context._plugin_context, rule_batch)
 
     def _add_or_remove_policy_rule_set_rule(self, context, policy_rule,
                                             policy_rule_set_sg_mappings,
                                             cidr_mapping, unset=False,
                                             unset_egress=False,
-                                            classifier=None):
+                                            classifier=None,
+                                            rule_batch=None):
         in_out = [gconst.GP_DIRECTION_IN, gconst.GP_DIRECTION_OUT]
         prov_cons = [policy_rule_set_sg_mappings['provided_sg_id'],
                      policy_rule_set_sg_mappings['consumed_sg_id']]
@@ -2409,18 +2627,23 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         prs = context._plugin.get_policy_rule_set(
             admin_context, policy_rule_set_sg_mappings.policy_rule_set_id)
         tenant_id = prs['tenant_id']
+        batch = [] if rule_batch is None else rule_batch
         for pos, sg in enumerate(prov_cons):
             if classifier['direction'] in [gconst.GP_DIRECTION_BI,
                                            in_out[pos]]:
                 for cidr in cidr_prov_cons[pos - 1]:
                     self._sg_ingress_rule(context, sg, protocol, port_range,
-                                          cidr, tenant_id, unset=unset)
+                                          cidr, tenant_id, unset=unset,
+                                          rule_batch=batch)
             if classifier['direction'] in [gconst.GP_DIRECTION_BI,
                                            in_out[pos - 1]]:
                 for cidr in cidr_prov_cons[pos - 1]:
                     self._sg_egress_rule(context, sg, protocol, port_range,
                                          cidr, tenant_id,
-                                         unset=unset or unset_egress)
+                                         unset=unset or unset_egress,
+                                         rule_batch=batch)
+        if rule_batch is None:
+            self._apply_sg_rule_batch(context._plugin_context, batch)
 
     def _apply_policy_rule_set_rules(self, context, policy_rule_set,
                                      policy_rules):
@@ -2477,14 +2700,17 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                                      description='default GBP security group')
             sg_id = sg['id']
 
+        rule_batch = []
         for subnet in self._get_subnets(
                 plugin_context, filters={'id': subnets or []}):
             self._sg_rule(plugin_context, tenant_id, sg_id,
                           'ingress', cidr=subnet['cidr'],
-                          ethertype=ip_v[subnet['ip_version']])
+                          ethertype=ip_v[subnet['ip_version']],
+                          rule_batch=rule_batch)
             self._sg_rule(plugin_context, tenant_id, sg_id,
                           'egress', cidr=subnet['cidr'],
-                          ethertype=ip_v[subnet['ip_version']])
+                          ethertype=ip_v[subnet['ip_version']],
+                          rule_batch=rule_batch)
 
         # The following rules are added for access to the link local
         # network (metadata server in most cases), and to the DNS
@@ -2496,12 +2722,15 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         # We can also consider reading these rules from a config which
         # would make it more flexible to add any rules if required.
         self._sg_rule(plugin_context, tenant_id, sg_id, 'egress',
-                      cidr='169.254.0.0/16', ethertype=ip_v[4])
+                      cidr='169.254.0.0/16', ethertype=ip_v[4],
+                      rule_batch=rule_batch)
         for ether_type in ip_v:
             for proto in [const.PROTO_NAME_TCP, const.PROTO_NAME_UDP]:
                 self._sg_rule(plugin_context, tenant_id, sg_id, 'egress',
                               protocol=proto, port_range='53',
-                              ethertype=ip_v[ether_type])
+                              ethertype=ip_v[ether_type],
+                              rule_batch=rule_batch)
+        self._apply_sg_rule_batch(plugin_context, rule_batch)
 
         return sg_id
 
@@ -88,6 +88,22 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
                 # We are replacing a non-GBP/non-Neutron exception here
                 raise gp_exc.GroupPolicyDriverError(method=method_name)
 
+    def _extend_dicts(self, resource, session, results):
+        """Helper method for extending a list of resource dictionaries.
+
+        Drivers implementing extend_<resource>_dicts get all the results
+        in a single call, the others are called once per result.
+        """
+        for driver in self.ordered_ext_drivers:
+            extend_dicts = getattr(driver.obj,
+                                   'extend_%s_dicts' % resource, None)
+            if extend_dicts:
+                extend_dicts(session, results)
+            else:
+                extend_dict = getattr(driver.obj, 'extend_%s_dict' % resource)
+                for result in results:
+                    extend_dict(session, result)
+
     def process_create_policy_target(self, session, data, result):
         """Call all extension drivers during PT creation."""
         self._call_on_ext_drivers("process_create_policy_target",
@@ -103,6 +119,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_policy_target_dict(session, result)
 
+    def extend_policy_target_dicts(self, session, results):
+        """Call all extension drivers to extend PT dictionaries."""
+        self._extend_dicts('policy_target', session, results)
+
     def process_create_policy_target_group(self, session, data, result):
         """Call all extension drivers during PTG creation."""
         self._call_on_ext_drivers("process_create_policy_target_group",
@@ -118,6 +138,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_policy_target_group_dict(session, result)
 
+    def extend_policy_target_group_dicts(self, session, results):
+        """Call all extension drivers to extend PTG dictionaries."""
+        self._extend_dicts('policy_target_group', session, results)
+
     def process_create_l2_policy(self, session, data, result):
         """Call all extension drivers during L2P creation."""
         self._call_on_ext_drivers("process_create_l2_policy",
@@ -133,6 +157,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_l2_policy_dict(session, result)
 
+    def extend_l2_policy_dicts(self, session, results):
+        """Call all extension drivers to extend L2P dictionaries."""
+        self._extend_dicts('l2_policy', session, results)
+
     def process_create_l3_policy(self, session, data, result):
         """Call all extension drivers during L3P creation."""
         self._call_on_ext_drivers("process_create_l3_policy",
@@ -148,6 +176,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_l3_policy_dict(session, result)
 
+    def extend_l3_policy_dicts(self, session, results):
+        """Call all extension drivers to extend L3P dictionaries."""
+        self._extend_dicts('l3_policy', session, results)
+
     def process_create_policy_classifier(self, session, data, result):
         """Call all extension drivers during PC creation."""
         self._call_on_ext_drivers("process_create_policy_classifier",
@@ -163,6 +195,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_policy_classifier_dict(session, result)
 
+    def extend_policy_classifier_dicts(self, session, results):
+        """Call all extension drivers to extend PC dictionaries."""
+        self._extend_dicts('policy_classifier', session, results)
+
     def process_create_policy_action(self, session, data, result):
         """Call all extension drivers during PA creation."""
         self._call_on_ext_drivers("process_create_policy_action",
@@ -178,6 +214,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_policy_action_dict(session, result)
 
+    def extend_policy_action_dicts(self, session, results):
+        """Call all extension drivers to extend PA dictionaries."""
+        self._extend_dicts('policy_action', session, results)
+
     def process_create_policy_rule(self, session, data, result):
         """Call all extension drivers during PR creation."""
         self._call_on_ext_drivers("process_create_policy_rule",
@@ -193,6 +233,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_policy_rule_dict(session, result)
 
+    def extend_policy_rule_dicts(self, session, results):
+        """Call all extension drivers to extend PR dictionaries."""
+        self._extend_dicts('policy_rule', session, results)
+
     def process_create_policy_rule_set(self, session, data, result):
         """Call all extension drivers during PRS creation."""
         self._call_on_ext_drivers("process_create_policy_rule_set",
@@ -208,6 +252,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_policy_rule_set_dict(session, result)
 
+    def extend_policy_rule_set_dicts(self, session, results):
+        """Call all extension drivers to extend PRS dictionaries."""
+        self._extend_dicts('policy_rule_set', session, results)
+
     def process_create_network_service_policy(self, session, data, result):
         """Call all extension drivers during NSP creation."""
         self._call_on_ext_drivers("process_create_network_service_policy",
@@ -223,6 +271,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_network_service_policy_dict(session, result)
 
+    def extend_network_service_policy_dicts(self, session, results):
+        """Call all extension drivers to extend NSP dictionaries."""
+        self._extend_dicts('network_service_policy', session, results)
+
     def process_create_external_segment(self, session, data, result):
         """Call all extension drivers during EP creation."""
         self._call_on_ext_drivers("process_create_external_segment",
@@ -238,6 +290,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_external_segment_dict(session, result)
 
+    def extend_external_segment_dicts(self, session, results):
+        """Call all extension drivers to extend EP dictionaries."""
+        self._extend_dicts('external_segment', session, results)
+
     def process_create_external_policy(self, session, data, result):
         """Call all extension drivers during EP creation."""
         self._call_on_ext_drivers("process_create_external_policy",
@@ -253,6 +309,10 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_external_policy_dict(session, result)
 
+    def extend_external_policy_dicts(self, session, results):
+        """Call all extension drivers to extend EP dictionaries."""
+        self._extend_dicts('external_policy', session, results)
+
     def process_create_nat_pool(self, session, data, result):
         """Call all extension drivers during NP creation."""
         self._call_on_ext_drivers("process_create_nat_pool",
@@ -267,3 +327,7 @@ class ExtensionManager(stevedore.named.NamedExtensionManager):
         """Call all extension drivers to extend NP dictionary."""
         for driver in self.ordered_ext_drivers:
             driver.obj.extend_nat_pool_dict(session, result)
+
+    def extend_nat_pool_dicts(self, session, results):
+        """Call all extension drivers to extend NP dictionaries."""
+        self._extend_dicts('nat_pool', session, results)
@@ -10,9 +10,53 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 from gbpservice.neutron.services.grouppolicy import (
     group_policy_driver_api as api)
 
+# Attributes of the plugin context tracking the GBP operations in progress
+REQUEST_DEPTH = '_gbp_request_depth'
+REQUEST_STATE = '_gbp_request_state'
+
+
+def track_request(f):
+    """Track the GBP operations made with a plugin context.
+
+    Operations made by the policy drivers while processing a request, like
+    the creation of implicit resources, reuse its plugin context and are
+    nested in the outermost one. The request state is dropped once the
+    outermost operation is done, whether it succeeded or failed in a
+    precommit, the commit or a postcommit.
+    """
+    @functools.wraps(f)
+    def wrapper(self, context, *args, **kwargs):
+        depth = getattr(context, REQUEST_DEPTH, 0)
+        if not depth:
+            setattr(context, REQUEST_STATE, {})
+        setattr(context, REQUEST_DEPTH, depth + 1)
+        try:
+            return f(self, context, *args, **kwargs)
+        finally:
+            setattr(context, REQUEST_DEPTH, depth)
+            if not depth:
+                setattr(context, REQUEST_STATE, None)
+    return wrapper
+
+
+def get_request_state(plugin_context):
+    """Return the state of the request being processed, None if none is.
+
+    A dict shared by the outermost operation and the operations nested in
+    it, where policy drivers can keep the state of the request.
+    """
+    return getattr(plugin_context, REQUEST_STATE, None)
+
+
+def is_outermost_operation(plugin_context):
+    """Return whether the operation in progress is not a nested one."""
+    return getattr(plugin_context, REQUEST_DEPTH, 0) <= 1
+
 
 class GroupPolicyContext(object):
     """GroupPolicy context base class."""
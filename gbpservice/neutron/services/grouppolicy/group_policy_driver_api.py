@@ -12,12 +12,16 @@
 
 import abc
 
+from neutron._i18n import _LE
 from neutron.api.v2 import attributes
+from oslo_log import log as logging
 import six
 from sqlalchemy.orm import exc as orm_exc
 
 from gbpservice.common import utils
 
+LOG = logging.getLogger(__name__)
+
 
 @six.add_metaclass(abc.ABCMeta)
 class PolicyTargetContext(object):
@@ -575,6 +579,36 @@ class PolicyDriver(object):
         """
         pass
 
+    def delete_policy_targets_bulk_precommit(self, contexts):
+        """Delete resources for a list of policy_targets.
+
+        :param contexts: List of PolicyTargetContext instances, one
+        per policy_target deleted along with its policy_target_group.
+        By default delete_policy_target_precommit is called for each
+        context, drivers can override this to handle all the
+        policy_targets at once.
+        """
+        for context in contexts:
+            self.delete_policy_target_precommit(context)
+
+    def delete_policy_targets_bulk_postcommit(self, contexts):
+        """Delete a list of policy_targets.
+
+        :param contexts: List of PolicyTargetContext instances, one
+        per policy_target deleted along with its policy_target_group.
+        By default delete_policy_target_postcommit is called for each
+        context, drivers can override this to delete all the
+        policy_targets at once. A policy_target failing to be deleted
+        is logged and doesn't keep the others from being deleted.
+        """
+        for context in contexts:
+            try:
+                self.delete_policy_target_postcommit(context)
+            except Exception:
+                LOG.exception(_LE("delete_policy_target_postcommit failed "
+                                  "for policy_target %s"),
+                              context.current['id'])
+
     def get_policy_target_status(self, context):
         """Get most recent status of a policy_target.
 
@@ -585,6 +619,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_policy_targets_status(self, contexts):
+        """Get most recent status of a list of policy_targets.
+
+        :param contexts: List of PolicyTargetContext instances, one
+        per policy_target returned by a list call.
+        By default get_policy_target_status is called for each
+        context, drivers can override this to get the status of all the
+        policy_targets at once.
+        """
+        for context in contexts:
+            self.get_policy_target_status(context)
+
     def create_policy_target_group_precommit(self, context):
         """Allocate resources for a new policy_target_group.
 
@@ -648,6 +694,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_policy_target_groups_status(self, contexts):
+        """Get most recent status of a list of policy_target_groups.
+
+        :param contexts: List of PolicyTargetGroupContext instances, one
+        per policy_target_group returned by a list call.
+        By default get_policy_target_group_status is called for each
+        context, drivers can override this to get the status of all the
+        policy_target_groups at once.
+        """
+        for context in contexts:
+            self.get_policy_target_group_status(context)
+
     def create_l2_policy_precommit(self, context):
         """Allocate resources for a new l2_policy.
 
@@ -708,6 +766,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_l2_policies_status(self, contexts):
+        """Get most recent status of a list of l2_policies.
+
+        :param contexts: List of L2PolicyContext instances, one
+        per l2_policy returned by a list call.
+        By default get_l2_policy_status is called for each
+        context, drivers can override this to get the status of all the
+        l2_policies at once.
+        """
+        for context in contexts:
+            self.get_l2_policy_status(context)
+
     def create_l3_policy_precommit(self, context):
         """Allocate resources for a new l3_policy.
 
@@ -768,6 +838,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_l3_policies_status(self, contexts):
+        """Get most recent status of a list of l3_policies.
+
+        :param contexts: List of L3PolicyContext instances, one
+        per l3_policy returned by a list call.
+        By default get_l3_policy_status is called for each
+        context, drivers can override this to get the status of all the
+        l3_policies at once.
+        """
+        for context in contexts:
+            self.get_l3_policy_status(context)
+
     def create_policy_classifier_precommit(self, context):
         """Allocate resources for a new policy_classifier.
 
@@ -828,6 +910,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_policy_classifiers_status(self, contexts):
+        """Get most recent status of a list of policy_classifiers.
+
+        :param contexts: List of PolicyClassifierContext instances, one
+        per policy_classifier returned by a list call.
+        By default get_policy_classifier_status is called for each
+        context, drivers can override this to get the status of all the
+        policy_classifiers at once.
+        """
+        for context in contexts:
+            self.get_policy_classifier_status(context)
+
     def create_policy_action_precommit(self, context):
         """Allocate resources for a new policy_action.
 
@@ -888,6 +982,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_policy_actions_status(self, contexts):
+        """Get most recent status of a list of policy_actions.
+
+        :param contexts: List of PolicyActionContext instances, one
+        per policy_action returned by a list call.
+        By default get_policy_action_status is called for each
+        context, drivers can override this to get the status of all the
+        policy_actions at once.
+        """
+        for context in contexts:
+            self.get_policy_action_status(context)
+
     def create_policy_rule_precommit(self, context):
         """Allocate resources for a new policy_rule.
 
@@ -948,6 +1054,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_policy_rules_status(self, contexts):
+        """Get most recent status of a list of policy_rules.
+
+        :param contexts: List of PolicyRuleContext instances, one
+        per policy_rule returned by a list call.
+        By default get_policy_rule_status is called for each
+        context, drivers can override this to get the status of all the
+        policy_rules at once.
+        """
+        for context in contexts:
+            self.get_policy_rule_status(context)
+
     def create_policy_rule_set_precommit(self, context):
         """Allocate resources for a new policy_rule_set.
 
@@ -1008,6 +1126,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_policy_rule_sets_status(self, contexts):
+        """Get most recent status of a list of policy_rule_sets.
+
+        :param contexts: List of PolicyRuleSetContext instances, one
+        per policy_rule_set returned by a list call.
+        By default get_policy_rule_set_status is called for each
+        context, drivers can override this to get the status of all the
+        policy_rule_sets at once.
+        """
+        for context in contexts:
+            self.get_policy_rule_set_status(context)
+
     def create_network_service_policy_precommit(self, context):
         """Allocate resources for a new network service policy.
 
@@ -1071,6 +1201,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_network_service_policies_status(self, contexts):
+        """Get most recent status of a list of network_service_policies.
+
+        :param contexts: List of NetworkServicePolicyContext instances, one
+        per network_service_policy returned by a list call.
+        By default get_network_service_policy_status is called for each
+        context, drivers can override this to get the status of all the
+        network_service_policies at once.
+        """
+        for context in contexts:
+            self.get_network_service_policy_status(context)
+
     def create_external_segment_precommit(self, context):
         """Allocate resources for a new network service policy.
 
@@ -1133,6 +1275,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_external_segments_status(self, contexts):
+        """Get most recent status of a list of external_segments.
+
+        :param contexts: List of ExternalSegmentContext instances, one
+        per external_segment returned by a list call.
+        By default get_external_segment_status is called for each
+        context, drivers can override this to get the status of all the
+        external_segments at once.
+        """
+        for context in contexts:
+            self.get_external_segment_status(context)
+
     def create_external_policy_precommit(self, context):
         """Allocate resources for a new network service policy.
 
@@ -1195,6 +1349,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_external_policies_status(self, contexts):
+        """Get most recent status of a list of external_policies.
+
+        :param contexts: List of ExternalPolicyContext instances, one
+        per external_policy returned by a list call.
+        By default get_external_policy_status is called for each
+        context, drivers can override this to get the status of all the
+        external_policies at once.
+        """
+        for context in contexts:
+            self.get_external_policy_status(context)
+
     def create_nat_pool_precommit(self, context):
         """Allocate resources for a new network service policy.
 
@@ -1257,6 +1423,18 @@ class PolicyDriver(object):
         """
         pass
 
+    def get_nat_pools_status(self, contexts):
+        """Get most recent status of a list of nat_pools.
+
+        :param contexts: List of NatPoolContext instances, one
+        per nat_pool returned by a list call.
+        By default get_nat_pool_status is called for each
+        context, drivers can override this to get the status of all the
+        nat_pools at once.
+        """
+        for context in contexts:
+            self.get_nat_pool_status(context)
+
     # REVISIT(rkukura): Is this needed for all operations, or just for
     # create operations? If its needed for all operations, should the
     # method be specific to the resource and operation, and include
@@ -1286,6 +1464,11 @@ class ExtensionDriver(object):
     through the API. Other methods extend the resource dictionaries
     returned from the API operations with the values of the extended
     attributes.
+
+    A driver may also implement extend_<resource>_dicts(session, results)
+    for any resource, in which case it is called once with the whole list
+    of dictionaries returned by a GET operation instead of calling
+    extend_<resource>_dict for each of them.
     """
 
     @abc.abstractmethod
@@ -1864,6 +2047,26 @@ class ExtensionDriver(object):
         for key in keys:
             result[key] = getattr(record, key)
 
+    def _default_extend_dicts(self, session, results, type=None,
+                              table=None, keys=None):
+        """Default dictionary list extension behavior.
+
+        Same as _default_extend_dict, with the records of all the results
+        fetched in one query.
+        """
+        if not results:
+            return
+        column = getattr(table, type + '_' + 'id')
+        records = dict(
+            (getattr(record, type + '_' + 'id'), record) for record in
+            session.query(table).filter(
+                column.in_([result['id'] for result in results])))
+        for result in results:
+            record = records.get(result['id'])
+            if record:
+                for key in keys:
+                    result[key] = getattr(record, key)
+
 
 def default_extension_behavior(table, keys=None):
     def wrap(func):
@@ -1902,6 +2105,11 @@ def default_extension_behavior(table, keys=None):
                 type = name[len('extend_'):-len('_dict')]
                 inst._default_extend_dict(*args, type=type, table=table,
                     keys=filter_keys(inst, None, type))
+            elif name.startswith('extend_') and name.endswith('_dicts'):
+                # call default extend dicts
+                type = name[len('extend_'):-len('_dicts')]
+                inst._default_extend_dicts(*args, type=type, table=table,
+                    keys=filter_keys(inst, None, type))
             # Now exec the actual function for postprocessing
             func(inst, *args)
         return inner
@@ -366,6 +366,30 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             resource['status_details'] = updated_status_details
         return resource
 
+    def _get_resources_status_from_drivers(self, context, context_name,
+                                           resource_name, resources):
+        statuses = [(resource['status'], resource['status_details'])
+                    for resource in resources]
+        policy_contexts = [getattr(p_context, context_name)(
+            self, context, resource, resource) for resource in resources]
+        resource_plural = gbp_utils.get_resource_plural(resource_name)
+        getattr(self.policy_driver_manager,
+                "get_" + resource_plural + "_status")(policy_contexts)
+        updated_resources = []
+        for resource, policy_context, status in zip(
+                resources, policy_contexts, statuses):
+            _resource = getattr(policy_context, "_" + resource_name)
+            updated_status = (_resource['status'],
+                              _resource['status_details'])
+            if status != updated_status:
+                resource['status'] = updated_status[0]
+                resource['status_details'] = updated_status[1]
+                updated_resources.append(resource)
+        if updated_resources:
+            self._update_resources_status(context, resource_name,
+                                          updated_resources)
+        return resources
+
     def _get_resource(self, context, resource_name, resource_id,
                       gbp_context_name, fields=None):
         session = context.session
@@ -394,27 +418,22 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             results = getattr(super(GroupPolicyPlugin, self),
                               get_resources_method)(
                 context, filters, None, sorts, limit, marker, page_reverse)
+            extend_resources_method = "".join(['extend_', resource_name,
+                                               '_dicts'])
+            getattr(self.extension_manager, extend_resources_method)(
+                session, results)
             filtered_results = []
             for result in results:
-                extend_resources_method = "".join(['extend_', resource_name,
-                                                   '_dict'])
-                getattr(self.extension_manager, extend_resources_method)(
-                    session, result)
                 filtered = self._filter_extended_result(result, filters)
                 if filtered:
                     filtered_results.append(filtered)
 
-        new_filtered_results = []
         # Invoke drivers only if status attributes are requested
-        if not fields or STATUS_SET.intersection(set(fields)):
-            for result in filtered_results:
-                result = self._get_status_from_drivers(
-                    context, gbp_context_name, resource_name, result['id'],
-                    result)
-                new_filtered_results.append(result)
-        new_filtered_results = new_filtered_results or filtered_results
-        return [self._fields(nfresult, fields) for nfresult in
-                new_filtered_results]
+        if filtered_results and (
+                not fields or STATUS_SET.intersection(set(fields))):
+            filtered_results = self._get_resources_status_from_drivers(
+                context, gbp_context_name, resource_name, filtered_results)
+        return [self._fields(result, fields) for result in filtered_results]
 
     @resource_registry.tracked_resources(
         l3_policy=group_policy_mapping_db.L3PolicyMapping,
@@ -456,6 +475,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
                 {'port_attributes': port_attributes})
 
     @log.log_method_call
+    @p_context.track_request
     def create_policy_target(self, context, policy_target):
         self._ensure_tenant(context, policy_target['policy_target'])
         self._add_fixed_ips_to_port_attributes(policy_target)
@@ -485,6 +505,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_target(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_policy_target(self, context, policy_target_id, policy_target):
         self._add_fixed_ips_to_port_attributes(policy_target)
         session = context.session
@@ -510,6 +531,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_target(context, policy_target_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_policy_target(self, context, policy_target_id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -529,6 +551,26 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
                               "for policy_target %s"),
                           policy_target_id)
 
+    def _delete_policy_targets_bulk(self, context, policy_targets):
+        if not policy_targets:
+            return
+        session = context.session
+        policy_target_ids = [pt['id'] for pt in policy_targets]
+        with session.begin(subtransactions=True):
+            policy_contexts = [
+                p_context.PolicyTargetContext(self, context, policy_target)
+                for policy_target in policy_targets]
+            self.policy_driver_manager.delete_policy_targets_bulk_precommit(
+                policy_contexts)
+            self._delete_policy_targets(context, policy_target_ids)
+
+        try:
+            self.policy_driver_manager.delete_policy_targets_bulk_postcommit(
+                policy_contexts)
+        except Exception:
+            LOG.exception(_LE("delete_policy_targets_bulk_postcommit failed "
+                              "for policy_targets %s"), policy_target_ids)
+
     @log.log_method_call
     def get_policy_target(self, context, policy_target_id, fields=None):
         return self._get_resource(context, 'policy_target', policy_target_id,
@@ -544,6 +586,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_policy_target_group(self, context, policy_target_group):
         self._ensure_tenant(context,
                             policy_target_group['policy_target_group'])
@@ -574,6 +617,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_target_group(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_policy_target_group(self, context, policy_target_group_id,
                                    policy_target_group):
         session = context.session
@@ -613,15 +657,18 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_target_group(context, policy_target_group_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_policy_target_group(self, context, policy_target_group_id):
         session = context.session
         with session.begin(subtransactions=True):
             policy_target_group = self.get_policy_target_group(
                 context, policy_target_group_id)
             pt_ids = policy_target_group['policy_targets']
-            for pt in self.get_policy_targets(context.elevated(),
-                                              {'id': pt_ids}):
-                if (pt['port_id'] and self._is_port_bound(pt['port_id'])
+            pts = self.get_policy_targets(context.elevated(), {'id': pt_ids})
+            bound_port_ids = self._get_bound_port_ids(
+                [pt['port_id'] for pt in pts if pt['port_id']])
+            for pt in pts:
+                if (pt['port_id'] in bound_port_ids
                         and not (self._is_service_target(context, pt['id']))):
                     raise gp_exc.PolicyTargetGroupInUse(
                         policy_target_group=policy_target_group_id)
@@ -649,13 +696,13 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
                             policy_target_group['proxy_group_id'])
 
         with session.begin(subtransactions=True):
-            for pt in self.get_policy_targets(context, {'id': pt_ids}):
-                # We will allow PTG deletion if all PTs are unused.
-                # We could have cleaned these opportunistically in
-                # the previous loop, but we will keep it simple,
-                # such that either all unused PTs are deleted
-                # or nothing is.
-                self.delete_policy_target(context, pt['id'])
+            # We will allow PTG deletion if all PTs are unused.
+            # We could have cleaned these opportunistically in
+            # the previous loop, but we will keep it simple,
+            # such that either all unused PTs are deleted
+            # or nothing is.
+            self._delete_policy_targets_bulk(
+                context, self.get_policy_targets(context, {'id': pt_ids}))
             super(GroupPolicyPlugin, self).delete_policy_target_group(
                 context, policy_target_group_id)
 
@@ -684,6 +731,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_l2_policy(self, context, l2_policy):
         self._ensure_tenant(context, l2_policy['l2_policy'])
         session = context.session
@@ -710,6 +758,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_l2_policy(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_l2_policy(self, context, l2_policy_id, l2_policy):
         session = context.session
         with session.begin(subtransactions=True):
@@ -733,6 +782,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_l2_policy(context, l2_policy_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_l2_policy(self, context, l2_policy_id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -767,6 +817,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_network_service_policy(self, context, network_service_policy):
         self._ensure_tenant(
             context, network_service_policy['network_service_policy'])
@@ -799,6 +850,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_network_service_policy(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_network_service_policy(self, context, network_service_policy_id,
                                       network_service_policy):
         session = context.session
@@ -828,6 +880,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
                                                network_service_policy_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_network_service_policy(
         self, context, network_service_policy_id):
         session = context.session
@@ -866,6 +919,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_l3_policy(self, context, l3_policy):
         self._ensure_tenant(context, l3_policy['l3_policy'])
         session = context.session
@@ -894,6 +948,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_l3_policy(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_l3_policy(self, context, l3_policy_id, l3_policy):
         session = context.session
         with session.begin(subtransactions=True):
@@ -918,6 +973,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_l3_policy(context, l3_policy_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_l3_policy(self, context, l3_policy_id, check_unused=False):
         session = context.session
         with session.begin(subtransactions=True):
@@ -957,6 +1013,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_policy_classifier(self, context, policy_classifier):
         self._ensure_tenant(context,
                             policy_classifier['policy_classifier'])
@@ -987,6 +1044,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_classifier(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_policy_classifier(self, context, id, policy_classifier):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1011,6 +1069,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_classifier(context, id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_policy_classifier(self, context, id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1046,6 +1105,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_policy_action(self, context, policy_action):
         self._ensure_tenant(context, policy_action['policy_action'])
         session = context.session
@@ -1075,6 +1135,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_action(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_policy_action(self, context, id, policy_action):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1100,6 +1161,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_action(context, id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_policy_action(self, context, id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1133,6 +1195,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_policy_rule(self, context, policy_rule):
         self._ensure_tenant(context, policy_rule['policy_rule'])
         session = context.session
@@ -1161,6 +1224,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_rule(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_policy_rule(self, context, id, policy_rule):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1184,6 +1248,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_rule(context, id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_policy_rule(self, context, id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1218,6 +1283,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_policy_rule_set(self, context, policy_rule_set):
         self._ensure_tenant(context, policy_rule_set['policy_rule_set'])
         session = context.session
@@ -1247,6 +1313,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_rule_set(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_policy_rule_set(self, context, id, policy_rule_set):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1271,6 +1338,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_policy_rule_set(context, id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_policy_rule_set(self, context, id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1304,6 +1372,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_external_segment(self, context, external_segment):
         self._ensure_tenant(context, external_segment['external_segment'])
         session = context.session
@@ -1336,6 +1405,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_external_segment(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_external_segment(self, context, external_segment_id,
                                 external_segment):
         session = context.session
@@ -1366,6 +1436,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_external_segment(context, external_segment_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_external_segment(self, context, external_segment_id):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1404,6 +1475,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_external_policy(self, context, external_policy):
         self._ensure_tenant(context, external_policy['external_policy'])
         session = context.session
@@ -1433,6 +1505,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_external_policy(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_external_policy(self, context, external_policy_id,
                                external_policy):
         session = context.session
@@ -1460,6 +1533,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_external_policy(context, external_policy_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_external_policy(self, context, external_policy_id,
                                check_unused=False):
         session = context.session
@@ -1495,6 +1569,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             marker=marker, page_reverse=page_reverse)
 
     @log.log_method_call
+    @p_context.track_request
     def create_nat_pool(self, context, nat_pool):
         self._ensure_tenant(context, nat_pool['nat_pool'])
         session = context.session
@@ -1521,6 +1596,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_nat_pool(context, result['id'])
 
     @log.log_method_call
+    @p_context.track_request
     def update_nat_pool(self, context, nat_pool_id, nat_pool):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1542,6 +1618,7 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
         return self.get_nat_pool(context, nat_pool_id)
 
     @log.log_method_call
+    @p_context.track_request
     def delete_nat_pool(self, context, nat_pool_id, check_unused=False):
         session = context.session
         with session.begin(subtransactions=True):
@@ -1575,15 +1652,20 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             filters=filters, fields=fields, sorts=sorts, limit=limit,
             marker=marker, page_reverse=page_reverse)
 
-    def _is_port_bound(self, port_id):
+    def _get_bound_port_ids(self, port_ids):
         # REVISIT(ivar): This operation shouldn't be done within a DB lock
         # once we refactor the server.
+        if not port_ids:
+            return set()
         not_bound = [portbindings.VIF_TYPE_UNBOUND,
                      portbindings.VIF_TYPE_BINDING_FAILED]
         context = n_ctx.get_admin_context()
-        port = n_manager.NeutronManager.get_plugin().get_port(context, port_id)
-        return (port.get('binding:vif_type') not in not_bound) and port.get(
-            'binding:host_id') and (port['device_owner'] or port['device_id'])
+        ports = n_manager.NeutronManager.get_plugin().get_ports(
+            context, filters={'id': port_ids})
+        return set(port['id'] for port in ports
+                   if (port.get('binding:vif_type') not in not_bound) and
+                   port.get('binding:host_id') and
+                   (port['device_owner'] or port['device_id']))
 
     def _is_service_target(self, context, pt_id):
         return bool(ncp_model.get_service_targets_count(
@@ -167,9 +167,20 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
         self._call_on_drivers("delete_policy_target_postcommit", context,
                               continue_on_failure=True)
 
+    def delete_policy_targets_bulk_precommit(self, contexts):
+        self._call_on_drivers("delete_policy_targets_bulk_precommit",
+                              contexts)
+
+    def delete_policy_targets_bulk_postcommit(self, contexts):
+        self._call_on_drivers("delete_policy_targets_bulk_postcommit",
+                              contexts, continue_on_failure=True)
+
     def get_policy_target_status(self, context):
         self._call_on_drivers("get_policy_target_status", context)
 
+    def get_policy_targets_status(self, contexts):
+        self._call_on_drivers("get_policy_targets_status", contexts)
+
     def create_policy_target_group_precommit(self, context):
         self._call_on_drivers("create_policy_target_group_precommit", context)
 
@@ -192,6 +203,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_policy_target_group_status(self, context):
         self._call_on_drivers("get_policy_target_group_status", context)
 
+    def get_policy_target_groups_status(self, contexts):
+        self._call_on_drivers("get_policy_target_groups_status", contexts)
+
     def create_l2_policy_precommit(self, context):
         self._call_on_drivers("create_l2_policy_precommit", context)
 
@@ -214,6 +228,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_l2_policy_status(self, context):
         self._call_on_drivers("get_l2_policy_status", context)
 
+    def get_l2_policies_status(self, contexts):
+        self._call_on_drivers("get_l2_policies_status", contexts)
+
     def create_l3_policy_precommit(self, context):
         self._call_on_drivers("create_l3_policy_precommit", context)
 
@@ -236,6 +253,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_l3_policy_status(self, context):
         self._call_on_drivers("get_l3_policy_status", context)
 
+    def get_l3_policies_status(self, contexts):
+        self._call_on_drivers("get_l3_policies_status", contexts)
+
     def create_network_service_policy_precommit(self, context):
         self._call_on_drivers(
             "create_network_service_policy_precommit", context)
@@ -264,6 +284,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_network_service_policy_status(self, context):
         self._call_on_drivers("get_network_service_policy_status", context)
 
+    def get_network_service_policies_status(self, contexts):
+        self._call_on_drivers("get_network_service_policies_status", contexts)
+
     def create_policy_classifier_precommit(self, context):
         self._call_on_drivers("create_policy_classifier_precommit", context)
 
@@ -286,6 +309,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_policy_classifier_status(self, context):
         self._call_on_drivers("get_policy_classifier_status", context)
 
+    def get_policy_classifiers_status(self, contexts):
+        self._call_on_drivers("get_policy_classifiers_status", contexts)
+
     def create_policy_action_precommit(self, context):
         self._call_on_drivers("create_policy_action_precommit", context)
 
@@ -308,6 +334,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_policy_action_status(self, context):
         self._call_on_drivers("get_policy_action_status", context)
 
+    def get_policy_actions_status(self, contexts):
+        self._call_on_drivers("get_policy_actions_status", contexts)
+
     def create_policy_rule_precommit(self, context):
         self._call_on_drivers("create_policy_rule_precommit", context)
 
@@ -330,6 +359,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_policy_rule_status(self, context):
         self._call_on_drivers("get_policy_rule_status", context)
 
+    def get_policy_rules_status(self, contexts):
+        self._call_on_drivers("get_policy_rules_status", contexts)
+
     def create_policy_rule_set_precommit(self, context):
         self._call_on_drivers("create_policy_rule_set_precommit", context)
 
@@ -352,6 +384,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_policy_rule_set_status(self, context):
         self._call_on_drivers("get_policy_rule_set_status", context)
 
+    def get_policy_rule_sets_status(self, contexts):
+        self._call_on_drivers("get_policy_rule_sets_status", contexts)
+
     def create_external_segment_precommit(self, context):
         self._call_on_drivers("create_external_segment_precommit",
                               context)
@@ -379,6 +414,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_external_segment_status(self, context):
         self._call_on_drivers("get_external_segment_status", context)
 
+    def get_external_segments_status(self, contexts):
+        self._call_on_drivers("get_external_segments_status", contexts)
+
     def create_external_policy_precommit(self, context):
         self._call_on_drivers("create_external_policy_precommit",
                               context)
@@ -406,6 +444,9 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
     def get_external_policy_status(self, context):
         self._call_on_drivers("get_external_policy_status", context)
 
+    def get_external_policies_status(self, contexts):
+        self._call_on_drivers("get_external_policies_status", contexts)
+
     def create_nat_pool_precommit(self, context):
         self._call_on_drivers("create_nat_pool_precommit", context)
 
@@ -427,3 +468,6 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
 
     def get_nat_pool_status(self, context):
         self._call_on_drivers("get_nat_pool_status", context)
+
+    def get_nat_pools_status(self, contexts):
+        self._call_on_drivers("get_nat_pools_status", contexts)
@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import contextlib
 import copy
 import os
 import webob.exc
@@ -26,6 +28,7 @@ from neutron.tests.unit.api import test_extensions
 from neutron.tests.unit.db import test_db_base_plugin_v2
 from oslo_utils import importutils
 from oslo_utils import uuidutils
+from sqlalchemy import event as sa_event
 
 from gbpservice.neutron.db.grouppolicy import group_policy_db as gpdb
 from gbpservice.neutron.db import servicechain_db as svcchain_db
@@ -64,6 +67,28 @@ class ApiManagerMixin(object):
 
     agent_conf = AGENT_CONF
 
+    @contextlib.contextmanager
+    def _count_queries(self, tables=None):
+        """Count the statements run within the context.
+
+        Yields a Counter of all the statements run, under None, and of
+        the statements querying each of the given tables.
+        """
+        counts = collections.Counter()
+
+        def _before_execute(conn, cursor, statement, *args):
+            counts[None] += 1
+            for table in tables or []:
+                if 'FROM %s' % table in statement:
+                    counts[table] += 1
+
+        engine = db_api.get_engine()
+        sa_event.listen(engine, 'before_cursor_execute', _before_execute)
+        try:
+            yield counts
+        finally:
+            sa_event.remove(engine, 'before_cursor_execute', _before_execute)
+
     def _test_list_resources(self, resource, items,
                              neutron_context=None,
                              query_params=None):
@@ -1225,6 +1250,46 @@ class TestGroupResources(GroupPolicyDbTestCase):
         self._test_list_resources('policy_rule_set', policy_rule_sets,
                                   query_params='description=ct')
 
+    def test_list_nested_policy_rule_sets(self):
+        ctx = context.get_admin_context()
+        children = {}
+        with ctx.session.begin(subtransactions=True):
+            for index in range(250):
+                parent_id = uuidutils.generate_uuid()
+                ctx.session.add(gpdb.PolicyRuleSet(
+                    id=parent_id, tenant_id=self._tenant_id,
+                    name='parent%d' % index, shared=False))
+                children[parent_id] = [uuidutils.generate_uuid()]
+        with ctx.session.begin(subtransactions=True):
+            for parent_id, child_ids in children.items():
+                ctx.session.add(gpdb.PolicyRuleSet(
+                    id=child_ids[0], tenant_id=self._tenant_id,
+                    name='child', parent_id=parent_id, shared=False))
+
+        # One dict at a time, looking up the children of each PRS
+        with self._count_queries() as legacy_counts:
+            legacy = self.plugin._get_collection(
+                ctx, gpdb.PolicyRuleSet,
+                self.plugin._make_policy_rule_set_dict)
+        with self._count_queries() as counts:
+            prss = self.plugin.get_policy_rule_sets(ctx)
+        self.assertEqual(500, len(prss))
+        self.assertTrue(counts[None] < 10 and
+                        counts[None] < legacy_counts[None],
+                        "listing: %d, legacy: %d statements" % (
+                            counts[None], legacy_counts[None]))
+
+        self.assertEqual(
+            sorted(legacy, key=lambda prs: prs['id']),
+            sorted(prss, key=lambda prs: prs['id']))
+        for prs in prss:
+            if prs['parent_id']:
+                self.assertEqual([], prs['child_policy_rule_sets'])
+                self.assertEqual([prs['id']], children[prs['parent_id']])
+            else:
+                self.assertEqual(children[prs['id']],
+                                 prs['child_policy_rule_sets'])
+
     def test_update_policy_rule_set(self):
         name = "new_policy_rule_set"
         description = 'new desc'
@@ -0,0 +1,129 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import ast
+import copy
+import time
+import unittest
+import zlib
+
+from gbpservice.nfp.core import codec as nfp_codec
+from gbpservice.nfp.core import event as nfp_event
+
+
+def _network_function_data(num_ports=32):
+    """Representative data of a network function create event. """
+    ports = []
+    for index in range(num_ports):
+        ports.append({
+            'id': 'port-%d' % index,
+            'port_model': 'neutron',
+            'port_classification': 'provider',
+            'port_role': 'active',
+            'mac_address': 'fa:16:3e:00:00:%02x' % index,
+            'fixed_ips': [{'ip_address': '11.0.0.%d' % index,
+                           'subnet_id': 'subnet-%d' % index}]})
+    return {
+        'resource': 'network_function',
+        'network_function': {
+            'id': 'nf-1',
+            'tenant_id': 'tenant-1',
+            'service_chain_id': 'sc-1',
+            'service_profile_id': 'profile-1',
+            'status': 'PENDING_CREATE',
+            'network_function_instances': ['nfi-1', 'nfi-2']},
+        'service_details': {
+            'service_vendor': 'vyos',
+            'service_type': 'firewall',
+            'network_mode': 'gbp',
+            'device_type': 'nova'},
+        'ports': ports}
+
+
+class Test_Event_Codec(unittest.TestCase):
+
+    def _event(self, data):
+        return nfp_event.Event(id='CREATE_NETWORK_FUNCTION', data=data)
+
+    def _test_round_trip(self, codec, data):
+        event_codec = nfp_codec.EventCodec(codec=codec)
+        event = self._event(copy.deepcopy(data))
+        event_codec.encode(event)
+        self.assertTrue(event.zipped)
+        event_codec.decode(event)
+        self.assertFalse(event.zipped)
+        self.assertEqual(data, event.data)
+
+    def test_pickle_round_trip(self):
+        self._test_round_trip('pickle', _network_function_data())
+
+    def test_msgpack_round_trip(self):
+        self._test_round_trip('msgpack', _network_function_data())
+
+    def test_pickle_preserves_types(self):
+        data = {'set': set([1, 2]), 'tuple': (1, 2), 'none': None}
+        self._test_round_trip('pickle', data)
+
+    def test_encode_is_idempotent(self):
+        event_codec = nfp_codec.EventCodec()
+        event = self._event(_network_function_data())
+        event_codec.encode(event)
+        blob = event.data
+        event_codec.encode(event)
+        self.assertEqual(blob, event.data)
+
+    def test_compress_threshold(self):
+        data = _network_function_data()
+        event_codec = nfp_codec.EventCodec(compress_threshold=1 << 20)
+        event = self._event(copy.deepcopy(data))
+        event_codec.encode(event)
+        self.assertEqual(nfp_codec.RAW, event.data[:1])
+
+        event_codec = nfp_codec.EventCodec(compress_threshold=0)
+        event = self._event(copy.deepcopy(data))
+        event_codec.encode(event)
+        self.assertEqual(nfp_codec.COMPRESSED, event.data[:1])
+        event_codec.decode(event)
+        self.assertEqual(data, event.data)
+
+    def test_unknown_codec_defaults_to_pickle(self):
+        event_codec = nfp_codec.EventCodec(codec='unknown')
+        self.assertIsInstance(event_codec._codec, nfp_codec.PickleCodec)
+
+    def _legacy_round_trip(self, data):
+        blob = zlib.compress(str({'cdata': data}))
+        return ast.literal_eval(zlib.decompress(blob))['cdata']
+
+    def _codec_round_trip(self, event_codec, data):
+        event = self._event(data)
+        event_codec.encode(event)
+        event_codec.decode(event)
+        return event.data
+
+    def _throughput(self, round_trip, data, iterations):
+        start_time = time.time()
+        for index in range(iterations):
+            round_trip(data)
+        return iterations / max(time.time() - start_time, 1e-6)
+
+    def test_encode_decode_throughput(self):
+        data = _network_function_data()
+        iterations = 500
+        legacy = self._throughput(self._legacy_round_trip, data, iterations)
+        for codec in nfp_codec.CODECS:
+            event_codec = nfp_codec.EventCodec(codec=codec)
+            events_per_sec = self._throughput(
+                lambda data: self._codec_round_trip(event_codec, data),
+                data, iterations)
+            self.assertTrue(events_per_sec > legacy,
+                            "%s: %d events/s, legacy: %d events/s" % (
+                                codec, events_per_sec, legacy))
@@ -0,0 +1,128 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import collections
+import random
+import unittest
+
+from gbpservice.nfp.core import event as nfp_event
+from oslo_config import cfg as oslo_config
+
+
+class FakeController(object):
+
+    def pipe_send(self, pipe, event):
+        pass
+
+
+class DequeCache(collections.deque):
+
+    """Cache of the dispatched events in a deque, as it used to be. """
+
+    def __setitem__(self, uuid, value):
+        self.append(uuid)
+
+    def __delitem__(self, uuid):
+        try:
+            self.remove(uuid)
+        except ValueError:
+            raise KeyError(uuid)
+
+
+class LegacyEventManager(nfp_event.NfpEventManager):
+
+    """Event manager caching the dispatched events in a deque. """
+
+    def __init__(self, *args, **kwargs):
+        super(LegacyEventManager, self).__init__(*args, **kwargs)
+        self._cache = DequeCache()
+
+
+class CountingUuid(str):
+
+    """Event uuid counting the comparisons made to look it up. """
+
+    comparisons = 0
+
+    def __eq__(self, other):
+        CountingUuid.comparisons += 1
+        return str.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = str.__hash__
+
+
+class Test_Event_Manager(unittest.TestCase):
+
+    def _event_manager(self, cls=nfp_event.NfpEventManager):
+        return cls(oslo_config.CONF, FakeController(), None, pid=1)
+
+    def _events(self, num_events):
+        return [nfp_event.Event(id='EVENT_%d' % index)
+                for index in range(num_events)]
+
+    def test_pending_events_in_dispatch_order(self):
+        event_manager = self._event_manager()
+        events = self._events(5)
+        for event in events:
+            event_manager.dispatch_event(event)
+        event_manager.pop_event(events[2])
+        # Popping twice, as on ack & on completion, is harmless
+        event_manager.pop_event(events[2])
+        event_manager.dispatch_event(events[2])
+
+        self.assertEqual(5, event_manager.get_load())
+        self.assertEqual(
+            [events[index].desc.uuid for index in [0, 1, 3, 4, 2]],
+            event_manager.get_pending_events())
+
+        new_event_manager = self._event_manager()
+        new_event_manager.init_from_event_manager(event_manager)
+        self.assertEqual(event_manager.get_pending_events(),
+                         new_event_manager.get_pending_events())
+
+    def _dispatch_and_pop(self, event_manager, events, window):
+        """Keep window events pending, completing them in random order.
+
+            Returns the number of uuid comparisons made by the cache.
+        """
+        pending = []
+        order = random.Random(0)
+        CountingUuid.comparisons = 0
+        for event in events:
+            event_manager.dispatch_event(event)
+            pending.append(event)
+            if len(pending) > window:
+                index = order.randrange(len(pending))
+                pending[index], pending[-1] = pending[-1], pending[index]
+                event_manager.pop_event(pending.pop())
+        for event in pending:
+            event_manager.pop_event(event)
+        self.assertEqual(0, event_manager.get_load())
+        self.assertEqual([], event_manager.get_pending_events())
+        return CountingUuid.comparisons
+
+    def test_dispatch_and_pop_benchmark(self):
+        events = self._events(5000)
+        for event in events:
+            event.desc.uuid = CountingUuid(event.desc.uuid)
+        legacy = self._dispatch_and_pop(
+            self._event_manager(cls=LegacyEventManager), events, 500)
+        comparisons = self._dispatch_and_pop(
+            self._event_manager(), events, 500)
+        # Events are looked up by hash, not by scanning the pending ones
+        message = ("5k events: %d uuid comparisons, legacy deque: %d" % (
+            comparisons, legacy))
+        self.assertTrue(comparisons <= len(events), message)
+        self.assertTrue(legacy > 100 * len(events), message)
@@ -0,0 +1,138 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import event as nfp_event
+from gbpservice.nfp.core import executor as nfp_executor
+import heapq
+import random
+import unittest
+
+
+class FakeManager(object):
+
+    """Runs the dispatched events against a simulated clock. """
+
+    def __init__(self, durations, sequenced=()):
+        self.durations = durations
+        self.sequenced = set(sequenced)
+        self.now = 0
+        self.inflight = []
+        self.started = {}
+        self.finished = {}
+        # Events in the order they were offered to the sequencer
+        self.checked = []
+        self.dispatched = []
+
+    def schedule_graph_event(self, uuid, graph, dispatch=True):
+        if not dispatch:
+            self.checked.append(uuid)
+        if uuid in self.sequenced:
+            self.sequenced.remove(uuid)
+            return True
+        if dispatch:
+            assert uuid not in self.started
+            self.started[uuid] = self.now
+            self.dispatched.append(uuid)
+            heapq.heappush(self.inflight,
+                           (self.now + self.durations[uuid], uuid))
+        return False
+
+    def run(self, executor):
+        while self.inflight:
+            self.now, uuid = heapq.heappop(self.inflight)
+            self.finished[uuid] = self.now
+            executor.event_complete(self.now, event=uuid)
+
+
+class Test_Event_Graph_Executor(unittest.TestCase):
+
+    def _graph(self, parents):
+        """Graph of events, parents[index] is the parent of event index. """
+        events = [nfp_event.Event(id='EVENT_%d' % index)
+                  for index in range(len(parents))]
+        graph = nfp_event.EventGraph(events[0])
+        for index in range(1, len(parents)):
+            graph.add_node(events[index], events[parents[index]])
+        return graph, [event.desc.uuid for event in events]
+
+    def _critical_path(self, parents, durations, uuids):
+        finish = [0] * len(parents)
+        # Children always come after their parent
+        for index in reversed(range(len(parents))):
+            finish[index] += durations[uuids[index]]
+            if index:
+                finish[parents[index]] = max(finish[parents[index]],
+                                             finish[index])
+        return finish[0]
+
+    def _execute(self, parents, durations=None):
+        graph, uuids = self._graph(parents)
+        if durations is None:
+            durations = dict((uuid, random.randint(1, 5)) for uuid in uuids)
+        manager = FakeManager(durations)
+        executor = nfp_executor.EventGraphExecutor(manager, graph)
+        executor.run()
+        manager.run(executor)
+
+        self.assertEqual(set(uuids), set(manager.finished))
+        for index in range(1, len(parents)):
+            # Parent starts only after all its children complete
+            self.assertTrue(manager.started[uuids[parents[index]]] >=
+                            manager.finished[uuids[index]])
+        self.assertEqual(self._critical_path(parents, durations, uuids),
+                         manager.finished[uuids[0]])
+        return graph, uuids
+
+    def test_ready_nodes_run_in_parallel(self):
+        parents = [None] + [random.randrange(index)
+                            for index in range(1, 1000)]
+        self._execute(parents)
+
+    def test_deep_graph(self):
+        parents = [None] + list(range(999))
+        self._execute(parents)
+
+    def test_leaf_node_results(self):
+        graph, uuids = self._execute([None, 0, 0, 1])
+        event = nfp_event.Event(id='EVENT_0')
+        event.desc.uuid = uuids[0]
+        results = graph.get_leaf_node_results(event)
+        self.assertEqual(['EVENT_1', 'EVENT_2'],
+                         sorted(result.id for result in results))
+
+    def test_sequenced_node(self):
+        graph, uuids = self._graph([None, 0, 1, 1])
+        durations = dict((uuid, 1) for uuid in uuids)
+        manager = FakeManager(durations, sequenced=[uuids[1]])
+        executor = nfp_executor.EventGraphExecutor(manager, graph)
+        executor.run()
+        # Children of the sequenced event wait for it to desequence
+        self.assertEqual({}, manager.started)
+        executor.run(event=uuids[1])
+        manager.run(executor)
+        self.assertEqual(2, manager.finished[uuids[1]])
+        self.assertEqual(3, manager.finished[uuids[0]])
+
+    def test_siblings_run_in_order_added(self):
+        parents = [None] + [0] * 50
+        graph, uuids = self._graph(parents)
+        durations = dict((uuid, 1) for uuid in uuids)
+        manager = FakeManager(durations)
+        executor = nfp_executor.EventGraphExecutor(manager, graph)
+        executor.run()
+        # Siblings are offered to the sequencer and dispatched in the
+        # order they were added to the graph, e.g. device configuration
+        # must be sequenced before user config on the same binding key.
+        self.assertEqual(uuids, manager.checked)
+        self.assertEqual(uuids[1:], manager.dispatched)
+        manager.run(executor)
+        self.assertEqual(uuids[1:] + uuids[:1], manager.dispatched)
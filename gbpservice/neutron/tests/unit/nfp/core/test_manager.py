@@ -0,0 +1,214 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import event as nfp_event
+from gbpservice.nfp.core import manager as nfp_manager
+import multiprocessing
+from oslo_config import cfg as oslo_config
+import random
+import time
+import unittest
+
+
+def _echo_worker(pipe):
+    """Worker sending back every message it receives. """
+    while True:
+        try:
+            message = pipe.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        pipe.send(message)
+
+
+class FakeController(object):
+
+    def pipe_recv(self, pipe):
+        return pipe.recv()
+
+    def pipe_send(self, pipe, event):
+        pass
+
+    def get_childrens(self):
+        return {}
+
+
+def _legacy_event_watcher(manager):
+    """Event watcher polling each worker pipe in turn. """
+    events = manager._event_sequencer.run()
+    for pid, event_manager in manager._resource_map.iteritems():
+        events += event_manager.event_watcher(timeout=0.01)
+    manager.process_events(events)
+
+
+class Test_Event_Watcher(unittest.TestCase):
+
+    def _fork_workers(self, manager, num_workers):
+        pipes = []
+        for index in range(num_workers):
+            parent_pipe, child_pipe = multiprocessing.Pipe(duplex=True)
+            proc = multiprocessing.Process(target=_echo_worker,
+                                           args=(child_pipe,))
+            proc.daemon = True
+            proc.start()
+            self.addCleanup(proc.join)
+            self.addCleanup(parent_pipe.send, None)
+            manager.new_child(proc.pid, parent_pipe)
+            pipes.append(parent_pipe)
+        return pipes
+
+    def _dispatch_latency(self, num_workers, event_watcher, rounds=10):
+        """Average time for an event from a worker to be processed. """
+        manager = nfp_manager.NfpResourceManager(
+            oslo_config.CONF, FakeController())
+        received = []
+        manager.process_events = received.extend
+        pipes = self._fork_workers(manager, num_workers)
+
+        latency = 0
+        for index in range(rounds):
+            del received[:]
+            start_time = time.time()
+            pipes[index % num_workers].send(index)
+            while not received:
+                event_watcher(manager)
+            latency += time.time() - start_time
+            self.assertEqual([index], received)
+        return latency / rounds
+
+    def test_dispatch_latency(self):
+        event_watcher = nfp_manager.NfpResourceManager._event_watcher
+        latencies = {}
+        for num_workers in [1, 4, 16]:
+            latencies[num_workers] = (
+                self._dispatch_latency(num_workers, event_watcher),
+                self._dispatch_latency(num_workers, _legacy_event_watcher))
+        message = ', '.join(
+            "%d workers: %.4fs (legacy %.4fs)" % (
+                num_workers, latencies[num_workers][0],
+                latencies[num_workers][1])
+            for num_workers in sorted(latencies))
+        # Legacy watcher waits on every idle pipe in turn
+        self.assertTrue(latencies[16][0] < latencies[16][1], message)
+        self.assertTrue(latencies[16][0] < 0.01 * 15, message)
+
+    def test_drains_all_ready_workers(self):
+        manager = nfp_manager.NfpResourceManager(
+            oslo_config.CONF, FakeController())
+        received = []
+        manager.process_events = received.extend
+        pipes = self._fork_workers(manager, 4)
+        for index, pipe in enumerate(pipes):
+            pipe.send(index)
+            pipe.send(index)
+
+        deadline = time.time() + 5
+        while len(received) < 8 and time.time() < deadline:
+            manager._event_watcher()
+        self.assertEqual([0, 0, 1, 1, 2, 2, 3, 3], sorted(received))
+
+
+def _legacy_dispatch_event(manager, event):
+    """Dispatch with a linear scan for the least loaded worker. """
+    load_info = []
+    for pid, event_manager in manager._resource_map.iteritems():
+        load_info.append([event_manager, event_manager.get_load(), pid])
+    minloaded = min(load_info, key=lambda x: x[1])
+    minloaded[0].dispatch_event(event)
+
+
+class Test_Worker_Load(unittest.TestCase):
+
+    def _manager(self, weights):
+        manager = nfp_manager.NfpResourceManager(
+            oslo_config.CONF, FakeController())
+        for pid, weight in enumerate(weights):
+            manager.new_child(pid + 1, None, weight=weight)
+        return manager
+
+    def _loads(self, manager):
+        return [manager._resource_map[pid].get_load()
+                for pid in sorted(manager._resource_map)]
+
+    def _dispatch(self, manager, num_events):
+        events = [nfp_event.Event(id='EVENT_%d' % index)
+                  for index in range(num_events)]
+        for event in events:
+            loads = dict(
+                (pid, float(event_manager.get_load()) / event_manager.weight)
+                for pid, event_manager in manager._resource_map.iteritems())
+            manager._dispatch_event(event)
+            # Always dispatched to one of the least loaded workers
+            self.assertEqual(min(loads.values()), loads[event.desc.worker])
+        return events
+
+    def _complete(self, manager, event):
+        event_manager = manager._get_event_manager(event.desc.worker)
+        # Popped on ack and again on completion
+        manager._pop_event(event_manager, event)
+        manager._pop_event(event_manager, event)
+
+    def test_balanced_dispatch(self):
+        manager = self._manager([1] * 8)
+        pending = []
+        for step in range(2000):
+            pending.extend(self._dispatch(manager, random.randint(0, 3)))
+            random.shuffle(pending)
+            for index in range(random.randint(0, min(len(pending), 3))):
+                self._complete(manager, pending.pop())
+            self.assertEqual(len(pending), sum(self._loads(manager)))
+        for event in pending:
+            self._complete(manager, event)
+        self.assertEqual([0] * 8, self._loads(manager))
+        # Equally loaded workers are picked in turn
+        self._dispatch(manager, 8)
+        self.assertEqual([1] * 8, self._loads(manager))
+
+    def test_weighted_dispatch(self):
+        manager = self._manager([1, 2, 4, 1])
+        self._dispatch(manager, 800)
+        self.assertEqual([100, 200, 400, 100], self._loads(manager))
+
+    def test_dead_worker_replaced(self):
+        manager = self._manager([1, 2])
+        events = self._dispatch(manager, 30)
+        manager._controller.get_childrens = lambda: {
+            2: None, 3: type('Wrap', (object,), {
+                'child_pipe_map': {3: None}})()}
+        manager._child_snapshot = [1, 2]
+        for event in events:
+            manager._event_cache[event.desc.uuid] = event
+        manager._child_watcher()
+        self.assertEqual([2, 3], sorted(manager._resource_map))
+        self.assertEqual(1, manager._resource_map[3].weight)
+        # Events pending with the dead worker are replayed to the new one
+        self.assertEqual([20, 10], self._loads(manager))
+        self._dispatch(manager, 30)
+        self.assertEqual([40, 20], self._loads(manager))
+
+    def _dispatch_cost(self, dispatch, num_events):
+        manager = self._manager([1] * 64)
+        events = [nfp_event.Event(id='EVENT_%d' % index)
+                  for index in range(num_events)]
+        start_time = time.time()
+        for event in events:
+            dispatch(manager, event)
+        return (time.time() - start_time) / num_events
+
+    def test_dispatch_cost_benchmark(self):
+        dispatch = nfp_manager.NfpResourceManager._dispatch_event
+        cost = self._dispatch_cost(dispatch, 20000)
+        legacy = self._dispatch_cost(_legacy_dispatch_event, 20000)
+        self.assertTrue(cost < legacy,
+                        "64 workers: %.2fus per dispatch, legacy %.2fus" % (
+                            cost * 1e6, legacy * 1e6))
@@ -0,0 +1,81 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import poll as nfp_poll
+from oslo_config import cfg as oslo_config
+import time
+import unittest
+
+
+class Test_Poll_Handler(unittest.TestCase):
+
+    def setUp(self):
+        self.fired = []
+        self.handler = nfp_poll.NfpPollHandler(oslo_config.CONF)
+
+    def _timedout(self, event):
+        self.fired.append(event)
+
+    def test_run_with_no_events(self):
+        self.assertIsNone(self.handler.run())
+        self.assertEqual([], self.fired)
+
+    def test_run_fires_only_expired_events(self):
+        now = time.time()
+        self.handler.timefunc = lambda: now
+        self.handler.poll_add('EVENT_1', 1, self._timedout)
+        self.handler.poll_add('EVENT_2', 3, self._timedout)
+
+        self.assertEqual(1, self.handler.run())
+        self.assertEqual([], self.fired)
+
+        now += 1
+        self.assertEqual(2, self.handler.run())
+        self.assertEqual(['EVENT_1'], self.fired)
+
+        now += 2
+        self.assertIsNone(self.handler.run())
+        self.assertEqual(['EVENT_1', 'EVENT_2'], self.fired)
+
+    def test_run_does_not_fire_events_added_by_action(self):
+        def _repoll(event):
+            self.fired.append(event)
+            self.handler.poll_add(event, 0, _repoll)
+
+        self.handler.poll_add('EVENT_1', 0, _repoll)
+        self.assertEqual(0, self.handler.run())
+        self.assertEqual(['EVENT_1'], self.fired)
+
+    def test_run_continues_after_failed_action(self):
+        def _failed(event):
+            raise Exception("Failed")
+
+        self.handler.poll_add('EVENT_1', 0, _failed)
+        self.handler.poll_add('EVENT_2', 0, self._timedout)
+        self.handler.run()
+        self.assertEqual(['EVENT_2'], self.fired)
+
+    def test_10k_timers_fire_within_spacing(self):
+        spacing = 1
+        num_events = 10000
+        start_time = time.time()
+        for index in range(num_events):
+            self.handler.poll_add(index, spacing, self._timedout)
+        last_deadline = time.time() + spacing
+
+        # Single wakeup after the last deadline must fire all timers
+        time.sleep(max(last_deadline - time.time(), 0))
+        self.handler.run()
+        end_time = time.time()
+
+        self.assertEqual(list(range(num_events)), sorted(self.fired))
+        self.assertTrue(end_time - (start_time + spacing) < spacing)
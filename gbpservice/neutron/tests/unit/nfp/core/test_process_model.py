@@ -18,6 +18,7 @@ import mock
 import multiprocessing as multiprocessing
 from oslo_config import cfg as oslo_config
 from oslo_log import log as oslo_logging
+import os
 import random
 import time
 import unittest
@@ -62,6 +63,10 @@ class ForkedPdb(pdb.Pdb):
             sys.stdin = _stdin
 
 
+# Read end of a pipe never written to, never ready for select
+IDLE_PIPE_FD = os.pipe()[0]
+
+
 class MockedPipe(object):
 
     def __init__(self):
@@ -71,6 +76,9 @@ class MockedPipe(object):
     def poll(self, *args, **kwargs):
         return False
 
+    def fileno(self):
+        return IDLE_PIPE_FD
+
     def send(self, event):
         self.other_end_event_proc_func(event)
 
@@ -101,7 +109,12 @@ class MockedProcess(object):
         self.parent_pipe.other_end_event_proc_func = (
             self.worker._process_event)
         self.child_pipe.other_end_event_proc_func = (
-            self.controller._process_event)
+            self._distributor_recv)
+
+    def _distributor_recv(self, event):
+        # Event data is decoded on recv from a real pipe
+        self.controller.decompress(event)
+        self.controller._process_event(event)
 
 
 def mocked_pipe(**kwargs):
@@ -829,5 +842,32 @@ class Test_Process_Model(unittest.TestCase):
         called = controller.poll_event_poll_cancel_wait_obj.is_set()
         self.assertTrue(called)
 
+    def test_stashed_events_drain(self):
+        conf = oslo_config.CONF
+        conf.nfp_modules_path = []
+        controller = nfp_controller.NfpController(conf)
+        # Only workers can stash events
+        controller.PROCESS_TYPE = "worker"
+        num_events = 5000
+        for index in range(num_events):
+            event = controller.create_event(
+                id='STASH_EVENT', data={'notification': index})
+            controller.stash_event(event)
+
+        events = []
+        calls = 0
+        start_time = time.time()
+        while len(events) < num_events and time.time() - start_time < 30:
+            events += controller.get_stashed_events(max_events=1000)
+            calls += 1
+        elapsed = time.time() - start_time
+        self.assertEqual(range(num_events),
+                         [event.data['notification'] for event in events])
+        # One event per call, as before, would take 5000 calls
+        self.assertTrue(calls < 100, "%d calls" % (calls))
+        self.assertTrue(elapsed < 10, "drained in %.2fs" % (elapsed))
+        self.assertEqual([], controller.get_stashed_events(
+            max_events=1000, timeout=0))
+
 if __name__ == '__main__':
     unittest.main()
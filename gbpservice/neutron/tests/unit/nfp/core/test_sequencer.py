@@ -0,0 +1,107 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import event as nfp_event
+from gbpservice.nfp.core import sequencer as nfp_sequencer
+import random
+import time
+import unittest
+
+
+class LegacyEventSequencer(nfp_sequencer.EventSequencer):
+
+    """Sequencer walking all the sequencers on every run. """
+
+    def run(self):
+        events = []
+        for key, sequencer in self._sequencer.items():
+            try:
+                event = sequencer.run()
+                event.sequence = False
+                events.append(event)
+            except nfp_sequencer.SequencerBusy:
+                pass
+            except nfp_sequencer.SequencerEmpty:
+                del self._sequencer[key]
+        return events
+
+
+class Test_Event_Sequencer(unittest.TestCase):
+
+    def _event(self, key, index):
+        return nfp_event.Event(id='EVENT_%d' % index, binding_key=key,
+                               serialize=True)
+
+    def test_events_scheduled_in_order(self):
+        sequencer = nfp_sequencer.EventSequencer()
+        events = [self._event('key1', index) for index in range(3)]
+        other = self._event('key2', 3)
+        for event in events:
+            sequencer.sequence('key1', event)
+        sequencer.sequence('key2', other)
+
+        self.assertEqual(set([events[0], other]), set(sequencer.run()))
+        # Nothing released, nothing to schedule
+        self.assertEqual([], sequencer.run())
+        # Release of an event not scheduled is ignored
+        sequencer.release('key1', events[2])
+        self.assertEqual([], sequencer.run())
+
+        sequencer.release('key1', events[0])
+        self.assertEqual([events[1]], sequencer.run())
+        sequencer.release('key1', events[1])
+        self.assertEqual([events[2]], sequencer.run())
+        sequencer.release('key1', events[2])
+        sequencer.release('key2', other)
+        self.assertEqual([], sequencer.run())
+        self.assertEqual({}, sequencer._sequencer)
+
+        # Sequenced after the key was emptied
+        sequencer.sequence('key1', events[0])
+        self.assertEqual([events[0]], sequencer.run())
+
+    def _run_ticks(self, sequencer, num_keys, active, ticks):
+        """Release events of active keys per tick, run the sequencer.
+
+            Every key has an event in progress & one waiting.
+        """
+        keys = ['key%d' % index for index in range(num_keys)]
+        scheduled = {}
+        for index, key in enumerate(keys):
+            sequencer.sequence(key, self._event(key, index))
+            sequencer.sequence(key, self._event(key, index))
+        for event in sequencer.run():
+            scheduled[event.binding_key] = event
+        self.assertEqual(num_keys, len(scheduled))
+
+        elapsed = 0
+        for tick in range(ticks):
+            released = random.sample(keys, active)
+            for key in released:
+                sequencer.release(key, scheduled[key])
+                sequencer.sequence(key, self._event(key, tick))
+            start_time = time.time()
+            events = sequencer.run()
+            elapsed += time.time() - start_time
+            self.assertEqual(sorted(released),
+                             sorted(event.binding_key for event in events))
+            for event in events:
+                scheduled[event.binding_key] = event
+        return elapsed / ticks
+
+    def test_run_benchmark(self):
+        cost = self._run_ticks(
+            nfp_sequencer.EventSequencer(), 10000, 100, 100)
+        legacy = self._run_ticks(LegacyEventSequencer(), 10000, 100, 100)
+        self.assertTrue(cost < legacy,
+                        "10k keys, 1%% active: %.3fms per run, "
+                        "legacy %.3fms" % (cost * 1e3, legacy * 1e3))
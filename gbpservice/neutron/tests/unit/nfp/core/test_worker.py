@@ -0,0 +1,129 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import event as nfp_event
+from gbpservice.nfp.core import worker as nfp_worker
+import multiprocessing
+import threading
+import time
+import unittest
+
+
+class FakeConf(object):
+
+    def __init__(self, batch_size, batch_timeout=0.01):
+        self.event_ack_batch_size = batch_size
+        self.event_ack_batch_timeout = batch_timeout
+
+
+class FakeEventHandler(object):
+
+    def handle_event(self, event):
+        pass
+
+
+class FakeEventHandlers(object):
+
+    def get_event_handler(self, event_id, module=None):
+        return FakeEventHandler(), None
+
+
+class FakeController(object):
+
+    def get_event_handlers(self):
+        return FakeEventHandlers()
+
+    def pipe_recv(self, pipe):
+        return pipe.recv()
+
+    def pipe_send(self, pipe, event):
+        pipe.send(event)
+
+
+def _run_worker(pipe, conf):
+    worker = nfp_worker.NfpWorker(conf, threads=0)
+    worker.pipe = pipe
+    worker.controller = FakeController()
+    worker.start()
+
+
+class Test_Worker_Acks(unittest.TestCase):
+
+    def _fork_worker(self, conf):
+        parent_pipe, child_pipe = multiprocessing.Pipe(duplex=True)
+        proc = multiprocessing.Process(target=_run_worker,
+                                       args=(child_pipe, conf))
+        proc.daemon = True
+        proc.start()
+        self.addCleanup(proc.join)
+        self.addCleanup(proc.terminate)
+        return parent_pipe
+
+    def _events(self, num_events):
+        events = []
+        for index in range(num_events):
+            event = nfp_event.Event(id='EVENT_%d' % index)
+            event.desc.type = nfp_event.SCHEDULE_EVENT
+            event.desc.flag = nfp_event.EVENT_NEW
+            events.append(event)
+        return events
+
+    def _recv_acks(self, pipe, num_events, acked, messages):
+        while len(acked) < num_events:
+            if not pipe.poll(30):
+                return
+            event = pipe.recv()
+            messages.append(event)
+            if event.desc.flag == nfp_event.EVENT_ACKS:
+                acked.extend(event.data)
+            elif event.desc.flag == nfp_event.EVENT_ACK:
+                acked.append(event.desc.uuid)
+
+    def _throughput(self, conf, num_events):
+        """Events/s acked by one worker to the distributor. """
+        pipe = self._fork_worker(conf)
+        events = self._events(num_events)
+        acked = []
+        messages = []
+        reader = threading.Thread(target=self._recv_acks,
+                                  args=(pipe, num_events, acked, messages))
+        reader.daemon = True
+        start_time = time.time()
+        reader.start()
+        for event in events:
+            pipe.send(event)
+        reader.join()
+        elapsed = time.time() - start_time
+        self.assertEqual(sorted(event.desc.uuid for event in events),
+                         sorted(acked))
+        return num_events / elapsed, len(messages)
+
+    def test_single_event_acked_without_waiting(self):
+        pipe = self._fork_worker(FakeConf(64, batch_timeout=60))
+        event = self._events(1)[0]
+        pipe.send(event)
+        self.assertTrue(pipe.poll(5))
+        ack = pipe.recv()
+        self.assertEqual(nfp_event.EVENT_ACKS, ack.desc.flag)
+        self.assertEqual([event.desc.uuid], ack.data)
+
+    def test_ack_batching_benchmark(self):
+        unbatched, unbatched_messages = self._throughput(
+            FakeConf(1), 20000)
+        batched, batched_messages = self._throughput(
+            FakeConf(64), 20000)
+        message = ("20k events: %d events/s in %d ack messages, "
+                   "unbatched %d events/s in %d ack messages") % (
+            batched, batched_messages, unbatched, unbatched_messages)
+        self.assertEqual(20000, unbatched_messages, message)
+        self.assertTrue(batched_messages < unbatched_messages, message)
+        self.assertTrue(batched > unbatched, message)
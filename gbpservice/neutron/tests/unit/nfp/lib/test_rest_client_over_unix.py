@@ -0,0 +1,186 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from gbpservice.nfp.lib import rest_client_over_unix as unix_rc
+import os
+from oslo_config import cfg
+from oslo_serialization import jsonutils
+import shutil
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+import tempfile
+import threading
+import time
+import unittest
+import zlib
+
+
+class CountingUnixHTTPServer(socketserver.ThreadingMixIn,
+                             socketserver.UnixStreamServer):
+    """Local unix socket rest server counting the connections. """
+
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        socketserver.UnixStreamServer.__init__(self, *args, **kwargs)
+        self.connections = 0
+        self.content_types = []
+        self.posts = 0
+        # Close the connection after the response, without telling
+        self.drop = False
+        # Reset the connection instead of responding to a POST
+        self.reset = False
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        socketserver.ThreadingMixIn.process_request(
+            self, request, client_address)
+
+
+class ConfigHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self):
+        body = zlib.compress(jsonutils.dumps({'success': True}))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.drop:
+            self.close_connection = True
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type')
+        self.server.content_types.append(content_type)
+        self.server.posts += 1
+        if self.server.reset:
+            self.close_connection = True
+            return
+        if content_type != 'application/json':
+            body = zlib.decompress(body)
+        jsonutils.loads(body)
+        self._respond()
+
+    def address_string(self):
+        return self.server.server_address
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixRestClientTest(unittest.TestCase):
+
+    def setUp(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.socket_path = os.path.join(tempdir, 'uds_socket')
+        self.server = CountingUnixHTTPServer(self.socket_path,
+                                             ConfigHandler)
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(unix_rc.UnixRestClient._pools.clear)
+        self._set_override('unix_socket_path', self.socket_path)
+
+    def _set_override(self, name, value):
+        cfg.CONF.set_override(name, value, 'REST')
+        self.addCleanup(cfg.CONF.clear_override, name, 'REST')
+
+    def _benchmark(self, body, num_requests):
+        unix_rc.UnixRestClient._pools.clear()
+        self.server.connections = 0
+        start_time = time.time()
+        for index in range(num_requests):
+            resp, content = unix_rc.post('create_network_function_config',
+                                         body)
+            self.assertEqual(200, resp.status)
+            self.assertEqual({'success': True}, jsonutils.loads(content))
+        requests_per_sec = num_requests / max(time.time() - start_time,
+                                              1e-6)
+        return requests_per_sec, self.server.connections
+
+    def test_pool_reuses_connections(self):
+        num_requests = 200
+        payloads = {'small': {'config': 'x' * 64},
+                    'large': {'config': 'x' * (1 << 16)}}
+        results = {}
+        for name, body in payloads.items():
+            # No connection kept alive, a new one for every request
+            self._set_override('unix_pool_maxsize', 0)
+            legacy = self._benchmark(body, num_requests)
+            self._set_override('unix_pool_maxsize', 10)
+            results[name] = (self._benchmark(body, num_requests), legacy)
+        message = ', '.join(
+            "%s: %d requests/s over %d connections, "
+            "legacy: %d requests/s over %d connections" % (
+                name, results[name][0][0], results[name][0][1],
+                results[name][1][0], results[name][1][1])
+            for name in sorted(results))
+        for name in results:
+            self.assertEqual(1, results[name][0][1], message)
+            self.assertEqual(num_requests, results[name][1][1], message)
+        self.assertTrue(results['small'][0][0] > results['small'][1][0],
+                        message)
+
+    def test_small_bodies_not_compressed(self):
+        self._set_override('unix_compress_threshold', 1024)
+        unix_rc.post('create_network_function_config', {'config': 'x'})
+        unix_rc.post('create_network_function_config',
+                     {'config': 'x' * 2048})
+        self.assertEqual(['application/json', 'application/octet-stream'],
+                         self.server.content_types)
+
+    def test_get(self):
+        resp, content = unix_rc.get('get_notifications')
+        self.assertEqual(200, resp.status)
+        self.assertEqual({'success': True}, jsonutils.loads(content))
+
+    def test_bodies_compressed_by_default(self):
+        unix_rc.post('create_network_function_config', {'config': 'x'})
+        self.assertEqual(['application/octet-stream'],
+                         self.server.content_types)
+
+    def test_new_connection_for_dropped_idle_connection(self):
+        self.server.drop = True
+        unix_rc.get('get_notifications')
+        # Idle connection was closed by the server, a new one is used
+        resp, content = unix_rc.get('get_notifications')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(2, self.server.connections)
+
+    def test_retry_on_dropped_idle_connection(self):
+        unix_rc.get('get_notifications')
+        pool = unix_rc.UnixRestClient._pools[self.socket_path]
+        # Idle connection is gone, request is retried on a new one
+        for conn in pool._idle:
+            conn.sock.close()
+        resp, content = unix_rc.get('get_notifications')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(2, self.server.connections)
+
+    def test_no_retry_once_request_is_written(self):
+        unix_rc.get('get_notifications')
+        self.server.reset = True
+        # Server could have processed the request, it is not resent
+        self.assertRaises(unix_rc.RestClientException, unix_rc.post,
+                          'create_network_function_config', {})
+        self.assertEqual(1, self.server.posts)
+        self.assertEqual(1, self.server.connections)
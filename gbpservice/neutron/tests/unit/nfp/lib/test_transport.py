@@ -15,7 +15,13 @@ import mock
 from neutron.common import rpc as n_rpc
 from neutron import context as ctx
 from oslo_config import cfg
+import oslo_messaging as messaging
 from oslo_serialization import jsonutils
+import requests
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+import threading
+import time
 import unittest
 
 """
@@ -175,5 +181,169 @@ class CommonLibraryTest(unittest.TestCase):
 
             transport.get_response_from_configurator(conf)
 
+
+class CountingHTTPServer(socketserver.ThreadingMixIn,
+                         BaseHTTPServer.HTTPServer):
+    """Local rest server counting the connections accepted. """
+
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        BaseHTTPServer.HTTPServer.__init__(self, *args, **kwargs)
+        self.connections = 0
+        # Number of connections to reset without a response
+        self.resets = 0
+        self.posts = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        socketserver.ThreadingMixIn.process_request(
+            self, request, client_address)
+
+
+class NotificationHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.server.resets:
+            self.server.resets -= 1
+            self.close_connection = True
+            return
+        body = b'[]'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.posts += 1
+        # Request is processed, but the connection is reset
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class RestApiSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CountingHTTPServer(('127.0.0.1', 0),
+                                         NotificationHandler)
+        self.port = self.server.server_address[1]
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(transport.RestApi._sessions.clear)
+
+    def _benchmark(self, get, num_requests):
+        self.server.connections = 0
+        start_time = time.time()
+        for index in range(num_requests):
+            self.assertEqual(200, get('get_notifications').status_code)
+        requests_per_sec = num_requests / max(time.time() - start_time,
+                                              1e-6)
+        return requests_per_sec, self.server.connections
+
+    def test_session_reuses_connections(self):
+        num_requests = 200
+        url = 'http://127.0.0.1:%d/v1/nfp/%%s' % self.port
+        legacy_rps, legacy_connections = self._benchmark(
+            lambda path: requests.get(url % path), num_requests)
+
+        rest_api = transport.RestApi('127.0.0.1', self.port)
+        rps, connections = self._benchmark(rest_api.get, num_requests)
+        message = ("session: %d requests/s over %d connections, "
+                   "legacy: %d requests/s over %d connections" % (
+                       rps, connections, legacy_rps, legacy_connections))
+        self.assertEqual(num_requests, legacy_connections, message)
+        self.assertEqual(1, connections, message)
+
+    def test_session_shared_per_server(self):
+        rest_api = transport.RestApi('127.0.0.1', self.port)
+        self.assertIs(rest_api.session,
+                      transport.RestApi('127.0.0.1', self.port).session)
+        self.assertIsNot(rest_api.session,
+                         transport.RestApi('127.0.0.2', self.port).session)
+
+    def test_retry_on_connection_reset(self):
+        rest_api = transport.RestApi('127.0.0.1', self.port,
+                                     retry_backoff_factor=0)
+        self.server.resets = 2
+        self.assertEqual(200, rest_api.get('get_notifications').status_code)
+        self.assertEqual(3, self.server.connections)
+
+    def test_no_retry_of_post_on_connection_reset(self):
+        rest_api = transport.RestApi('127.0.0.1', self.port,
+                                     retry_backoff_factor=0)
+        self.assertRaises(requests.ConnectionError, rest_api.post,
+                          'create_network_function_config', {},
+                          'CREATE')
+        self.assertEqual(1, self.server.posts)
+
+
+class RPCClientPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        fake_transport = messaging.get_transport(cfg.CONF, 'fake:///')
+        self.addCleanup(fake_transport.cleanup)
+        patcher = mock.patch.object(n_rpc, 'TRANSPORT', fake_transport)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(transport.RPCClient._clients.clear)
+        self.conf = Map(backend='rpc', RPC=Map(topic='topic'))
+
+    def _body(self):
+        return {'info': {'context': {}},
+                'config': [{'resource': 'heat', 'resource_data': {}}]}
+
+    def _benchmark(self, num_requests):
+        context = TestContext().get_context()
+        with mock.patch.object(
+                n_rpc, 'get_client', wraps=n_rpc.get_client) as get_client:
+            start_time = time.time()
+            for index in range(num_requests):
+                transport.send_request_to_configurator(
+                    self.conf, context, self._body(), 'CREATE')
+            calls_per_sec = num_requests / max(time.time() - start_time,
+                                               1e-6)
+        return calls_per_sec, get_client.call_count
+
+    def test_client_reused_across_requests(self):
+        num_requests = 10000
+        calls_per_sec, clients = self._benchmark(num_requests)
+        # Client built for every request, as before the pooling
+        with mock.patch.object(transport.RPCClient, 'get',
+                               side_effect=transport.RPCClient):
+            legacy_calls_per_sec, legacy_clients = self._benchmark(
+                num_requests)
+        message = ("pooled: %d calls/s with %d clients, "
+                   "legacy: %d calls/s with %d clients" % (
+                       calls_per_sec, clients,
+                       legacy_calls_per_sec, legacy_clients))
+        self.assertEqual(1, clients, message)
+        self.assertEqual(num_requests, legacy_clients, message)
+        self.assertTrue(calls_per_sec > legacy_calls_per_sec, message)
+
+    def test_client_per_topic(self):
+        client = transport.RPCClient.get('topic')
+        self.assertIs(client, transport.RPCClient.get('topic'))
+        self.assertIsNot(client, transport.RPCClient.get('other_topic'))
+
+    def test_context_serialized_once(self):
+        context = TestContext().get_context()
+        body = self._body()
+        with mock.patch.object(context, 'to_dict',
+                               wraps=context.to_dict) as to_dict:
+            transport.send_request_to_configurator(
+                self.conf, context, body, 'CREATE')
+        self.assertEqual(1, to_dict.call_count)
+        self.assertIs(body['info']['context']['neutron_context'],
+                      body['config'][0]['resource_data']['neutron_context'])
+
 if __name__ == '__main__':
     unittest.main()
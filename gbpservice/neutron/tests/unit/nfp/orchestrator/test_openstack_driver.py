@@ -10,8 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
 import mock
 from oslo_config import cfg
+from oslo_utils import timeutils
 import unittest
 
 from gbpclient.v2_0 import client as gbp_client
@@ -672,3 +674,79 @@ class TestGBPClient(SampleData):
         self.assertEqual(retval, obj)
         mock_obj.assert_called_once_with(token=self.AUTH_TOKEN,
                                          endpoint_url=self.ENDPOINT_URL)
+
+
+class FakeKeystone(object):
+    """Fake keystone v2 client counting the tokens fetched per tenant."""
+
+    fetched = {}
+    lifetime = 3600
+
+    def __init__(self, username=None, password=None, tenant_name=None,
+                 tenant_id=None, auth_url=None, token=None):
+        tenant = tenant_id or tenant_name
+        count = FakeKeystone.fetched.get(tenant, 0) + 1
+        FakeKeystone.fetched[tenant] = count
+        self.auth_token = 'token-%s-%d' % (tenant, count)
+        self.auth_ref = mock.Mock(expires=timeutils.utcnow(
+            with_timezone=True) + datetime.timedelta(
+                seconds=FakeKeystone.lifetime))
+
+
+@mock.patch.object(identity_client, "Client", new=FakeKeystone)
+class TestTokenCache(SampleData):
+
+    def setUp(self):
+        FakeKeystone.fetched = {}
+        FakeKeystone.lifetime = 3600
+        self.keystone_obj = openstack_driver.KeystoneClient(cfg.CONF)
+        self.nova_obj = openstack_driver.NovaClient(cfg.CONF)
+        self.neutron_obj = openstack_driver.NeutronClient(cfg.CONF)
+
+    def _get_token(self, tenant_name):
+        return self.keystone_obj.get_scoped_keystone_token(
+            self.USERNAME, self.PASSWORD, tenant_name)
+
+    @mock.patch.object(neutron_client, "Client")
+    @mock.patch.object(nova_client, "Client")
+    def test_one_token_per_tenant(self, nova_obj, neutron_obj):
+        tenants = ['tenant-%d' % index for index in range(4)]
+        for index in range(100):
+            tenant = tenants[index % len(tenants)]
+            token = self._get_token(tenant)
+            self.neutron_obj.get_port(token, self.PORT_ID)
+            self.nova_obj.get_instance(token, tenant, self.INSTANCE_ID)
+
+        self.assertEqual(dict.fromkeys(tenants, 1), FakeKeystone.fetched)
+        # One pooled client per tenant and service
+        self.assertEqual(len(tenants), nova_obj.call_count)
+        self.assertEqual(len(tenants), neutron_obj.call_count)
+
+    def test_token_refreshed_before_expiry(self):
+        margin = cfg.CONF.nfp_keystone_authtoken.token_refresh_margin
+        FakeKeystone.lifetime = margin - 1
+        token = self._get_token(self.TENANT_NAME)
+        self.assertNotEqual(token, self._get_token(self.TENANT_NAME))
+        self.assertEqual(2, FakeKeystone.fetched[self.TENANT_NAME])
+
+        FakeKeystone.lifetime = margin + 60
+        token = self._get_token(self.TENANT_NAME)
+        self.assertEqual(token, self._get_token(self.TENANT_NAME))
+        self.assertEqual(3, FakeKeystone.fetched[self.TENANT_NAME])
+
+    @mock.patch.object(neutron_client, "Client")
+    def test_client_replaced_on_new_token(self, neutron_obj):
+        self.neutron_obj.get_port(self.AUTH_TOKEN, self.PORT_ID)
+        self.neutron_obj.get_port(self.AUTH_TOKEN, self.PORT_ID)
+        self.assertEqual(1, neutron_obj.call_count)
+        self.neutron_obj.get_port('new-token', self.PORT_ID)
+        self.assertEqual(2, neutron_obj.call_count)
+        neutron_obj.assert_called_with(token='new-token',
+                                       endpoint_url=self.ENDPOINT_URL)
+
+    def test_client_pool_is_bounded(self):
+        pool = openstack_driver.ClientPool(max_size=2)
+        for index in range(3):
+            pool.get(('network', index, None), index, object)
+        self.assertEqual([('network', 1, None), ('network', 2, None)],
+                         list(pool._clients))
@@ -0,0 +1,178 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import select
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+IDLE_MIN_WAIT_TIMEOUT = 1.0
+
+PROXY_CONF = """
+[proxy]
+unix_bind_path=%(unix_bind_path)s
+max_connections=1024
+worker_threads=4
+connect_max_wait_timeout=10
+idle_max_wait_timeout=60
+idle_min_wait_timeout=%(idle_min_wait_timeout)s
+nfp_controller_ip=127.0.0.1
+nfp_controller_port=%(port)d
+"""
+
+# The proxy monkey patches on import, run it in its own process
+PROXY_MAIN = ("import sys; "
+              "from gbpservice.nfp.proxy_agent.proxy.proxy import main; "
+              "main(sys.argv)")
+
+
+class EchoServer(threading.Thread):
+
+    """TCP server sending back everything it receives. """
+
+    def __init__(self):
+        super(EchoServer, self).__init__()
+        self.daemon = True
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(1024)
+        self.port = self.socket.getsockname()[1]
+
+    def run(self):
+        poller = select.poll()
+        poller.register(self.socket, select.POLLIN)
+        clients = {}
+        while True:
+            for fd, event in poller.poll():
+                if fd == self.socket.fileno():
+                    client, address = self.socket.accept()
+                    clients[client.fileno()] = client
+                    poller.register(client, select.POLLIN)
+                    continue
+                client = clients[fd]
+                data = client.recv(65536)
+                if data:
+                    client.sendall(data)
+                else:
+                    poller.unregister(fd)
+                    del clients[fd]
+                    client.close()
+
+
+class Test_Proxy(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.unix_bind_path = os.path.join(self.tempdir, 'uds_socket')
+        self.server = EchoServer()
+        self.server.start()
+
+        conf_file = os.path.join(self.tempdir, 'proxy.ini')
+        with open(conf_file, 'w') as conf:
+            conf.write(PROXY_CONF % {
+                'unix_bind_path': self.unix_bind_path,
+                'idle_min_wait_timeout': IDLE_MIN_WAIT_TIMEOUT,
+                'port': self.server.port})
+        proxy = subprocess.Popen(
+            [sys.executable, '-c', PROXY_MAIN, '--config-file', conf_file])
+        self.addCleanup(proxy.wait)
+        self.addCleanup(proxy.kill)
+
+        deadline = time.time() + 30
+        while not os.path.exists(self.unix_bind_path):
+            self.assertIsNone(proxy.poll())
+            self.assertTrue(time.time() < deadline)
+            time.sleep(0.1)
+
+    def _connect(self, num_clients):
+        clients = []
+        for index in range(num_clients):
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(self.unix_bind_path)
+            self.addCleanup(client.close)
+            clients.append(client)
+        return clients
+
+    def _round_trips(self, clients, payload, rounds):
+        """Send payload on all clients at once, wait for all the echoes.
+
+            Returns the latencies of all the round trips.
+        """
+        poller = select.poll()
+        by_fd = dict((client.fileno(), client) for client in clients)
+        for client in clients:
+            poller.register(client, select.POLLIN)
+        latencies = []
+        for index in range(rounds):
+            start_time = {}
+            pending = {}
+            for client in clients:
+                start_time[client] = time.time()
+                client.sendall(payload)
+                pending[client] = len(payload)
+            while pending:
+                events = poller.poll(30 * 1000)
+                self.assertTrue(events, "Timed out waiting for echoes")
+                for fd, event in events:
+                    client = by_fd[fd]
+                    data = client.recv(65536)
+                    self.assertTrue(data, "Proxy closed the connection")
+                    pending[client] -= len(data)
+                    if pending[client] <= 0:
+                        latencies.append(time.time() - start_time[client])
+                        del pending[client]
+        return latencies
+
+    def _benchmark(self, num_clients, payload_size=16384, rounds=10):
+        clients = self._connect(num_clients)
+        payload = b'x' * payload_size
+        start_time = time.time()
+        latencies = sorted(self._round_trips(clients, payload, rounds))
+        elapsed = time.time() - start_time
+        throughput = 2 * payload_size * len(latencies) / elapsed
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+        for client in clients:
+            client.close()
+        return throughput, p99
+
+    def test_throughput_and_latency(self):
+        results = {}
+        for num_clients in [1, 50, 500]:
+            results[num_clients] = self._benchmark(num_clients)
+        message = ', '.join(
+            "%d connections: %.1f MB/s, p99 %.4fs" % (
+                num_clients, results[num_clients][0] / (1 << 20),
+                results[num_clients][1])
+            for num_clients in sorted(results))
+        # Data is forwarded as soon as it is available, not after
+        # waiting for idle_min_wait_timeout
+        self.assertTrue(results[1][1] < IDLE_MIN_WAIT_TIMEOUT, message)
+        self.assertTrue(results[50][1] < IDLE_MIN_WAIT_TIMEOUT, message)
+
+    def test_end_of_stream_is_forwarded(self):
+        client = self._connect(1)[0]
+        client.sendall(b'request')
+        client.shutdown(socket.SHUT_WR)
+        data = b''
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        self.assertEqual(b'request', data)
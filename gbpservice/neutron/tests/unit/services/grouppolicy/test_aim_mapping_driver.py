@@ -28,6 +28,7 @@ from neutron.db import api as db_api
 from neutron import manager
 from neutron.notifiers import nova
 from neutron.plugins.common import constants as service_constants
+from neutron.tests import base
 from neutron.tests.unit.extensions import test_address_scope
 from opflexagent import constants as ocst
 from oslo_config import cfg
@@ -44,6 +45,8 @@ from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
     apic_mapping as amap)
 from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
     apic_mapping_lib as alib)
+from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
+    nova_client as nclient)
 from gbpservice.neutron.tests.unit.plugins.ml2plus import (
     test_apic_aim as test_aim_md)
 from gbpservice.neutron.tests.unit.services.grouppolicy import (
@@ -1898,6 +1901,130 @@ class TestPolicyTarget(AIMBaseTestCase):
         # RPC perspective
         self._do_test_gbp_details_no_pt()
 
+    def test_get_gbp_details_list(self):
+        ptg = self.create_policy_target_group(
+            name="ptg1")['policy_target_group']
+        pts = []
+        for x in range(3):
+            pt = self.create_policy_target(
+                policy_target_group_id=ptg['id'])['policy_target']
+            self._bind_port_to_host(pt['port_id'], 'h1')
+            pts.append(pt)
+        devices = ['tap%s' % pt['port_id'] for pt in pts] + ['tapunknown']
+
+        vm = mock.Mock()
+        vm.name = 'someid'
+        self.driver.vm_name_cache.clear()
+        with mock.patch.object(nclient.NovaClient, 'get_server',
+                               return_value=vm) as get_server:
+            mappings = self.driver.get_gbp_details_list(
+                self._neutron_admin_context, devices=devices, host='h1')
+            req_mappings = self.driver.request_endpoint_details_list(
+                nctx.get_admin_context(),
+                requests=[{'device': device, 'host': 'h1', 'timestamp': 0,
+                           'request_id': 'request_id'}
+                          for device in devices])
+            single_mappings = [
+                self.driver.get_gbp_details(
+                    self._neutron_admin_context, device=device, host='h1')
+                for device in devices]
+            # All the ports are bound to the same VM
+            self.assertEqual(1, get_server.call_count)
+
+        self.assertEqual(single_mappings, mappings)
+        self.assertEqual(len(devices), len(req_mappings))
+        for pt, mapping, req_mapping in zip(pts, mappings, req_mappings):
+            self.assertEqual(pt['port_id'], mapping['port_id'])
+            self.assertEqual('someid', mapping['vm-name'])
+            self.assertEqual(mapping, req_mapping['gbp_details'])
+            self.assertEqual(pt['port_id'],
+                             req_mapping['neutron_details']['port_id'])
+        self.assertEqual({'device': 'tapunknown'}, mappings[-1])
+
+    def test_get_gbp_details_list_batched(self):
+        ptg = self.create_policy_target_group(
+            name="ptg1")['policy_target_group']
+        devices = []
+        for x in range(6):
+            pt = self.create_policy_target(
+                policy_target_group_id=ptg['id'])['policy_target']
+            self._bind_port_to_host(pt['port_id'], 'h1')
+            devices.append('tap%s' % pt['port_id'])
+
+        tables = ['ml2_port_bindings', 'gp_policy_targets',
+                  'gp_policy_target_groups']
+        self.driver.vm_name_cache.clear()
+        with mock.patch.object(nclient.NovaClient, 'get_server'):
+            with self._count_queries(tables) as few:
+                self.driver.get_gbp_details_list(
+                    self._neutron_admin_context, devices=devices[:2],
+                    host='h1')
+            with self._count_queries(tables) as many:
+                self.driver.get_gbp_details_list(
+                    self._neutron_admin_context, devices=devices,
+                    host='h1')
+        # Bindings, PTs and PTGs are fetched at once for all the devices
+        for table in tables:
+            self.assertEqual(few[table], many[table], table)
+
+
+class TestServerNameCache(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestServerNameCache, self).setUp()
+        self.lookups = []
+        fake_nova = mock.patch.object(nclient, 'NovaClient').start()
+        fake_nova.return_value.get_server.side_effect = self._get_server
+
+    def _get_server(self, server_id):
+        self.lookups.append(server_id)
+        if server_id.startswith('missing'):
+            return None
+        vm = mock.Mock()
+        vm.name = 'vm-%s' % server_id
+        return vm
+
+    def _resync(self, cache, device_ids):
+        return [cache.get_server_name(device_id) for device_id in device_ids]
+
+    def test_agent_resync(self):
+        cache = nclient.ServerNameCache()
+        device_ids = ['server%d' % x for x in range(500)]
+
+        names = self._resync(cache, device_ids)
+        self.assertEqual(['vm-%s' % x for x in device_ids], names)
+        self.assertEqual(500, len(self.lookups))
+        # The second resync of the agent is served from the cache
+        self.assertEqual(names, self._resync(cache, device_ids))
+        self.assertEqual(500, len(self.lookups))
+        self.assertEqual(1, nclient.NovaClient.call_count)
+
+    def test_ttl(self):
+        cache = nclient.ServerNameCache(ttl=60)
+        with mock.patch('time.time', return_value=1000):
+            cache.get_server_name('server1')
+        with mock.patch('time.time', return_value=1059):
+            cache.get_server_name('server1')
+        self.assertEqual(1, len(self.lookups))
+        with mock.patch('time.time', return_value=1060):
+            cache.get_server_name('server1')
+        self.assertEqual(2, len(self.lookups))
+
+    def test_lru(self):
+        cache = nclient.ServerNameCache(max_size=2)
+        self._resync(cache, ['server1', 'server2', 'server1', 'server3'])
+        self.assertEqual(['server1', 'server2', 'server3'], self.lookups)
+        # server2 was the least recently used
+        self._resync(cache, ['server1', 'server3', 'server2'])
+        self.assertEqual(['server1', 'server2', 'server3', 'server2'],
+                         self.lookups)
+
+    def test_missing_server_not_cached(self):
+        cache = nclient.ServerNameCache()
+        self.assertEqual('missing1', cache.get_server_name('missing1'))
+        self.assertEqual('missing1', cache.get_server_name('missing1'))
+        self.assertEqual(2, len(self.lookups))
+
 
 class TestPolicyTargetRollback(AIMBaseTestCase):
 
@@ -84,3 +84,21 @@ class ExtensionDriverTestCase(test_ext_base.ExtensionDriverTestBase):
         rows = (session.query(db.ApicAllowedVMNameDB).filter_by(
                 l3_policy_id=l3p['id']).all())
         self.assertEqual([], rows)
+
+    def test_list_l3ps_single_query(self):
+        for index in range(200):
+            allowed_vm_names = ['vm%d*' % index] if index % 2 else []
+            self.create_l3_policy(name='l3p%d' % index,
+                                  ip_pool='10.%d.0.0/16' % index,
+                                  allowed_vm_names=allowed_vm_names)
+
+        table = db.ApicAllowedVMNameDB.__tablename__
+        with self._count_queries([table]) as queries:
+            self._list('l3_policies')
+        self.assertEqual(1, queries[table])
+        l3ps = self._list('l3_policies')['l3_policies']
+        self.assertEqual(200, len(l3ps))
+        for l3p in l3ps:
+            index = int(l3p['name'][len('l3p'):])
+            expected = ['vm%d*' % index] if index % 2 else []
+            self.assertEqual(expected, l3p['allowed_vm_names'])
@@ -14,6 +14,7 @@ from neutron.db import api as db_api
 
 from gbpservice.neutron.db.grouppolicy.extensions import (
     apic_segmentation_label_db as db)
+from gbpservice.neutron.db.grouppolicy import group_policy_mapping_db as gpmdb
 from gbpservice.neutron.tests.unit.services.grouppolicy import (
     test_extension_driver_api as test_ext_base)
 
@@ -88,3 +89,28 @@ class ExtensionDriverTestCase(test_ext_base.ExtensionDriverTestBase,
                               ExtensionDriverTestCaseMixin):
     _extension_drivers = ['apic_segmentation_label']
     _extension_path = None
+
+    def test_list_pts_single_query(self):
+        session = db_api.get_session()
+        with session.begin(subtransactions=True):
+            for index in range(1000):
+                pt = gpmdb.PolicyTargetMapping(
+                    tenant_id=self._tenant_id, name='pt%d' % index)
+                session.add(pt)
+                session.flush()
+                if index % 2:
+                    for label in ['label%d' % index, 'label%d' % (index + 1)]:
+                        session.add(db.ApicSegmentationLabelDB(
+                            policy_target_id=pt.id, segmentation_label=label))
+
+        table = db.ApicSegmentationLabelDB.__tablename__
+        with self._count_queries([table]) as queries:
+            self._list('policy_targets')
+        self.assertEqual(1, queries[table])
+        pts = self._list('policy_targets')['policy_targets']
+        self.assertEqual(1000, len(pts))
+        for pt in pts:
+            index = int(pt['name'][len('pt'):])
+            expected = ['label%d' % index, 'label%d' % (index + 1)] if (
+                index % 2) else []
+            self.assertItemsEqual(expected, pt['segmentation_labels'])
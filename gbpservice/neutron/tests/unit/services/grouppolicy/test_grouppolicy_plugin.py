@@ -15,6 +15,7 @@ import mock
 from neutron import context
 from neutron.tests.unit.plugins.ml2 import test_plugin
 from oslo_config import cfg
+from oslo_utils import uuidutils
 import webob.exc
 
 from gbpservice.neutron.db.grouppolicy import group_policy_mapping_db as gpmdb
@@ -1040,6 +1041,46 @@ class TestResourceStatusChange(GroupPolicyPluginTestCase):
         for resource_name in gpolicy.RESOURCE_ATTRIBUTE_MAP:
             self._test_status_change_on_list(resource_name, fields=['name'])
 
+    def test_status_change_on_list_is_batched(self):
+        num_ptgs = 1000
+        neutron_context = context.get_admin_context()
+        with neutron_context.session.begin(subtransactions=True):
+            for index in range(num_ptgs):
+                neutron_context.session.add(gpmdb.PolicyTargetGroupMapping(
+                    id=uuidutils.generate_uuid(), tenant_id=self._tenant_id,
+                    name='ptg%d' % index, shared=False))
+
+        bulk_calls = []
+        get_status = dummy_driver.NoopDriver.get_policy_target_groups_status
+
+        def _get_policy_target_groups_status(driver, contexts):
+            bulk_calls.append(len(contexts))
+            get_status(driver, contexts)
+
+        with mock.patch.object(dummy_driver.NoopDriver,
+                               'get_policy_target_groups_status',
+                               _get_policy_target_groups_status):
+            with self._count_queries() as no_status:
+                self._gbp_plugin.get_policy_target_groups(
+                    neutron_context, fields=['id', 'name'])
+            self.assertEqual([], bulk_calls)
+            with self._count_queries() as with_status:
+                self._gbp_plugin.get_policy_target_groups(
+                    neutron_context, fields=['id', 'status'])
+        # Drivers are called once for the whole list and all the status
+        # changes are persisted with a constant number of statements
+        self.assertEqual([num_ptgs], bulk_calls)
+        self.assertTrue(with_status[None] - no_status[None] < 10,
+                        "with status: %d, without status: %d statements" % (
+                            with_status[None], no_status[None]))
+
+        ptgs = gpmdb.GroupPolicyMappingDbPlugin.get_policy_target_groups(
+            self._gbp_plugin, neutron_context)
+        self.assertEqual(num_ptgs, len(ptgs))
+        for ptg in ptgs:
+            self.assertEqual(NEW_STATUS, ptg['status'])
+            self.assertEqual(NEW_STATUS_DETAILS, ptg['status_details'])
+
 
 class TestPolicyAction(GroupPolicyPluginTestCase):
 
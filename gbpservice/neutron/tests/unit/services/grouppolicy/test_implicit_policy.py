@@ -124,6 +124,59 @@ class TestImplicitL2Policy(ImplicitPolicyTestCase):
         res = req.get_response(self.ext_api)
         self.assertEqual(webob.exc.HTTPOk.code, res.status_int)
 
+    def _ptg_lifecycle_queries(self, num_ptgs, cached=True):
+        driver = self.plugin.policy_driver_manager.policy_drivers[
+            'implicit_policy'].obj
+        tables = ['gp_l3_policies', 'gpm_owned_l2_policies',
+                  'gpm_owned_l3_policies']
+
+        def _reset_caches():
+            if not cached:
+                driver._default_l3ps.clear()
+                driver._owned_l2ps.clear()
+                driver._owned_l3ps.clear()
+
+        def _create_ptgs():
+            for index in range(num_ptgs):
+                _reset_caches()
+                ptg_ids.append(self.create_policy_target_group(
+                    name='ptg%d' % index)['policy_target_group']['id'])
+
+        def _delete_ptgs():
+            for ptg_id in ptg_ids:
+                _reset_caches()
+                req = self.new_delete_request('policy_target_groups', ptg_id)
+                res = req.get_response(self.ext_api)
+                self.assertEqual(webob.exc.HTTPNoContent.code,
+                                 res.status_int)
+
+        ptg_ids = []
+        with self._count_queries(tables) as created:
+            _create_ptgs()
+        with self._count_queries(tables) as deleted:
+            _delete_ptgs()
+        # Implicit L2 policies and the default L3 policy are cleaned up
+        self.assertEqual([], self._list('l2_policies')['l2_policies'])
+        self.assertEqual([], self._list('l3_policies')['l3_policies'])
+        return created, deleted
+
+    def test_ptg_lifecycle_queries_benchmark(self):
+        created, deleted = self._ptg_lifecycle_queries(500)
+        legacy_created, legacy_deleted = self._ptg_lifecycle_queries(
+            500, cached=False)
+        message = ("500 PTGs of one tenant, queries on create: %s, legacy: "
+                   "%s, queries on delete: %s, legacy: %s" % (
+                       dict(created), dict(legacy_created), dict(deleted),
+                       dict(legacy_deleted)))
+        # Default L3 policy searched once, then only checked by ID
+        self.assertTrue(created['gp_l3_policies'] <
+                        legacy_created['gp_l3_policies'], message)
+        # Policies owned are known since their implicit creation
+        self.assertEqual(0, deleted['gpm_owned_l2_policies'], message)
+        self.assertEqual(0, deleted['gpm_owned_l3_policies'], message)
+        self.assertEqual(500, legacy_deleted['gpm_owned_l2_policies'],
+                         message)
+
 
 class TestImplicitL3Policy(ImplicitPolicyTestCase):
 
@@ -12,6 +12,10 @@
 # limitations under the License.
 
 import requests
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+import threading
+import time
 import unittest
 
 import mock
@@ -162,7 +166,7 @@ class OdlManagerTestCase(unittest.TestCase):
             *args,
             **kwargs
     ):
-        with mock.patch('requests.request') as mock_request:
+        with mock.patch.object(requests.Session, 'request') as mock_request:
             tested_method(*args)
             mock_request.assert_called_once_with(
                 http_method,
@@ -181,7 +185,8 @@ class OdlManagerTestCase(unittest.TestCase):
     ):
         with mock.patch.object(odl_manager.OdlManager,
                                '_is_tenant_created') as mock_is_tenant_created:
-            with mock.patch('requests.request') as mock_request:
+            with mock.patch.object(requests.Session,
+                                   'request') as mock_request:
                 mock_is_tenant_created.return_value = True
                 tested_method(*args)
                 mock_request.assert_called_once_with(
@@ -191,6 +196,7 @@ class OdlManagerTestCase(unittest.TestCase):
 
                 mock_is_tenant_created.return_value = False
                 mock_request.reset_mock()
+                self.manager._tenants.clear()
                 tested_method(*args)
                 mock_request.assert_any_call(
                     'put',
@@ -204,7 +210,7 @@ class OdlManagerTestCase(unittest.TestCase):
                     **kwargs
                 )
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     def test_is_tenant_created(self, mock_request):
 
         mock_request.return_value = mock.Mock(
@@ -461,3 +467,190 @@ class OdlManagerTestCase(unittest.TestCase):
             data=DataMatcher({'contract': CONTRACT}),
             auth=AuthMatcher()
         )
+
+
+class CountingRestconfServer(socketserver.ThreadingMixIn,
+                             BaseHTTPServer.HTTPServer):
+    """Local RESTCONF server counting requests and connections. """
+
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        BaseHTTPServer.HTTPServer.__init__(self, *args, **kwargs)
+        self.connections = 0
+        self.requests = []
+        self.tenants = set()
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        socketserver.ThreadingMixIn.process_request(
+            self, request, client_address)
+
+
+class RestconfHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else None
+        self.server.requests.append(
+            (self.command, self.path, body and jsonutils.loads(body)))
+        tenant_url = URL_TENANT[len("http://%s:%s" % (HOST, PORT)):]
+        if self.command == 'GET':
+            self._respond(200 if self.path in self.server.tenants else 404)
+            return
+        if self.command == 'PUT' and self.path == tenant_url:
+            self.server.tenants.add(self.path)
+        self._respond(200)
+
+    do_GET = do_PUT = do_POST = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class OdlManagerRestconfTestCase(unittest.TestCase):
+    """ODL manager talking to a local RESTCONF server. """
+
+    def setUp(self):
+        self.server = CountingRestconfServer(('127.0.0.1', 0),
+                                             RestconfHandler)
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for name, value in [('odl_username', USERNAME),
+                            ('odl_password', PASSWORD),
+                            ('odl_host', '127.0.0.1'),
+                            ('odl_port', str(self.server.server_address[1]))]:
+            config.cfg.CONF.set_override(name, value, group='odl_driver')
+            self.addCleanup(config.cfg.CONF.clear_override, name,
+                            group='odl_driver')
+        self.manager = odl_manager.OdlManager()
+
+    def _path(self, url):
+        return url[len("http://%s:%s" % (HOST, PORT)):]
+
+    def _endpoints(self, num_endpoints):
+        return [{"endpoint-group": EPG_ID,
+                 "l2-context": L2BD_ID,
+                 "l3-address": [{"ip-address": "10.0.%d.%d" % (
+                     index // 256, index % 256), "l3-context": L3CTX_ID}],
+                 "mac-address": "fa:16:3e:00:%02x:%02x" % (
+                     index // 256, index % 256),
+                 "port-name": "port%d" % index,
+                 "tenant": TENANT_ID} for index in range(num_endpoints)]
+
+    def _legacy_register_endpoints(self, endpoints):
+        # A new connection and authentication for every endpoint
+        for ep in endpoints:
+            r = requests.request(
+                'post', url=self.manager._reg_ep_url,
+                headers=HEADER, data=jsonutils.dumps({"input": ep}),
+                auth=requests.auth.HTTPBasicAuth(USERNAME, PASSWORD))
+            r.raise_for_status()
+
+    def _register(self, register_endpoints, endpoints):
+        self.server.connections = 0
+        del self.server.requests[:]
+        start_time = time.time()
+        register_endpoints(endpoints)
+        endpoints_per_sec = len(endpoints) / max(time.time() - start_time,
+                                                 1e-6)
+        return (endpoints_per_sec, len(self.server.requests),
+                self.server.connections)
+
+    def test_register_endpoints_benchmark(self):
+        endpoints = self._endpoints(1000)
+        registered, requests_sent, connections = self._register(
+            self.manager.register_endpoints, endpoints)
+        self.assertEqual(
+            [{'input': ep} for ep in endpoints],
+            [body for method, path, body in self.server.requests])
+        legacy, legacy_requests, legacy_connections = self._register(
+            self._legacy_register_endpoints, endpoints)
+        message = ("1000 endpoints: %d endpoints/s, %d requests over %d "
+                   "connections, legacy: %d endpoints/s, %d requests over "
+                   "%d connections" % (registered, requests_sent,
+                                       connections, legacy, legacy_requests,
+                                       legacy_connections))
+        self.assertEqual(1, connections, message)
+        self.assertEqual(1000, legacy_connections, message)
+        self.assertTrue(registered > legacy, message)
+
+    def test_unregister_endpoints_batched(self):
+        config.cfg.CONF.set_override('odl_endpoint_batch_size', 100,
+                                     group='odl_driver')
+        self.addCleanup(config.cfg.CONF.clear_override,
+                        'odl_endpoint_batch_size', group='odl_driver')
+        self.manager = odl_manager.OdlManager()
+        endpoints = [{"l2": [{"l2-context": L2BD_ID,
+                              "mac-address": ep["mac-address"]}],
+                      "l3": ep["l3-address"]}
+                     for ep in self._endpoints(1000)]
+        self.manager.unregister_endpoints(endpoints)
+        self.assertEqual(10, len(self.server.requests))
+        l2 = []
+        l3 = []
+        for method, path, body in self.server.requests:
+            self.assertEqual('POST', method)
+            l2.extend(body['input']['l2'])
+            l3.extend(body['input']['l3'])
+        self.assertEqual([ep['l2'][0] for ep in endpoints], l2)
+        self.assertEqual([ep['l3'][0] for ep in endpoints], l3)
+
+    def test_tenant_checked_once(self):
+        for index in range(10):
+            self.manager.create_action(
+                TENANT_ID, {'name': 'action%d' % index})
+        methods = [method for method, path, body in self.server.requests]
+        # Tenant looked up and created before the first action only
+        self.assertEqual(['GET', 'PUT'] + ['PUT'] * 10, methods)
+        self.assertEqual(1, self.server.connections)
+
+    def test_new_tenant_policy_created_in_one_request(self):
+        policy = [('action-instance', ACTION),
+                  ('classifier-instance', CLASSIFIER),
+                  ('l3-context', L3CTX),
+                  ('l2-bridge-domain', L2BD),
+                  ('endpoint-group', EPG),
+                  ('subnet', SUBNET)]
+        self.manager.create_update_tenant_policy(TENANT_ID, policy)
+        self.assertEqual(
+            [('GET', self._path(URL_TENANT), None),
+             ('PUT', self._path(URL_TENANT), {'tenant': {
+                 'id': TENANT_ID,
+                 'subject-feature-instances': {
+                     'action-instance': [ACTION],
+                     'classifier-instance': [CLASSIFIER]},
+                 'l3-context': [L3CTX],
+                 'l2-bridge-domain': [L2BD],
+                 'endpoint-group': [EPG],
+                 'subnet': [SUBNET]}})],
+            self.server.requests)
+
+        # Objects of an existing tenant are merged one at a time
+        del self.server.requests[:]
+        self.manager.create_update_tenant_policy(
+            TENANT_ID, [('l2-flood-domain', L2FD), ('contract', CONTRACT)])
+        self.assertEqual(
+            [('PUT', self._path(URL_L2FD), {'l2-flood-domain': L2FD}),
+             ('PUT', self._path(URL_CONTRACT), {'contract': CONTRACT})],
+            self.server.requests)
+
+    def test_existing_tenant_policy_not_replaced(self):
+        self.manager.create_update_tenant(TENANT_ID, TENANT)
+        self.manager._tenants.clear()
+        del self.server.requests[:]
+        self.manager.create_update_tenant_policy(
+            TENANT_ID, [('l3-context', L3CTX), ('l2-bridge-domain', L2BD)])
+        methods = [method for method, path, body in self.server.requests]
+        self.assertEqual(['GET', 'PUT', 'PUT'], methods)
+        self.assertEqual(set([TENANT_ID]), self.manager._tenants)
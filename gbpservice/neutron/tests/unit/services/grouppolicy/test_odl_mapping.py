@@ -11,16 +11,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
+import unittest
+
 import mock
 
 from gbpservice.neutron.services.grouppolicy.common import constants
+from gbpservice.neutron.services.grouppolicy.common import exceptions as gpexc
 from gbpservice.neutron.services.grouppolicy import config
 from gbpservice.neutron.services.grouppolicy.drivers.odl import odl_manager
 from gbpservice.neutron.services.grouppolicy.drivers.odl import odl_mapping
 from gbpservice.neutron.services.grouppolicy.drivers import resource_mapping
+from gbpservice.neutron.services.grouppolicy import (
+    group_policy_context as p_context)
 from gbpservice.neutron.services.grouppolicy import plugin as g_plugin
 from gbpservice.neutron.tests.unit.services.grouppolicy import (
     test_grouppolicy_plugin as test_gp_plugin)
+from gbpservice.neutron.tests.unit.services.grouppolicy import (
+    test_odl_manager)
+from neutron import context as n_context
 from neutron.plugins.ml2 import plugin as ml2_plugin
 from neutron.tests.unit.plugins.ml2 import test_plugin
 
@@ -660,6 +669,8 @@ class L2PolicyTestCase(OdlMappingTestCase):
             _plugin=self.fake_gbp_plugin
         )
 
+    @mock.patch.object(odl_manager.OdlManager, '_is_tenant_created',
+                       return_value=True)
     @mock.patch.object(ml2_plugin.Ml2Plugin, 'get_network')
     @mock.patch.object(odl_manager.OdlManager,
                        'create_update_l2_flood_domain')
@@ -672,7 +683,8 @@ class L2PolicyTestCase(OdlMappingTestCase):
             mock_create_l2_policy_postcommit,
             mock_create_update_l2_bridge_domain,
             mock_create_update_l2_flood_domain,
-            mock_get_network):
+            mock_get_network,
+            mock__is_tenant_created):
 
         # core_plugin is mocked and simulated by the fake core plugin
         mock_get_network.side_effect = self.fake_core_plugin.get_network
@@ -741,6 +753,8 @@ class PolicyTargetGroupTestCase(OdlMappingTestCase):
             _plugin=self.fake_gbp_plugin
         )
 
+    @mock.patch.object(odl_manager.OdlManager, '_is_tenant_created',
+                       return_value=True)
     @mock.patch.object(g_plugin.GroupPolicyPlugin, 'get_policy_rule_set')
     @mock.patch.object(ml2_plugin.Ml2Plugin, 'get_subnet')
     @mock.patch.object(odl_manager.OdlManager, 'create_update_subnet')
@@ -753,7 +767,8 @@ class PolicyTargetGroupTestCase(OdlMappingTestCase):
             mock_create_update_endpoint_group,
             mock_create_update_subnet,
             mock_get_subnet,
-            mock_get_policy_rule_set):
+            mock_get_policy_rule_set,
+            mock__is_tenant_created):
 
         # core_plugin and gbp_plugin are mocked and simulated by
         # the fake core plugin and fake gbp plugin
@@ -914,10 +929,13 @@ class PolicyClassifierTestCase(OdlMappingTestCase):
             _plugin=self.fake_gbp_plugin
         )
 
+    @mock.patch.object(odl_manager.OdlManager, '_is_tenant_created',
+                       return_value=True)
     @mock.patch.object(odl_manager.OdlManager, 'create_classifier')
     def test_create_policy_classifier_postcommit(
             self,
-            mock_create_classifier):
+            mock_create_classifier,
+            mock__is_tenant_created):
 
         # Ensure two classifiers are created in ODL for TCP
         classifier_instance_1_dest = {
@@ -1179,3 +1197,192 @@ class DHCPTestCase(OdlMappingTestCase):
                                                         self.port)
         mock_create_policy_target.assert_called_once_with(self.plugin_context,
                                                           attrs)
+
+
+class OdlChangeBufferTestCase(unittest.TestCase):
+    """ Test case for the coalescing of ODL changes
+    """
+
+    def setUp(self):
+        self.manager = mock.Mock()
+        self.changes = odl_mapping.OdlChangeBuffer(self.manager)
+
+    def test_updates_merged(self):
+        self.changes.update(TENANT_UUID, 'l3-context',
+                            {'id': L3P_ID, 'name': 'old'})
+        self.changes.update(TENANT_UUID, 'l2-bridge-domain', {'id': L2P_ID})
+        self.changes.update(TENANT_UUID, 'l3-context',
+                            {'id': L3P_ID, 'name': 'new'})
+        self.changes.flush()
+        self.manager.create_update_tenant_policy.assert_called_once_with(
+            TENANT_UUID,
+            [('l3-context', {'id': L3P_ID, 'name': 'new'}),
+             ('l2-bridge-domain', {'id': L2P_ID})])
+        self.assertFalse(self.manager.delete_tenant_policy.called)
+
+    def test_delete_drops_update(self):
+        self.changes.update(TENANT_UUID, 'endpoint-group',
+                            {'id': GROUP_ID, 'name': GROUP_NAME})
+        self.changes.update(TENANT_UUID, 'subnet', {'id': SUBNET_ID})
+        self.changes.delete(TENANT_UUID, 'endpoint-group', {'id': GROUP_ID})
+        self.changes.flush()
+        self.manager.delete_tenant_policy.assert_called_once_with(
+            TENANT_UUID, [('endpoint-group', {'id': GROUP_ID})])
+        self.manager.create_update_tenant_policy.assert_called_once_with(
+            TENANT_UUID, [('subnet', {'id': SUBNET_ID})])
+
+    def test_objects_keyed_by_kind(self):
+        # Classifier instances are keyed by name, not id
+        self.changes.update(TENANT_UUID, 'classifier-instance',
+                            {'name': CLASSIFIER_1_NAME})
+        self.changes.update(TENANT_UUID, 'classifier-instance',
+                            {'name': CLASSIFIER_2_NAME})
+        self.changes.update(TENANT_UUID, 'l3-context', {'id': L3P_ID})
+        self.changes.update(TENANT_UUID, 'l2-bridge-domain', {'id': L3P_ID})
+        self.changes.flush()
+        policy = self.manager.create_update_tenant_policy.call_args[0][1]
+        self.assertEqual(4, len(policy))
+
+    def test_flush_order(self):
+        other_tenant = TENANT_UUID.replace('a', 'b')
+        self.changes.register_endpoints([{'port-name': NEUTRON_PORT_ID}])
+        self.changes.update(TENANT_UUID, 'l3-context', {'id': L3P_ID})
+        self.changes.update(other_tenant, 'l3-context', {'id': L3P_ID})
+        self.changes.delete(TENANT_UUID, 'subnet', {'id': SUBNET_ID})
+        self.changes.unregister_endpoints([{'l2': [], 'l3': []}])
+        self.changes.flush()
+        self.assertEqual(
+            [mock.call.unregister_endpoints([{'l2': [], 'l3': []}]),
+             mock.call.delete_tenant_policy(
+                 TENANT_UUID, [('subnet', {'id': SUBNET_ID})]),
+             mock.call.create_update_tenant_policy(
+                 TENANT_UUID, [('l3-context', {'id': L3P_ID})]),
+             mock.call.create_update_tenant_policy(
+                 other_tenant, [('l3-context', {'id': L3P_ID})]),
+             mock.call.register_endpoints([{'port-name': NEUTRON_PORT_ID}])],
+            self.manager.mock_calls)
+
+    def test_flush_nothing(self):
+        self.changes.flush()
+        self.assertEqual([], self.manager.mock_calls)
+
+
+class OdlMappingRestconfTestCase(OdlMappingTestCase):
+    """ Test case for the ODL changes pushed by requests to the plugin
+    """
+
+    def setUp(self):
+        super(OdlMappingRestconfTestCase, self).setUp()
+        self.server = test_odl_manager.CountingRestconfServer(
+            ('127.0.0.1', 0), test_odl_manager.RestconfHandler)
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for name, value in [('odl_host', '127.0.0.1'),
+                            ('odl_port', str(self.server.server_address[1]))]:
+            config.cfg.CONF.set_override(name, value, group='odl_driver')
+            self.addCleanup(config.cfg.CONF.clear_override, name,
+                            group='odl_driver')
+        self.driver.odl_manager = odl_manager.OdlManager()
+        self._tenant_id = TENANT_ID
+        self.tenant_path = ('/restconf/config/policy:tenants/policy:tenant/' +
+                            TENANT_UUID)
+
+    def _requests(self, method):
+        return [(path, body) for request_method, path, body in
+                self.server.requests if request_method == method]
+
+    def test_implicit_policy_pushed_with_ptg(self):
+        ptg = self.create_policy_target_group(
+            name=GROUP_NAME)['policy_target_group']
+        # The tenant is new, it is created along with the EPG and the
+        # contexts of the implicit L2 and L3 policies in one request
+        self.assertEqual(['GET', 'PUT'],
+                         [method for method, path, body in
+                          self.server.requests])
+        path, body = self._requests('PUT')[0]
+        self.assertEqual(self.tenant_path, path)
+        tenant = body['tenant']
+        self.assertEqual([ptg['id']],
+                         [epg['id'] for epg in tenant['endpoint-group']])
+        self.assertEqual([ptg['subnets'][0]],
+                         [subnet['id'] for subnet in tenant['subnet']])
+        for kind in ['l3-context', 'l2-bridge-domain', 'l2-flood-domain']:
+            self.assertEqual(1, len(tenant[kind]))
+
+    def test_ptg_and_prs_workflow(self):
+        action = self.create_policy_action(
+            action_type='allow')['policy_action']
+        classifier = self.create_policy_classifier(
+            protocol='tcp', port_range='80',
+            direction='in')['policy_classifier']
+        rule = self.create_policy_rule(
+            policy_classifier_id=classifier['id'],
+            policy_actions=[action['id']])['policy_rule']
+        prs = self.create_policy_rule_set(
+            policy_rules=[rule['id']])['policy_rule_set']
+        # New tenant created with both classifier instances, then the
+        # contract
+        self.assertEqual(2, len(self._requests('PUT')))
+
+        del self.server.requests[:]
+        self.create_policy_target_group(
+            provided_policy_rule_sets={prs['id']: None})
+        # Objects of an existing tenant are merged one at a time, the
+        # tenant is not looked up again
+        puts = self._requests('PUT')
+        self.assertEqual(5, len(puts))
+        self.assertEqual([], self._requests('GET'))
+        epgs = [body['endpoint-group'] for path, body in puts
+                if 'endpoint-group' in body]
+        self.assertEqual([prs['id']],
+                         [selector['contract'] for selector in
+                          epgs[0]['provider-named-selector']])
+
+    def test_pts_unregistered_together_on_ptg_delete(self):
+        ptg = self.create_policy_target_group()['policy_target_group']
+        for index in range(3):
+            self.create_policy_target(policy_target_group_id=ptg['id'])
+        del self.server.requests[:]
+        self.delete_policy_target_group(ptg['id'], expected_res_status=204)
+        unregister_path = ('/restconf/operations/'
+                           'endpoint:unregister-endpoint')
+        unregistered = [body for path, body in self._requests('POST')
+                        if path == unregister_path]
+        self.assertEqual(1, len(unregistered))
+        self.assertEqual(3, len(unregistered[0]['input']['l2']))
+
+    def test_request_state_dropped_on_failed_commit(self):
+        plugin = self.driver.gbp_plugin
+        plugin_context = n_context.Context('', TENANT_ID)
+        attrs = {'tenant_id': TENANT_ID,
+                 'name': L3P_NAME,
+                 'description': L3P_DESC,
+                 'ip_version': 4,
+                 'ip_pool': '10.0.0.0/8',
+                 'shared': False,
+                 'subnet_prefix_length': 24}
+        manager = plugin.policy_driver_manager
+        create_l3_policy_precommit = manager.create_l3_policy_precommit
+
+        def failing_precommit(context):
+            # All the drivers precommit, the transaction is rolled back
+            create_l3_policy_precommit(context)
+            raise gpexc.GroupPolicyDriverError(
+                method='create_l3_policy_precommit')
+
+        with mock.patch.object(manager, 'create_l3_policy_precommit',
+                               side_effect=failing_precommit):
+            self.assertRaises(gpexc.GroupPolicyDriverError,
+                              plugin.create_l3_policy, plugin_context,
+                              {'l3_policy': dict(attrs)})
+        self.assertIsNone(p_context.get_request_state(plugin_context))
+        self.assertEqual([], self.server.requests)
+
+        # A later operation with the same context is an outermost one
+        l3p = plugin.create_l3_policy(plugin_context,
+                                      {'l3_policy': dict(attrs)})
+        self.assertIn(self.tenant_path + '/l3-context/' + l3p['id'],
+                      [path for path, body in self._requests('PUT')])
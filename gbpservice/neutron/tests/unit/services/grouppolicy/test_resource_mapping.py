@@ -11,13 +11,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import copy
 import itertools
+import operator
+import time
 
 from keystonemiddleware import auth_token  # noqa
 import mock
 import netaddr
 from neutron.api.rpc.agentnotifiers import dhcp_rpc_agent_api
+from neutron.api.v2 import attributes
 from neutron.common import constants as cst
 from neutron import context as nctx
 from neutron.db import api as db_api
@@ -30,10 +34,12 @@ from neutron.plugins.common import constants as pconst
 from neutron.tests.unit.extensions import test_l3
 from neutron.tests.unit.extensions import test_securitygroup
 from neutron.tests.unit.plugins.ml2 import test_plugin as n_test_plugin
+from oslo_log import log as logging
 from oslo_utils import uuidutils
 import webob.exc
 
 from gbpservice.common import utils
+from gbpservice.network.neutronv2 import local_api
 from gbpservice.neutron.db.grouppolicy import group_policy_db as gpdb
 from gbpservice.neutron.db import servicechain_db
 from gbpservice.neutron.services.grouppolicy.common import constants as gconst
@@ -42,12 +48,15 @@ from gbpservice.neutron.services.grouppolicy import config
 from gbpservice.neutron.services.grouppolicy.drivers import chain_mapping
 from gbpservice.neutron.services.grouppolicy.drivers import nsp_manager
 from gbpservice.neutron.services.grouppolicy.drivers import resource_mapping
+from gbpservice.neutron.services.grouppolicy import (
+    group_policy_context as p_context)
 from gbpservice.neutron.services.servicechain.plugins.msc import (
     config as sc_cfg)
 from gbpservice.neutron.tests.unit.db.grouppolicy import test_group_policy_db
 from gbpservice.neutron.tests.unit.services.grouppolicy import (
     test_grouppolicy_plugin as test_plugin)
 
+LOG = logging.getLogger(__name__)
 
 SERVICE_PROFILES = 'servicechain/service_profiles'
 SERVICECHAIN_NODES = 'servicechain/servicechain_nodes'
@@ -78,6 +87,22 @@ CORE_PLUGIN = ('gbpservice.neutron.tests.unit.services.grouppolicy.'
                'test_resource_mapping.NoL3NatSGTestPlugin')
 
 
+class CountingFreeBlocks(collections.defaultdict):
+    """Free blocks of a SubnetAllocator, counting their lookups. """
+
+    def __init__(self, blocks):
+        super(CountingFreeBlocks, self).__init__(list, blocks)
+        self.lookups = 0
+
+    def __getitem__(self, prefixlen):
+        self.lookups += 1
+        return super(CountingFreeBlocks, self).__getitem__(prefixlen)
+
+    def get(self, prefixlen, default=None):
+        self.lookups += 1
+        return super(CountingFreeBlocks, self).get(prefixlen, default)
+
+
 class ResourceMappingTestCase(test_plugin.GroupPolicyPluginTestCase):
 
     def setUp(self, policy_drivers=None,
@@ -1382,6 +1407,90 @@ class TestPolicyTargetGroup(ResourceMappingTestCase):
                                     query_params='name=ptg2')
                          ['policy_target_groups'])
 
+    def _ptg_cidr(self, ptg):
+        return self._show_subnet(
+            ptg['policy_target_group']['subnets'][0])['subnet']['cidr']
+
+    def test_ip_pool_reused_after_ptg_delete(self):
+        l3p = self.create_l3_policy(name="l3p", ip_pool="10.0.0.0/24",
+                                    subnet_prefix_length=26)
+        l3p_id = l3p['l3_policy']['id']
+        l2p = self.create_l2_policy(name="l2p", l3_policy_id=l3p_id)
+        l2p_id = l2p['l2_policy']['id']
+        ptgs = [self.create_policy_target_group(
+            name="ptg%d" % index, l2_policy_id=l2p_id) for index in range(4)]
+        self.assertEqual(
+            ['10.0.0.0/26', '10.0.0.64/26', '10.0.0.128/26',
+             '10.0.0.192/26'], [self._ptg_cidr(ptg) for ptg in ptgs])
+        res = self.create_policy_target_group(name="ptg4", l2_policy_id=l2p_id,
+                                              expected_res_status=503)
+        self.assertEqual('NoSubnetAvailable', res['NeutronError']['type'])
+
+        # CIDR of the deleted PTG is allocated again
+        self.delete_policy_target_group(
+            ptgs[1]['policy_target_group']['id'],
+            expected_res_status=webob.exc.HTTPNoContent.code)
+        ptg = self.create_policy_target_group(name="ptg5",
+                                              l2_policy_id=l2p_id)
+        self.assertEqual('10.0.0.64/26', self._ptg_cidr(ptg))
+
+    def _legacy_allocate(self, pool, allocated, prefixlen):
+        # Free CIDRs computed from all the allocated ones every time,
+        # as before the allocator
+        available = netaddr.IPSet(iterable=[pool]) - netaddr.IPSet(
+            iterable=allocated)
+        available.compact()
+        for cidr in sorted(available.iter_cidrs(),
+                           key=operator.attrgetter('prefixlen'),
+                           reverse=True):
+            if prefixlen >= cidr.prefixlen:
+                return next(iter(cidr.subnet(prefixlen)))
+
+    def _allocation_latencies(self, allocate, num_ptgs):
+        allocated = []
+        latencies = []
+        for index in range(num_ptgs):
+            start_time = time.time()
+            allocated.append(str(allocate(allocated)))
+            latencies.append(time.time() - start_time)
+        self.assertEqual(num_ptgs, len(set(allocated)))
+        return allocated, latencies
+
+    def test_subnet_allocation_latency(self):
+        # Subnets of 1000 PTGs allocated in a /8 L3P
+        pool = '10.0.0.0/8'
+        allocator = resource_mapping.SubnetAllocator(pool, [])
+        allocator._free = CountingFreeBlocks(allocator._free)
+        lookups = []
+
+        def allocate(allocated):
+            start_lookups = allocator._free.lookups
+            cidr = allocator.allocate(26)
+            lookups.append(allocator._free.lookups - start_lookups)
+            return cidr
+
+        cidrs, latencies = self._allocation_latencies(allocate, 1000)
+        legacy_cidrs, legacy_latencies = self._allocation_latencies(
+            lambda allocated: self._legacy_allocate(pool, allocated, 26),
+            1000)
+        # Same CIDRs as the legacy algorithm, none allocated twice
+        self.assertEqual(legacy_cidrs, cidrs)
+        # An allocation looks up at most the free blocks of each prefix
+        # length between the pool and the subnet, however many subnets
+        # are already allocated
+        self.assertTrue(max(lookups) <= 2 * (26 - 8 + 1),
+                        "lookups per allocation: %d" % max(lookups))
+        self.assertTrue(sum(lookups[-100:]) <= sum(lookups[:100]),
+                        "lookups of first/last 100 PTGs: %d/%d" % (
+                            sum(lookups[:100]), sum(lookups[-100:])))
+        LOG.info("1000 PTGs, latency first/last 100: %(first).1fus/"
+                 "%(last).1fus, legacy %(legacy_first).1fus/"
+                 "%(legacy_last).1fus",
+                 {'first': sum(latencies[:100]) * 1e4,
+                  'last': sum(latencies[-100:]) * 1e4,
+                  'legacy_first': sum(legacy_latencies[:100]) * 1e4,
+                  'legacy_last': sum(legacy_latencies[-100:]) * 1e4})
+
     def test_unbound_ports_deletion(self):
         ptg = self.create_policy_target_group()['policy_target_group']
         pt = self.create_policy_target(policy_target_group_id=ptg['id'])
@@ -1393,6 +1502,148 @@ class TestPolicyTargetGroup(ResourceMappingTestCase):
         self._unbind_port(port['port']['id'])
         self.delete_policy_target_group(ptg['id'], expected_res_status=204)
 
+    def test_explicit_port_kept_on_ptg_delete(self):
+        ptg = self.create_policy_target_group()['policy_target_group']
+        l2p = self._gbp_plugin.get_l2_policy(self._context,
+                                             ptg['l2_policy_id'])
+        with self.port(subnet=self._show_subnet(ptg['subnets'][0])) as port:
+            port_id = port['port']['id']
+            self.create_policy_target(policy_target_group_id=ptg['id'],
+                                      port_id=port_id)
+            implicit_port_id = self.create_policy_target(
+                policy_target_group_id=ptg['id'])['policy_target']['port_id']
+            self.delete_policy_target_group(ptg['id'],
+                                            expected_res_status=204)
+            ports = self._plugin.get_ports(
+                self._context, {'network_id': [l2p['network_id']]})
+            self.assertIn(port_id, [x['id'] for x in ports])
+            self.assertNotIn(implicit_port_id, [x['id'] for x in ports])
+
+    def _delete_ptg_with_pts(self, num_pts):
+        ptg = self.create_policy_target_group()['policy_target_group']
+        port_ids = [self.create_policy_target(
+            policy_target_group_id=ptg['id'])['policy_target']['port_id']
+            for index in range(num_pts)]
+        start_time = time.time()
+        with self._count_queries() as queries:
+            self.delete_policy_target_group(ptg['id'],
+                                            expected_res_status=204)
+        elapsed = time.time() - start_time
+        self.assertEqual([], self._plugin.get_ports(self._context,
+                                                    {'id': port_ids}))
+        self.assertEqual([], self._gbp_plugin.get_policy_targets(
+            self._context))
+        return queries[None], elapsed
+
+    def test_delete_ptg_with_unbound_pts_benchmark(self):
+        gbp_plugin = type(self._gbp_plugin)
+        get_bound_port_ids = gbp_plugin._get_bound_port_ids
+        with mock.patch.object(gbp_plugin, '_get_bound_port_ids',
+                               autospec=True,
+                               side_effect=get_bound_port_ids) as bound:
+            statements, elapsed = self._delete_ptg_with_pts(500)
+            # All the ports checked at once
+            self.assertEqual(1, bound.call_count)
+
+        def _legacy_get_bound_port_ids(plugin, port_ids):
+            # One port fetched at a time
+            bound_port_ids = set()
+            for port_id in port_ids:
+                bound_port_ids |= get_bound_port_ids(plugin, [port_id])
+            return bound_port_ids
+
+        def _legacy_delete_policy_targets(plugin, context, policy_targets):
+            # Driver hooks and DB delete for each policy target
+            for pt in policy_targets:
+                plugin.delete_policy_target(context, pt['id'])
+
+        with mock.patch.object(gbp_plugin, '_get_bound_port_ids',
+                               new=_legacy_get_bound_port_ids):
+            with mock.patch.object(gbp_plugin, '_delete_policy_targets_bulk',
+                                   new=_legacy_delete_policy_targets):
+                legacy_statements, legacy_elapsed = (
+                    self._delete_ptg_with_pts(500))
+        message = ("PTG with 500 unbound PTs deleted in %.2fs with %d "
+                   "statements, legacy: %.2fs with %d statements" % (
+                       elapsed, statements, legacy_elapsed,
+                       legacy_statements))
+        LOG.info(message)
+        self.assertTrue(statements < legacy_statements, message)
+
+    def test_cluster_master_deleted_with_members(self):
+        ptg_id = self.create_policy_target_group()['policy_target_group']['id']
+        master = self.create_policy_target(
+            policy_target_group_id=ptg_id)['policy_target']
+        member = self.create_policy_target(
+            policy_target_group_id=ptg_id,
+            cluster_id=master['id'])['policy_target']
+        # The master goes along with all its members
+        self.delete_policy_target_group(ptg_id, expected_res_status=204)
+        self.assertEqual([], self._plugin.get_ports(
+            self._context, {'id': [master['port_id'], member['port_id']]}))
+
+    def test_cluster_master_not_deleted_without_members(self):
+        ptg_id = self.create_policy_target_group()['policy_target_group']['id']
+        master = self.create_policy_target(
+            policy_target_group_id=ptg_id)['policy_target']
+        self.create_policy_target(policy_target_group_id=ptg_id,
+                                  cluster_id=master['id'])
+        driver = self._gbp_plugin.policy_driver_manager.policy_drivers[
+            'resource_mapping'].obj
+        context = p_context.PolicyTargetContext(self._gbp_plugin,
+                                                self._context, master)
+        self.assertRaises(gpexc.PolicyTargetInUse,
+                          driver.delete_policy_targets_bulk_precommit,
+                          [context])
+
+    def test_pt_cleanup_failure_on_ptg_delete(self):
+        ptg = self.create_policy_target_group()['policy_target_group']
+        with self.port(subnet=self._show_subnet(ptg['subnets'][0])) as port:
+            self.create_policy_target(policy_target_group_id=ptg['id'],
+                                      port_id=port['port']['id'])
+            port_ids = [self.create_policy_target(
+                policy_target_group_id=ptg['id'])['policy_target']['port_id']
+                for index in range(2)]
+            # The SG disassociation of the explicit port fails
+            with mock.patch.object(
+                    resource_mapping.ResourceMappingDriver,
+                    '_generate_list_of_sg_from_ptg',
+                    side_effect=Exception):
+                self.delete_policy_target_group(ptg['id'],
+                                                expected_res_status=204)
+            self.assertEqual([], self._plugin.get_ports(self._context,
+                                                        {'id': port_ids}))
+
+    def test_per_pt_hooks_called_on_ptg_delete(self):
+        deleted = []
+
+        class PerPolicyTargetDriver(resource_mapping.ResourceMappingDriver):
+
+            def delete_policy_target_postcommit(self, context):
+                deleted.append(context.current['id'])
+                if len(deleted) == 1:
+                    raise Exception()
+                super(PerPolicyTargetDriver,
+                      self).delete_policy_target_postcommit(context)
+
+        ptg_id = self.create_policy_target_group()['policy_target_group']['id']
+        pts = [self.create_policy_target(
+            policy_target_group_id=ptg_id)['policy_target']
+            for index in range(3)]
+        extension = self._gbp_plugin.policy_driver_manager.policy_drivers[
+            'resource_mapping']
+        driver = copy.copy(extension.obj)
+        driver.__class__ = PerPolicyTargetDriver
+        # Drivers overriding a per policy target hook fall back to it
+        with mock.patch.object(extension, 'obj', driver):
+            self.delete_policy_target_group(ptg_id, expected_res_status=204)
+        self.assertEqual(sorted(pt['id'] for pt in pts), sorted(deleted))
+        # The policy target failing doesn't keep the others from being
+        # deleted
+        ports = self._plugin.get_ports(
+            self._context, {'id': [pt['port_id'] for pt in pts]})
+        self.assertEqual(1, len(ports))
+
     def test_ptg_only_participate_one_prs_when_redirect(self):
         redirect_rule = self._create_simple_policy_rule(action_type='redirect')
         simple_rule = self._create_simple_policy_rule()
@@ -1897,6 +2148,125 @@ class NotificationTest(ResourceMappingTestCase):
             nova_notifier.assert_any_call("create_port", {}, mock.ANY)
 
 
+class TestLocalAPIBulk(ResourceMappingTestCase):
+
+    def _local_api(self):
+        api = local_api.LocalAPI()
+        api._cached_agent_notifier = None
+        return api
+
+    def _port_attrs(self, network_id, num_ports):
+        return [{'tenant_id': self._tenant_id,
+                 'name': 'port_%d' % index,
+                 'network_id': network_id,
+                 'mac_address': attributes.ATTR_NOT_SPECIFIED,
+                 'fixed_ips': attributes.ATTR_NOT_SPECIFIED,
+                 'device_id': '',
+                 'device_owner': '',
+                 'admin_state_up': True} for index in range(num_ports)]
+
+    def _legacy_create_ports(self, api, context, attrs_list):
+        return [api._create_port(context, attrs) for attrs in attrs_list]
+
+    def test_create_ports_bulk(self):
+        api = self._local_api()
+        context = nctx.get_admin_context()
+        with self.network() as net:
+            network_id = net['network']['id']
+            with self.subnet(network=net, cidr='10.0.0.0/16'):
+                attrs_list = self._port_attrs(network_id, 200)
+                with mock.patch.object(nova.Notifier,
+                                       'send_network_change') as notifier:
+                    with self._count_queries() as legacy:
+                        self._legacy_create_ports(api, context, attrs_list)
+                    self.assertEqual(200, notifier.call_count)
+                    notifier.reset_mock()
+                    with self._count_queries() as bulk:
+                        api._create_ports_bulk(context, attrs_list)
+                    self.assertEqual(200, notifier.call_count)
+                ports = api._get_ports(context,
+                                       {'network_id': [network_id]})
+                self.assertEqual(400, len(ports))
+                self.assertTrue(bulk[None] < legacy[None],
+                                "200 ports, bulk: %d, legacy: %d "
+                                "statements" % (bulk[None], legacy[None]))
+
+    def test_delete_ports_bulk(self):
+        api = self._local_api()
+        context = nctx.get_admin_context()
+        with self.network() as net:
+            network_id = net['network']['id']
+            with self.subnet(network=net, cidr='10.0.0.0/24'):
+                ports = api._create_ports_bulk(
+                    context, self._port_attrs(network_id, 10))
+                with mock.patch.object(nova.Notifier,
+                                       'send_network_change') as notifier:
+                    # Port already deleted is skipped
+                    api._delete_port(context, ports[0]['id'])
+                    api._delete_ports_bulk(context, ports=ports[:5],
+                                           port_ids=[ports[5]['id']])
+                    notifier.assert_any_call('delete_port', {},
+                                             {'port': ports[1]})
+                    self.assertEqual(6, notifier.call_count)
+                self.assertEqual(
+                    sorted(port['id'] for port in ports[6:]),
+                    sorted(port['id'] for port in api._get_ports(
+                        context, {'network_id': [network_id]})))
+
+    def _create_sgs(self, api, context, num_sgs):
+        return [api._create_sg(context, {'tenant_id': self._tenant_id,
+                                         'name': 'sg%d' % index,
+                                         'description': '',
+                                         'security_group_rules': ''})
+                for index in range(num_sgs)]
+
+    def _sg_rule_attrs(self, sg_id, num_rules):
+        return [{'tenant_id': self._tenant_id,
+                 'security_group_id': sg_id,
+                 'direction': 'ingress',
+                 'ethertype': 'IPv4',
+                 'protocol': 'tcp',
+                 'port_range_min': 1000 + index,
+                 'port_range_max': 1000 + index,
+                 'remote_ip_prefix': '10.0.0.0/8',
+                 'remote_group_id': None} for index in range(num_rules)]
+
+    def test_create_sg_rules_bulk(self):
+        api = self._local_api()
+        context = nctx.get_admin_context()
+        sg_ids = [sg['id'] for sg in self._create_sgs(api, context, 2)]
+        attrs_list = (self._sg_rule_attrs(sg_ids[0], 10) +
+                      self._sg_rule_attrs(sg_ids[1], 10))
+        # Rules of a group with one already existing are created one by one
+        api._create_sg_rule(context, attrs_list[0])
+        created = api._create_sg_rules_bulk(context, attrs_list)
+        self.assertEqual(19, len(created))
+        self.assertEqual(20, len(api._get_sg_rules(
+            context, {'security_group_id': sg_ids,
+                      'direction': ['ingress']})))
+
+    def test_delete_sg_rules_bulk(self):
+        api = self._local_api()
+        context = nctx.get_admin_context()
+        sg_id = self._create_sgs(api, context, 1)[0]['id']
+        sg_rules = api._create_sg_rules_bulk(
+            context, self._sg_rule_attrs(sg_id, 50))
+        # Rule already deleted is skipped
+        api._delete_sg_rule(context, sg_rules[0]['id'])
+        with mock.patch.object(type(self._plugin),
+                               'delete_security_group_rule') as deleter:
+            with mock.patch.object(self._plugin.notifier,
+                                   'security_groups_rule_updated') as updated:
+                api._delete_sg_rules_bulk(
+                    context, [sg_rule['id'] for sg_rule in sg_rules])
+        # Deleted at once, with one notification of the agents
+        self.assertFalse(deleter.called)
+        updated.assert_called_once_with(context, [sg_id])
+        self.assertEqual([], api._get_sg_rules(
+            context, {'security_group_id': [sg_id],
+                      'direction': ['ingress']}))
+
+
 # TODO(ivar): We need a UT that verifies that the PT's ports have the default
 # SG when there are no policy_rule_sets involved, that the default SG is
 # properly # created and shared, and that it has the right content.
@@ -3845,6 +4215,85 @@ class TestExternalPolicy(ResourceMappingTestCase):
                                 and rule['remote_ip_prefix'] == ['0.0.0.0/0']):
                             self.assertFalse(self._get_sg_rule(**rule))
 
+    def _legacy_apply_sg_rule_batch(self, driver, plugin_context, rule_batch):
+        # One query and one call per rule, as before batching
+        for attrs, unset in rule_batch:
+            if unset:
+                filters = dict((key, [value]) for key, value in
+                               attrs.items() if value)
+                rule = driver._get_sg_rules(plugin_context, filters)
+                if rule:
+                    driver._delete_sg_rule(plugin_context, rule[0]['id'])
+            else:
+                driver._create_sg_rule(plugin_context, attrs)
+
+    def test_sg_rule_kept_when_set_and_unset_in_batch(self):
+        driver = self._gbp_plugin.policy_driver_manager.policy_drivers[
+            'resource_mapping'].obj
+        sg_id = driver._create_gbp_sg(self._context, self._tenant_id,
+                                      'sg')['id']
+        attrs = {'tenant_id': self._tenant_id, 'security_group_id': sg_id,
+                 'direction': 'ingress', 'ethertype': 'IPv4',
+                 'protocol': 'tcp', 'port_range_min': 22,
+                 'port_range_max': 22, 'remote_ip_prefix': '10.0.0.0/8',
+                 'remote_group_id': None}
+        driver._create_sg_rule(self._context, attrs)
+        # The unset matches any TCP rule, the existing one included
+        unset_attrs = dict(attrs, port_range_min=None, port_range_max=None,
+                           remote_ip_prefix=None)
+        driver._apply_sg_rule_batch(self._context,
+                                    [(attrs, False), (unset_attrs, True)])
+        filters = dict((key, [value]) for key, value in attrs.items()
+                       if value)
+        self.assertEqual(1, len(driver._get_sg_rules(self._context,
+                                                     filters)))
+
+    def test_sg_rules_batched_with_many_external_routes(self):
+        routes = [{'destination': '172.16.%d.0/24' % index, 'nexthop': None}
+                  for index in range(50)]
+        with self.network(router__external=True) as net:
+            with self.subnet(cidr='10.10.1.0/24', network=net) as sub:
+                es = self.create_external_segment(
+                    subnet_id=sub['subnet']['id'], external_routes=routes,
+                    shared=True, is_admin_context=True)['external_segment']
+                ep = self.create_external_policy(
+                    external_segments=[es['id']],
+                    expected_res_status=201)['external_policy']
+                pr_ssh = self._create_ssh_allow_rule()
+                prs_ssh = self.create_policy_rule_set(
+                    policy_rules=[pr_ssh['id']])['policy_rule_set']
+
+                def _provide(prs_ids):
+                    self.update_external_policy(
+                        ep['id'],
+                        provided_policy_rule_sets=dict.fromkeys(prs_ids, ''),
+                        expected_res_status=200)
+
+                legacy_apply = self._legacy_apply_sg_rule_batch
+                with mock.patch.object(
+                        resource_mapping.ResourceMappingDriver,
+                        '_apply_sg_rule_batch',
+                        new=lambda driver, plugin_context, rule_batch: (
+                            legacy_apply(driver, plugin_context, rule_batch))):
+                    with self._count_queries() as legacy:
+                        _provide([prs_ssh['id']])
+                    self._verify_prs_rules(prs_ssh['id'])
+                    _provide([])
+
+                with self._count_queries() as batched:
+                    _provide([prs_ssh['id']])
+                current_rules = self._verify_prs_rules(prs_ssh['id'])
+                self.assertTrue(batched[None] < legacy[None],
+                                "batched: %d, legacy: %d statements" % (
+                                    batched[None], legacy[None]))
+
+                # Rules for all the routes removed at once
+                _provide([])
+                for rule in current_rules:
+                    if not (rule['direction'] == ['egress']
+                            and rule['remote_ip_prefix'] == ['0.0.0.0/0']):
+                        self.assertFalse(self._get_sg_rule(**rule))
+
 
 class TestPolicyAction(ResourceMappingTestCase):
 
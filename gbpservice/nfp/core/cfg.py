@@ -32,6 +32,31 @@ NFP_OPTS = [
         default='rpc',
         help='Backend Support for communicationg with configurator.'
     ),
+    oslo_config.StrOpt(
+        'event_codec',
+        default='pickle',
+        choices=['pickle', 'msgpack'],
+        help='Codec used to serialize event data sent between '
+        'nfp processes.'
+    ),
+    oslo_config.IntOpt(
+        'event_compress_threshold',
+        default=1024,
+        help='Serialized event data larger than this many bytes '
+        'is compressed before sending to other nfp processes.'
+    ),
+    oslo_config.IntOpt(
+        'event_ack_batch_size',
+        default=64,
+        help='Max num of event acks a worker sends to the '
+        'distributor in one message.'
+    ),
+    oslo_config.FloatOpt(
+        'event_ack_batch_timeout',
+        default=0.01,
+        help='Max time in seconds a worker holds event acks '
+        'before sending them to the distributor.'
+    ),
 ]
 
 
@@ -0,0 +1,96 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import zlib
+
+from oslo_serialization import msgpackutils
+from six.moves import cPickle as pickle
+
+from gbpservice.nfp.core import log as nfp_logging
+
+LOG = nfp_logging.getLogger(__name__)
+
+PICKLE_PROTOCOL = 2
+
+"""Flag prefixed to the encoded event data. """
+RAW = b'r'
+COMPRESSED = b'z'
+
+
+class PickleCodec(object):
+
+    """Serializes data using pickle protocol 2. """
+
+    def encode(self, data):
+        return pickle.dumps(data, PICKLE_PROTOCOL)
+
+    def decode(self, blob):
+        return pickle.loads(blob)
+
+
+class MsgpackCodec(object):
+
+    """Serializes data using msgpack.
+
+        Faster and more compact than pickle for plain data, but
+        only supports the types known to oslo msgpackutils.
+    """
+
+    def encode(self, data):
+        return msgpackutils.dumps(data)
+
+    def decode(self, blob):
+        return msgpackutils.loads(blob)
+
+
+CODECS = {'pickle': PickleCodec,
+          'msgpack': MsgpackCodec}
+
+"""Encodes & decodes the data of an event.
+
+    Event data is serialized with the configured codec and
+    compressed only if the serialized data is larger than
+    the threshold. Used for all events sent over the pipes
+    and the stash queue.
+"""
+
+
+class EventCodec(object):
+
+    def __init__(self, codec='pickle', compress_threshold=1024):
+        try:
+            self._codec = CODECS[codec]()
+        except KeyError:
+            message = "Unknown event codec %s, using pickle" % (codec)
+            LOG.error(message)
+            self._codec = PickleCodec()
+        self._compress_threshold = compress_threshold
+
+    def encode(self, event):
+        if event.data is None or event.zipped:
+            return
+        blob = self._codec.encode(event.data)
+        if len(blob) > self._compress_threshold:
+            blob = COMPRESSED + zlib.compress(blob)
+        else:
+            blob = RAW + blob
+        event.data = blob
+        event.zipped = True
+
+    def decode(self, event):
+        if event.data is None or not event.zipped:
+            return
+        flag, blob = event.data[:1], event.data[1:]
+        if flag == COMPRESSED:
+            blob = zlib.decompress(blob)
+        event.data = self._codec.decode(blob)
+        event.zipped = False
@@ -10,7 +10,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import ast
 import eventlet
 eventlet.monkey_patch()
 
@@ -21,11 +20,11 @@ import pickle
 import Queue
 import sys
 import time
-import zlib
 
 from oslo_service import service as oslo_service
 
 from gbpservice.nfp.core import cfg as nfp_cfg
+from gbpservice.nfp.core import codec as nfp_codec
 from gbpservice.nfp.core import common as nfp_common
 from gbpservice.nfp.core import event as nfp_event
 from gbpservice.nfp.core import launcher as nfp_launcher
@@ -208,28 +207,25 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
         self._manager = nfp_manager.NfpResourceManager(conf, self)
         self._worker = nfp_worker.NfpWorker(conf)
         self._poll_handler = nfp_poll.NfpPollHandler(conf)
+        self._codec = nfp_codec.EventCodec(
+            codec=getattr(conf, 'event_codec', 'pickle'),
+            compress_threshold=getattr(
+                conf, 'event_compress_threshold', 1024))
 
         # ID of process handling this controller obj
         self.PROCESS_TYPE = "distributor"
 
     def compress(self, event):
-        # REVISIT (mak) : zip only if length is > than threshold (1k maybe)
-        if event.data and not event.zipped:
-            event.zipped = True
-            event.data = zlib.compress(str({'cdata': event.data}))
+        self._codec.encode(event)
 
     def decompress(self, event):
-        if event.data and event.zipped:
-            try:
-                data = ast.literal_eval(
-                    zlib.decompress(event.data))
-                event.data = data['cdata']
-                event.zipped = False
-            except Exception as e:
-                message = "Failed to decompress event data, Reason: %s" % (
-                    e)
-                LOG.error(message)
-                raise e
+        try:
+            self._codec.decode(event)
+        except Exception as e:
+            message = "Failed to decompress event data, Reason: %s" % (
+                e)
+            LOG.error(message)
+            raise e
 
     def pipe_recv(self, pipe):
         event = pipe.recv()
@@ -251,15 +247,18 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
         while True:
             # Run 'Manager' here to monitor for workers and
             # events.
+            # Waits for events from workers, yield in between.
             self._manager.manager_run()
-            eventlet.greenthread.sleep(0.1)
+            eventlet.greenthread.sleep(0)
 
     def _update_manager(self):
         childs = self.get_childrens()
         for pid, wrapper in childs.iteritems():
             pipe = wrapper.child_pipe_map[pid]
-            # Inform 'Manager' class about the new_child.
-            self._manager.new_child(pid, pipe)
+            # Inform 'Manager' class about the new_child, weighted
+            # by the num of threads handling events in the child.
+            self._manager.new_child(
+                pid, pipe, weight=wrapper.service.threads)
 
     def _process_event(self, event):
         self._manager.process_events([event])
@@ -341,8 +340,11 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
             event, timeout, callback)
 
     def poll(self):
-        """Invoked in periodic task to poll for timedout events. """
-        self._poll_handler.run()
+        """Invoked in polling task to fire timedout events.
+
+            Returns: Seconds till the next event times out.
+        """
+        return self._poll_handler.run()
 
     def report_state(self):
         """Invoked by report_task to report states of all agents. """
@@ -470,32 +472,29 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
         else:
             message = "(event - %s) - stashed" % (event.identify())
             LOG.debug(message)
+            self.compress(event)
             self._stashq.put(event)
 
-    def get_stashed_events(self):
+    def get_stashed_events(self, max_events=1, timeout=0.1):
         """To get stashed events.
 
-            Returns available number of stashed events
-            as list. Will be invoked by distributor,
-            worker cannot pull.
+            Waits till timeout for the first stashed event, then
+            returns it along with the ones already in the queue,
+            at max max_events, as list. Will be invoked by
+            distributor, worker cannot pull.
 
             Executor: distributor-process
         """
         events = []
-        # return at max 5 events
-        maxx = 1
-        # wait sometime for first event in the queue
-        timeout = 0.1
-        while maxx:
+        while len(events) < max_events:
             try:
                 event = self._stashq.get(timeout=timeout)
-                self.decompress(event)
-                events.append(event)
-                timeout = 0
-                maxx -= 1
             except Queue.Empty:
-                maxx = 0
-                pass
+                break
+            self.decompress(event)
+            events.append(event)
+            # Dont wait for more once the first one is here
+            timeout = 0
         return events
 
     def event_complete(self, event, result=None):
@@ -33,6 +33,7 @@ EVENT_GRAPH = 'event_graph'
 EVENT_NEW = 'new_event'
 EVENT_COMPLETE = 'event_done'
 EVENT_ACK = 'event_ack'
+EVENT_ACKS = 'event_acks'
 
 """Sequencer status. """
 SequencerEmpty = nfp_seq.SequencerEmpty
@@ -45,8 +46,13 @@ class EventGraphNode(object):
 
     def __init__(self, event, p_event=None):
         self.p_link = ()
-        self.c_links = []
-        self.w_links = []
+        # Child events not yet started, in the order they were
+        # added. Siblings are started and sequenced in this order.
+        self.c_links = collections.OrderedDict()
+        # Child events not yet completed, node can be
+        # scheduled only when none are left.
+        self.w_links = collections.OrderedDict()
+        # Child events completed, in the order of completion
         self.e_links = []
         self.event = event
         self.result = None
@@ -63,18 +69,15 @@ class EventGraphNode(object):
             self.w_links, self.event, self.result) = state
 
     def add_link(self, event):
-        self.c_links.append(event)
-        self.w_links.append(event)
+        self.c_links[event] = None
+        self.w_links[event] = None
 
     def remove_link(self, event):
         self.e_links.append(event)
-        self.w_links.remove(event)
+        del self.w_links[event]
 
     def remove_c_link(self, event):
-        try:
-            self.c_links.remove(event)
-        except ValueError:
-            pass
+        self.c_links.pop(event, None)
 
     def get_c_links(self):
         return self.c_links
@@ -395,16 +398,19 @@ class NfpEventHandlers(object):
 
 class NfpEventManager(object):
 
-    def __init__(self, conf, controller, sequencer, pipe=None, pid=-1):
+    def __init__(self, conf, controller, sequencer, pipe=None, pid=-1,
+                 weight=1):
         self._conf = conf
         self._controller = controller
         # PID of process to which this event manager is associated
         self._pid = pid
+        # Relative capacity of the worker, size of its thread group
+        self.weight = weight
         # Duplex pipe to read & write events
         self._pipe = pipe
         # Cache of UUIDs of events which are dispatched to
-        # the worker which is handled by this em.
-        self._cache = deque()
+        # the worker which is handled by this em, in dispatch order.
+        self._cache = collections.OrderedDict()
         # Load on this event manager - num of events pending to be completed
         self._load = 0
 
@@ -465,10 +471,10 @@ class NfpEventManager(object):
         message = "%s - pop event" % (self._log_meta(event))
         LOG.debug(message)
         try:
-            self._cache.remove(event.desc.uuid)
+            del self._cache[event.desc.uuid]
             self._load -= 1
-        except ValueError as verr:
-            verr = verr
+        except KeyError as kerr:
+            kerr = kerr
             message = "%s - event not in cache" % (
                 self._log_meta(event))
             LOG.warn(message)
@@ -495,8 +501,12 @@ class NfpEventManager(object):
         self._load = (self._load + 1) if inc_load else self._load
         # Add to the cache
         if cache:
-            self._cache.append(event.desc.uuid)
+            self._cache[event.desc.uuid] = None
 
     def event_watcher(self, timeout=0.01):
         """Watch for events. """
         return self._wait_for_events(self._pipe, timeout=timeout)
+
+    def fileno(self):
+        """File descriptor of the pipe, to select on the event manager. """
+        return self._pipe.fileno()
@@ -10,11 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 
 from gbpservice.nfp.core import log as nfp_logging
 from gbpservice.nfp.core import threadpool as core_tp
 
 LOG = nfp_logging.getLogger(__name__)
+deque = collections.deque
 
 
 class InUse(Exception):
@@ -157,46 +159,54 @@ class EventGraphExecutor(object):
 
     @set_node
     def run(self, event=None, node=None):
-        LOG.debug("GraphExecutor - (event - %s)" %
-                  (node.event))
-
-        # Call to check if event would get sequenced
-        if self.manager.schedule_graph_event(
-                node.event, self.graph, dispatch=False):
-            LOG.debug("GraphExecutor - "
-                      "(event - %s) - sequenced" %
+        """Start all the nodes of the sub graph which are ready.
+
+            Walks the sub graph iteratively. A node with children
+            not yet started has its children walked, a node with
+            none pending is scheduled. Nodes with children in
+            progress are left to event_complete.
+        """
+        nodes = deque([node])
+        while nodes:
+            node = nodes.popleft()
+            LOG.debug("GraphExecutor - (event - %s)" %
                       (node.event))
-            # Event would have got added to sequencer,
-            # unlink it from pending links of graph
-            return self.graph.unlink_node(node)
 
-        l_nodes = self.graph.get_pending_leaf_nodes(node)
-        LOG.debug("GraphExecutor - "
-                  "(event - %s) - number of leaf nodes - %d" %
-                  (node.event, len(l_nodes)))
+            # Call to check if event would get sequenced
+            if self.manager.schedule_graph_event(
+                    node.event, self.graph, dispatch=False):
+                LOG.debug("GraphExecutor - "
+                          "(event - %s) - sequenced" %
+                          (node.event))
+                # Event would have got added to sequencer,
+                # unlink it from pending links of graph
+                self.graph.unlink_node(node)
+                continue
 
-        if not l_nodes:
-            if not self.graph.waiting_events(node):
+            l_nodes = self.graph.get_pending_leaf_nodes(node)
+            LOG.debug("GraphExecutor - "
+                      "(event - %s) - number of leaf nodes - %d" %
+                      (node.event, len(l_nodes)))
+
+            if l_nodes:
+                # Started, node is now waiting on its children
+                self.graph.unlink_node(node)
+                nodes.extend(l_nodes)
+            elif not self.graph.waiting_events(node):
                 LOG.debug("GraphExecutor - "
                           "(event - %s) - Scheduling event" %
                           (node.event))
                 self.manager.schedule_graph_event(node.event, self.graph)
                 self.graph.unlink_node(node)
 
-        if l_nodes:
-            for l_node in l_nodes:
-                LOG.debug("GraphExecutor -"
-                          "(event - %s) executing leaf node" %
-                          (node.event))
-                self.run(node=l_node)
-
     @set_node
     def event_complete(self, result, event=None, node=None):
         LOG.debug("GraphExecutor - (event - %s) complete" %
                   (node.event))
         node.result = result
         p_node = self.graph.remove_node(node)
-        if p_node:
+        # Parent is ready only once all of its children complete
+        if p_node and not self.graph.waiting_events(p_node):
             LOG.debug("GraphExecutor - "
                       "(event - %s) complete, rerunning parent - %s" %
                       (node.event, p_node.event))
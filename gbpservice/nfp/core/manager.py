@@ -11,7 +11,10 @@
 #    under the License.
 
 import collections
+import itertools
 import os
+import select
+import time
 
 from gbpservice.nfp.core import event as nfp_event
 from gbpservice.nfp.core import executor as nfp_executor
@@ -23,6 +26,9 @@ NfpEventManager = nfp_event.NfpEventManager
 
 deque = collections.deque
 
+# Max time the manager waits for events from workers
+EVENT_WATCH_TIMEOUT = 0.1
+
 
 def IS_SCHEDULED_EVENT_ACK(event):
     return event.desc.type == nfp_event.SCHEDULE_EVENT and (
@@ -30,6 +36,12 @@ def IS_SCHEDULED_EVENT_ACK(event):
     )
 
 
+def IS_SCHEDULED_EVENT_ACKS(event):
+    return event.desc.type == nfp_event.SCHEDULE_EVENT and (
+        event.desc.flag == nfp_event.EVENT_ACKS
+    )
+
+
 def IS_SCHEDULED_NEW_EVENT(event):
     return event.desc.type == nfp_event.SCHEDULE_EVENT and (
         event.desc.flag == nfp_event.EVENT_NEW
@@ -88,6 +100,105 @@ class NfpProcessManager(object):
         return list(dead), list(new)
 
 
+"""Tracks the load of the event managers.
+
+    Indexed min-heap of event managers ordered on their load,
+    relative to their weight. Updated as events are dispatched
+    to and completed by the workers, so the least loaded event
+    manager is found in O(1) and updated in O(log n). Equally
+    loaded event managers are picked in round robin.
+"""
+
+
+class NfpLoadHeap(object):
+
+    def __init__(self):
+        # [[load, dispatch seq, event_manager]]
+        self._heap = []
+        # {event_manager: position in heap}
+        self._index = {}
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _load(self, event_manager):
+        return float(event_manager.get_load()) / max(
+            event_manager.weight, 1)
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._index[heap[i][2]] = i
+        self._index[heap[j][2]] = j
+
+    def _less(self, i, j):
+        return self._heap[i][:2] < self._heap[j][:2]
+
+    def _sift_up(self, pos):
+        while pos:
+            parent = (pos - 1) >> 1
+            if not self._less(pos, parent):
+                break
+            self._swap(pos, parent)
+            pos = parent
+
+    def _sift_down(self, pos):
+        size = len(self._heap)
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._less(child + 1, child):
+                child += 1
+            if not self._less(child, pos):
+                break
+            self._swap(pos, child)
+            pos = child
+
+    def _fix(self, pos):
+        event_manager = self._heap[pos][2]
+        self._sift_up(pos)
+        self._sift_down(self._index[event_manager])
+
+    def add(self, event_manager):
+        if event_manager in self._index:
+            return self.update(event_manager)
+        self._heap.append(
+            [self._load(event_manager), next(self._seq), event_manager])
+        self._index[event_manager] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def remove(self, event_manager):
+        pos = self._index.pop(event_manager, None)
+        if pos is None:
+            return
+        last = self._heap.pop()
+        if pos < len(self._heap):
+            self._heap[pos] = last
+            self._index[last[2]] = pos
+            self._fix(pos)
+
+    def update(self, event_manager, dispatched=False):
+        """Reorder the event manager after a change of its load.
+
+            dispatched is True when an event was just dispatched to it,
+            moving it behind the equally loaded event managers.
+        """
+        pos = self._index.get(event_manager)
+        if pos is None:
+            return
+        entry = self._heap[pos]
+        entry[0] = self._load(event_manager)
+        if dispatched:
+            entry[1] = next(self._seq)
+        self._fix(pos)
+
+    def min(self):
+        """Returns the least loaded event manager. """
+        return self._heap[0][2] if self._heap else None
+
+
 """Manager for nfp resources.
 
     Manages all the nfp resources - process, events, polling queue etc.
@@ -110,11 +221,13 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
         self._distributor_process_id = os.getpid()
         # Single sequencer to be used by all event managers
         self._event_sequencer = nfp_sequencer.EventSequencer()
+        # Load of the event managers of the workers
+        self._load_heap = NfpLoadHeap()
 
         NfpProcessManager.__init__(self, conf, controller)
         NfpEventManager.__init__(self, conf, controller, self._event_sequencer)
 
-    def new_child(self, pid, pipe):
+    def new_child(self, pid, pipe, weight=1):
         """Invoked when a new child is spawned.
 
             Associates an event manager with this child, maintains
@@ -123,12 +236,15 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
 
             :param process: Context of new process.
             :param pipe: Pipe to communicate with this child.
+            :param weight: Relative capacity of the child, events
+                are dispatched in proportion to it.
         """
         ev_manager = NfpEventManager(
             self._conf, self._controller,
             self._event_sequencer,
-            pipe=pipe, pid=pid)
+            pipe=pipe, pid=pid, weight=weight)
         self._resource_map.update(dict({pid: ev_manager}))
+        self._load_heap.add(ev_manager)
         super(NfpResourceManager, self).new_child(pid, pipe)
 
     def manager_run(self):
@@ -151,10 +267,15 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
                 event, event.lifetime, self._event_life_timedout)
 
     def _dispatch_event(self, event):
-        """Dispatch event to a worker. """
-        load_info = self._load_init()
-        event_manager, load_info = self._get_min_loaded_em(load_info)
+        """Dispatch event to the least loaded worker. """
+        event_manager = self._load_heap.min()
         event_manager.dispatch_event(event)
+        self._load_heap.update(event_manager, dispatched=True)
+
+    def _pop_event(self, event_manager, event):
+        """Pop event from the event manager & update its load. """
+        event_manager.pop_event(event)
+        self._load_heap.update(event_manager)
 
     def _execute_event_graph(self, event, state=None):
         graph = event.graph
@@ -212,20 +333,22 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
 
         return event.sequence
 
-    def _scheduled_event_ack(self, ack_event):
+    def _scheduled_event_ack(self, uuid):
+        event = None
         try:
-            event = self._event_cache[ack_event.desc.uuid]
+            event = self._event_cache[uuid]
             evmanager = self._get_event_manager(event.desc.worker)
             assert evmanager
             # Pop from the pending list of evmanager
-            evmanager.pop_event(event)
+            self._pop_event(evmanager, event)
             # May be start polling for lifetime of event
             self._event_acked(event)
         except KeyError as kerr:
             kerr = kerr
-            message = "(event - %s) - acked,"
-            "missing from cache" % (event.identify())
-            LOG.error(message)
+            # Acks are sent in batches, event could have completed
+            # before its ack reached here.
+            message = "(event - %s) - acked, missing from cache" % (uuid)
+            LOG.debug(message)
         except AssertionError as aerr:
             aerr = aerr
             message = "(event - %s) - acked,"
@@ -242,7 +365,7 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             # Get the em managing the event
             evmanager = self._get_event_manager(event.desc.worker)
             assert evmanager
-            evmanager.pop_event(event)
+            self._pop_event(evmanager, event)
             # If event expired, send a cancelled event back to worker
             if expired:
                 event.desc.type = nfp_event.EVENT_EXPIRED
@@ -275,7 +398,7 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             # In most of the cases, polling is done for an existing
             # event.
             ref_uuid = event.desc.poll_desc.ref
-            if ref_uuid not in self._event_cache.keys():
+            if ref_uuid not in self._event_cache:
                 # Assign random worker for this poll event
                 event.desc.worker = self._resource_map.keys()[0]
                 self._event_cache[ref_uuid] = event
@@ -318,7 +441,10 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             elif IS_SCHEDULED_EVENT_GRAPHEVENT(event):
                 self._scheduled_event_graph(event)
             elif IS_SCHEDULED_EVENT_ACK(event):
-                self._scheduled_event_ack(event)
+                self._scheduled_event_ack(event.desc.uuid)
+            elif IS_SCHEDULED_EVENT_ACKS(event):
+                for uuid in event.data:
+                    self._scheduled_event_ack(uuid)
             elif IS_SCHEDULED_NEW_EVENT(event):
                 self._scheduled_new_event(event)
             elif IS_EVENT_COMPLETE(event):
@@ -326,17 +452,40 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             else:
                 self._non_schedule_event(event)
 
+    def _get_ready_event_managers(self, timeout):
+        """Returns event managers with events pending from their workers.
+
+            Waits on the pipes of all the workers at once, returns
+            as soon as any of them is readable or after timeout.
+        """
+        event_managers = self._resource_map.values()
+        if not event_managers:
+            time.sleep(timeout)
+            return []
+        try:
+            ready, _, _ = select.select(event_managers, [], [], timeout)
+        except (select.error, IOError, OSError) as err:
+            message = "Failed to wait on worker pipes - %s" % (err)
+            LOG.error(message)
+            # Check all the pipes, the dead ones are handled by
+            # the child watcher.
+            ready = event_managers
+        return ready
+
     def _event_watcher(self):
         """Watches for events for each event manager.
 
-            Invokes each event manager to get events from workers.
+            Waits for events from all the workers together and pulls
+            every event from the event managers which are ready.
             Also checks parent process event manager.
         """
         events = []
         # Get events from sequencer
         events = self._event_sequencer.run()
-        for pid, event_manager in self._resource_map.iteritems():
-            events += event_manager.event_watcher(timeout=0.01)
+        # Dont wait for workers when there are events to process
+        timeout = 0 if events else EVENT_WATCH_TIMEOUT
+        for event_manager in self._get_ready_event_managers(timeout):
+            events += event_manager.event_watcher(timeout=0)
         # Process the type of events received, dispatch only the
         # required ones.
         self.process_events(events)
@@ -351,9 +500,9 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
         childrens = self._controller.get_childrens()
         wrap = childrens[new]
         pipe = wrap.child_pipe_map[new]
-        self.new_child(new, pipe)
-        new_em = self._resource_map[new]
         killed_em = self._resource_map[killed]
+        self.new_child(new, pipe, weight=killed_em.weight)
+        new_em = self._resource_map[new]
         new_em.init_from_event_manager(killed_em)
         # Dispatch the pending events to the new worker through new em
         self._replay_events(new_em)
@@ -371,6 +520,7 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
                 message = "%s - eventid missing in cache" % (
                     event_id)
                 LOG.error(message)
+        self._load_heap.update(event_manager)
 
     def _child_watcher(self):
         dead, new = super(NfpResourceManager, self).child_watcher()
@@ -386,23 +536,7 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
         for killed_proc in dead:
             new_proc = new.pop()
             self._replace_child(killed_proc, new_proc)
-            del self._resource_map[killed_proc]
-
-    def _load_init(self):
-        """Intializes load with current information. """
-        load_info = []
-        for pid, event_manager in self._resource_map.iteritems():
-            load = event_manager.get_load()
-            load_info.append([event_manager, load, pid])
-
-        return load_info
-
-    def _get_min_loaded_em(self, load_info):
-        """Returns the min loaded event_manager. """
-        minloaded = min(load_info, key=lambda x: x[1])
-        load = minloaded[1] + 1
-        load_info[load_info.index(minloaded)][1] = load
-        return minloaded[0], load_info
+            self._load_heap.remove(self._resource_map.pop(killed_proc))
 
     def _get_event_manager(self, pid):
         """Returns event manager of a process. """
@@ -16,10 +16,16 @@ import sched
 import time as pytime
 
 from oslo_service import loopingcall as oslo_looping_call
-from oslo_service import periodic_task as oslo_periodic_task
 
+from gbpservice.nfp.core import log as nfp_logging
+
+LOG = nfp_logging.getLogger(__name__)
 Scheduler = sched.scheduler
 
+# Max seconds the polling task sleeps, bounds the delay in
+# picking up an event added with an earlier deadline.
+MAX_POLL_INTERVAL = 1
+
 """Handles the queue of poll events.
 
     Derives from python scheduler, since base scheduler does
@@ -36,46 +42,63 @@ class NfpPollHandler(Scheduler):
         Scheduler.__init__(self, pytime.time, eventlet.greenthread.sleep)
 
     def run(self):
-        """Run to find timedout event. """
+        """Run to fire all the timedout events.
+
+            Pops every event whose deadline has passed in a
+            single pass and invokes its action. Events added
+            by the invoked actions are not fired in this pass,
+            even if they are already due.
+
+            Returns: Seconds till the next deadline, None if
+                there are no pending events.
+        """
         q = self._queue
-        timefunc = self.timefunc
         pop = heapq.heappop
-        if q:
-            time, priority, action, argument = checked_event = q[0]
-            now = timefunc()
-            if now < time:
-                return
-            else:
-                event = pop(q)
-                # Verify that the event was not removed or altered
-                # by another thread after we last looked at q[0].
-                if event is checked_event:
-                    action(*argument)
-                else:
-                    heapq.heappush(q, event)
+        now = self.timefunc()
+        expired = []
+        while q and q[0][0] <= now:
+            expired.append(pop(q))
+
+        for event in expired:
+            action, argument = event[2], event[3]
+            try:
+                action(*argument)
+            except Exception as e:
+                message = "Poll event action failed, Reason: %s" % (e)
+                LOG.exception(message)
+
+        return self.next_deadline()
+
+    def next_deadline(self):
+        """Seconds till the earliest pending event times out. """
+        q = self._queue
+        if not q:
+            return None
+        return max(q[0][0] - self.timefunc(), 0)
 
     def poll_add(self, event, timeout, method):
         """Enter the event to be polled. """
         self.enter(timeout, 1, method, (event,))
 
-"""Periodic task to poll for timer events.
+"""Task to poll for timer events.
 
-    Periodically checks for expiry of events.
+    Sleeps till the next event deadline (at most
+    MAX_POLL_INTERVAL) and fires all the expired events.
 """
 
 
-class PollingTask(oslo_periodic_task.PeriodicTasks):
+class PollingTask(object):
 
     def __init__(self, conf, controller):
-        super(PollingTask, self).__init__(conf)
-
+        self._conf = conf
         self._controller = controller
-        pulse = oslo_looping_call.FixedIntervalLoopingCall(
-            self.run_periodic_tasks, None, None)
+        pulse = oslo_looping_call.DynamicLoopingCall(self.poll)
         pulse.start(
-            interval=1, initial_delay=None)
+            initial_delay=None, periodic_interval_max=MAX_POLL_INTERVAL)
 
-    @oslo_periodic_task.periodic_task(spacing=1)
-    def poll(self, context):
+    def poll(self):
         # invoke the common class to handle event timeouts
-        self._controller.poll()
+        next_deadline = self._controller.poll()
+        if next_deadline is None:
+            return MAX_POLL_INTERVAL
+        return next_deadline
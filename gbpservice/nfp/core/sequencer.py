@@ -77,29 +77,35 @@ class EventSequencer(object):
         # Sequence of related events
         # {key: sequencer()}
         self._sequencer = {}
+        # Keys of the sequencers which can schedule an event,
+        # only these are visited on run.
+        self._ready = set()
 
     def sequence(self, key, event):
         try:
-            self._sequencer[key].sequence(event)
+            sequencer = self._sequencer[key]
         except KeyError:
-            self._sequencer[key] = self.Sequencer()
-            self._sequencer[key].sequence(event)
+            sequencer = self._sequencer[key] = self.Sequencer()
+        sequencer.sequence(event)
+        if not sequencer._scheduled:
+            self._ready.add(key)
         message = "Sequenced event - %s" % (event.identify())
-        LOG.error(message)
+        LOG.debug(message)
 
     def run(self):
         events = []
-        # Loop over copy and delete from original
-        sequencers = dict(self._sequencer)
-        for key, sequencer in sequencers.iteritems():
+        ready, self._ready = self._ready, set()
+        for key in ready:
             try:
-                event = sequencer.run()
+                event = self._sequencer[key].run()
                 if event:
                     message = "Desequence event - %s" % (
                         event.identify())
-                    LOG.error(message)
+                    LOG.debug(message)
                     event.sequence = False
                     events.append(event)
+            except KeyError:
+                pass
             except SequencerBusy as exc:
                 pass
             except SequencerEmpty as exc:
@@ -118,5 +124,7 @@ class EventSequencer(object):
                     event.identify())
                 LOG.debug(message)
                 self._sequencer[key].release()
+                # Next event in the sequencer can be scheduled now
+                self._ready.add(key)
         except KeyError:
             return
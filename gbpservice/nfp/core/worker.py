@@ -45,6 +45,17 @@ class NfpWorker(Service):
         self.controller = None
         self._conf = conf
         self._threads = threads
+        # Acks of the received events, not yet sent to distributor
+        self._acks = []
+        self._acks_time = 0
+        self._ack_batch_size = getattr(conf, 'event_ack_batch_size', 64)
+        self._ack_batch_timeout = getattr(
+            conf, 'event_ack_batch_timeout', 0.01)
+
+    @property
+    def threads(self):
+        """Num of threads handling the events. """
+        return self._threads
 
     def start(self):
         """Service start, runs here till dies.
@@ -60,15 +71,18 @@ class NfpWorker(Service):
         self.event_handlers = self.controller.get_event_handlers()
         while True:
             try:
-                event = None
-                if self.pipe.poll(0.1):
+                # Pull all the events available at once
+                timeout = self._ack_wait_time()
+                while self.pipe.poll(timeout):
+                    timeout = 0
                     event = self.controller.pipe_recv(self.pipe)
-                if event:
-                    message = "%s - received event" % (
-                        self._log_meta(event))
-                    LOG.debug(message)
-                    self.controller.decompress(event)
-                    self._process_event(event)
+                    if event:
+                        message = "%s - received event" % (
+                            self._log_meta(event))
+                        LOG.debug(message)
+                        self._process_event(event)
+                    self._flush_acks()
+                self._flush_acks()
             except Exception as e:
                 message = "Exception - %s" % (e)
                 LOG.error(message)
@@ -82,16 +96,38 @@ class NfpWorker(Service):
         else:
             return "(worker - %d)" % (os.getpid())
 
-    def _send_event_ack(self, event):
-        # Create new event from existing one
-        ack_event = nfp_event.Event(id=event.id)
-        ack_event.id = event.id
-        desc = nfp_event.EventDesc(**event.desc.__dict__)
-        desc.uuid = event.desc.uuid
-        desc.flag = nfp_event.EVENT_ACK
-        setattr(ack_event, 'desc', desc)
+    def _ack_wait_time(self):
+        """Time to wait for events before the pending acks are due. """
+        if not self._acks:
+            return 0.1
+        return max(
+            self._acks_time + self._ack_batch_timeout - time.time(), 0)
+
+    def _flush_acks(self, force=False):
+        """Send the pending acks to distributor in one event.
+
+            Sent once the batch is full or the oldest ack has
+            waited for event_ack_batch_timeout.
+        """
+        if not self._acks:
+            return
+        if not force and len(self._acks) < self._ack_batch_size and (
+                time.time() - self._acks_time < self._ack_batch_timeout):
+            return
+        acks, self._acks = self._acks, []
+        ack_event = nfp_event.Event(id=nfp_event.EVENT_ACKS, data=acks)
+        ack_event.desc.type = nfp_event.SCHEDULE_EVENT
+        ack_event.desc.flag = nfp_event.EVENT_ACKS
+        ack_event.desc.worker = os.getpid()
         self.controller.pipe_send(self.pipe, ack_event)
 
+    def _send_event_ack(self, event):
+        if not self._acks:
+            self._acks_time = time.time()
+        self._acks.append(event.desc.uuid)
+        if len(self._acks) >= self._ack_batch_size:
+            self._flush_acks(force=True)
+
     def _process_event(self, event):
         """Process & dispatch the event.
 
@@ -102,6 +138,9 @@ class NfpWorker(Service):
         """
         if event.desc.type == nfp_event.SCHEDULE_EVENT:
             self._send_event_ack(event)
+            # Nothing more to batch with, ack right away
+            if not self.pipe.poll():
+                self._flush_acks(force=True)
             eh, _ = (
                 self.event_handlers.get_event_handler(
                     event.id, module=event.desc.target))
@@ -10,20 +10,46 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import exceptions
 import httplib
-import httplib2
+import select
 import zlib
 
 import six.moves.urllib.parse as urlparse
 import socket
 
+from oslo_config import cfg as oslo_config
 from oslo_serialization import jsonutils
 
 from gbpservice.nfp.core import log as nfp_logging
 
 LOG = nfp_logging.getLogger(__name__)
 
+UNIX_REST_SOCKET_PATH = '/var/run/uds_socket'
+UNIX_REST_POOL_MAXSIZE = 10
+# Compress all the request bodies, see unix_compress_threshold
+UNIX_REST_COMPRESS_THRESHOLD = 0
+
+unix_rest_opts = [
+    oslo_config.StrOpt('unix_socket_path',
+                       default=UNIX_REST_SOCKET_PATH,
+                       help='Unix socket of the rest server'),
+    oslo_config.IntOpt('unix_pool_maxsize',
+                       default=UNIX_REST_POOL_MAXSIZE,
+                       help='Maximum number of connections kept alive to '
+                            'the rest server over the unix socket'),
+    oslo_config.IntOpt('unix_compress_threshold',
+                       default=UNIX_REST_COMPRESS_THRESHOLD,
+                       help='Request bodies larger than this many bytes '
+                            'are compressed, smaller ones are sent as '
+                            'plain json. Set it only once all the '
+                            'configurators accept plain json bodies, by '
+                            'default all the bodies are compressed'),
+]
+
+oslo_config.CONF.register_opts(unix_rest_opts, "REST")
+
 
 class RestClientException(exceptions.Exception):
 
@@ -35,10 +61,10 @@ class UnixHTTPConnection(httplib.HTTPConnection):
     """Connection class for HTTP over UNIX domain socket."""
 
     def __init__(self, host, port=None, strict=None, timeout=None,
-                 proxy_info=None):
+                 proxy_info=None, socket_path=UNIX_REST_SOCKET_PATH):
         httplib.HTTPConnection.__init__(self, host, port, strict)
         self.timeout = timeout
-        self.socket_path = '/var/run/uds_socket'
+        self.socket_path = socket_path
 
     def connect(self):
         """Method used to connect socket server."""
@@ -52,22 +78,106 @@ class UnixHTTPConnection(httplib.HTTPConnection):
                 "Caught exception socket.error : %s" % exc)
 
 
-class UnixRestClient(object):
+class UnixHTTPConnectionPool(object):
 
-    def _http_request(self, url, method_type, headers=None, body=None):
+    """Keeps the connections to a unix socket rest server alive.
+
+        Idle connections are reused for the next requests, upto
+        maxsize of them are kept.
+    """
+
+    def __init__(self, socket_path, maxsize):
+        self.socket_path = socket_path
+        self.maxsize = maxsize
+        self._idle = collections.deque()
+
+    def _new_conn(self, host):
+        return UnixHTTPConnection(host, socket_path=self.socket_path)
+
+    def _is_dropped(self, conn):
+        # A kept alive connection is readable while idle only when
+        # the server has closed it.
         try:
-            h = httplib2.Http()
-            resp, content = h.request(
-                url,
-                method=method_type,
-                headers=headers,
-                body=body,
-                connection_type=UnixHTTPConnection)
-            return resp, content
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (select.error, socket.error, ValueError, TypeError):
+            return True
+        return bool(readable)
 
-        except httplib2.ServerNotFoundError:
-            raise RestClientException("Server Not Found")
+    def _get_conn(self, host):
+        while self._idle:
+            conn = self._idle.pop()
+            if not self._is_dropped(conn):
+                return conn, True
+            conn.close()
+        return self._new_conn(host), False
 
+    def _put_conn(self, conn):
+        if len(self._idle) < self.maxsize:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    def _send(self, conn, path, method_type, headers, body):
+        try:
+            conn.request(method_type, path, body, headers)
+        except Exception:
+            conn.close()
+            raise
+
+    def request(self, host, path, method_type, headers=None, body=None):
+        headers = headers or {}
+        conn, reused = self._get_conn(host)
+        try:
+            self._send(conn, path, method_type, headers, body)
+        except socket.timeout:
+            raise
+        except (httplib.HTTPException, socket.error):
+            if not reused:
+                raise
+            # Kept alive connection was closed by the server before the
+            # request could be written, retry once on a new connection.
+            conn = self._new_conn(host)
+            self._send(conn, path, method_type, headers, body)
+        # Request is written, it is not resent on failures from here
+        # as the server could have processed it already.
+        try:
+            resp = conn.getresponse()
+            content = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._put_conn(conn)
+        return resp, content
+
+
+class UnixRestClient(object):
+
+    # Connection pools shared by all the clients, one per unix socket.
+    _pools = {}
+
+    def __init__(self, conf=None):
+        conf = conf or oslo_config.CONF
+        self.socket_path = conf.REST.unix_socket_path
+        self.compress_threshold = conf.REST.unix_compress_threshold
+        self.pool = self._get_pool(conf.REST.unix_pool_maxsize)
+
+    def _get_pool(self, maxsize):
+        pool = self._pools.get(self.socket_path)
+        if not pool:
+            pool = UnixHTTPConnectionPool(self.socket_path, maxsize)
+            self._pools[self.socket_path] = pool
+        return pool
+
+    def _http_request(self, url, method_type, headers=None, body=None):
+        url = urlparse.urlsplit(url)
+        try:
+            return self.pool.request(url.netloc, url.path, method_type,
+                                     headers=headers, body=body)
+        except RestClientException:
+            raise
         except exceptions.Exception as e:
             raise RestClientException("httplib response error %s" % (e))
 
@@ -80,7 +190,12 @@ class UnixRestClient(object):
         # prepares path, body, url for sending unix request.
         if method_type.upper() != 'GET':
             body = jsonutils.dumps(body)
-            body = zlib.compress(body)
+            # Not worth compressing small bodies, sent as plain json
+            if len(body) > self.compress_threshold:
+                body = zlib.compress(body)
+            else:
+                headers = dict(headers or {})
+                headers['content-type'] = 'application/json'
 
         path = '/v1/nfp/' + path
         url = urlparse.urlunsplit((
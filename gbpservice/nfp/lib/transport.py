@@ -26,15 +26,33 @@ import oslo_messaging as messaging
 from oslo_serialization import jsonutils
 
 import requests
+from requests import adapters
+from requests.packages.urllib3.util import retry as urllib3_retry
 
 LOG = nfp_logging.getLogger(__name__)
 Version = 'v1'  # v1/v2/v3#
+REST_POOL_MAXSIZE = 10
+REST_MAX_RETRIES = 3
+REST_RETRY_BACKOFF_FACTOR = 0.5
 
 rest_opts = [
     cfg.StrOpt('rest_server_address',
                default='', help='Rest connection IpAddr'),
     cfg.IntOpt('rest_server_port',
                default=8080, help='Rest connection Port'),
+    cfg.IntOpt('pool_maxsize',
+               default=REST_POOL_MAXSIZE,
+               help='Maximum number of connections kept alive to the '
+                    'rest server'),
+    cfg.IntOpt('max_retries',
+               default=REST_MAX_RETRIES,
+               help='Number of retries of a request failed due to a '
+                    'connection error, or of an idempotent request '
+                    'failed due to a connection reset'),
+    cfg.FloatOpt('retry_backoff_factor',
+                 default=REST_RETRY_BACKOFF_FACTOR,
+                 help='Backoff factor in seconds between retries, doubled '
+                      'on every retry'),
 ]
 
 rpc_opts = [
@@ -61,10 +79,39 @@ class RestClientException(exceptions.Exception):
 
 class RestApi(object):
 
-    def __init__(self, rest_server_address, rest_server_port):
+    # Sessions shared by all the RestApi objects, one per rest server,
+    # so that the connections are kept alive across requests.
+    _sessions = {}
+
+    def __init__(self, rest_server_address, rest_server_port,
+                 pool_maxsize=None, max_retries=None,
+                 retry_backoff_factor=None):
         self.rest_server_address = rest_server_address
         self.rest_server_port = rest_server_port
         self.url = "http://%s:%s/v1/nfp/%s"
+        if max_retries is None:
+            max_retries = REST_MAX_RETRIES
+        if retry_backoff_factor is None:
+            retry_backoff_factor = REST_RETRY_BACKOFF_FACTOR
+        self.session = self._get_session(
+            pool_maxsize or REST_POOL_MAXSIZE, max_retries,
+            retry_backoff_factor)
+
+    def _get_session(self, pool_maxsize, max_retries, retry_backoff_factor):
+        key = (self.rest_server_address, self.rest_server_port)
+        session = self._sessions.get(key)
+        if not session:
+            # Requests are retried on connection errors. Only idempotent
+            # requests are retried on read errors and resets, a POST may
+            # already have been processed by the rest server.
+            retries = urllib3_retry.Retry(
+                total=max_retries, backoff_factor=retry_backoff_factor)
+            session = requests.Session()
+            session.mount('http://', adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_maxsize,
+                max_retries=retries))
+            self._sessions[key] = session
+        return session
 
     def _response(self, resp, url):
         success_code = [200, 201, 202, 204]
@@ -117,8 +164,8 @@ class RestApi(object):
             # to send data to the rest-server.
             headers = {"content-type": "application/json",
                        "method-type": method_type}
-            resp = requests.post(url, data,
-                                 headers=headers)
+            resp = self.session.post(url, data,
+                                     headers=headers)
             message = "POST url %s %d" % (url, resp.status_code)
             LOG.info(message)
             return self._response(resp, url)
@@ -137,8 +184,8 @@ class RestApi(object):
         data = jsonutils.dumps(body)
         try:
             headers = {"content-type": "application/json"}
-            resp = requests.put(url, data,
-                                headers=headers)
+            resp = self.session.put(url, data,
+                                    headers=headers)
             message = "PUT url %s %d" % (url, resp.status_code)
             LOG.info(message)
             return self._response(resp, url)
@@ -156,8 +203,8 @@ class RestApi(object):
             self.rest_server_port, path)
         try:
             headers = {"content-type": "application/json"}
-            resp = requests.get(url,
-                                headers=headers)
+            resp = self.session.get(url,
+                                    headers=headers)
             message = "GET url %s %d" % (url, resp.status_code)
             LOG.info(message)
             return self._response(resp, url)
@@ -172,6 +219,10 @@ class RestApi(object):
 class RPCClient(object):
     API_VERSION = '1.0'
 
+    # Clients shared by all the requests, one per topic & rpc transport,
+    # so that the client is not built again for every request.
+    _clients = {}
+
     def __init__(self, topic):
         self.topic = topic
         target = messaging.Target(topic=self.topic,
@@ -180,6 +231,22 @@ class RPCClient(object):
         self.cctxt = self.client.prepare(version=self.API_VERSION,
                                          topic=self.topic)
 
+    @classmethod
+    def get(cls, topic):
+        key = (topic, n_rpc.TRANSPORT)
+        client = cls._clients.get(key)
+        if not client:
+            client = cls._clients[key] = cls(topic)
+        return client
+
+
+def _get_rest_api(conf):
+    return RestApi(conf.REST.rest_server_address,
+                   conf.REST.rest_server_port,
+                   pool_maxsize=conf.REST.pool_maxsize,
+                   max_retries=conf.REST.max_retries,
+                   retry_backoff_factor=conf.REST.retry_backoff_factor)
+
 
 def send_request_to_configurator(conf, context, body,
                                  method_type, device_config=False,
@@ -198,16 +265,16 @@ def send_request_to_configurator(conf, context, body,
     else:
         if (body['config'][0]['resource'] in
                 nfp_constants.CONFIG_TAG_RESOURCE_MAP.values()):
+            context_dict = context.to_dict()
             body['config'][0]['resource_data'].update(
-                {'neutron_context': context.to_dict()})
+                {'neutron_context': context_dict})
             body['info']['context'].update(
-                {'neutron_context': context.to_dict()})
+                {'neutron_context': context_dict})
         method_name = method_type.lower() + '_network_function_config'
 
     if conf.backend == TCP_REST:
         try:
-            rc = RestApi(conf.REST.rest_server_address,
-                         conf.REST.rest_server_port)
+            rc = _get_rest_api(conf)
             if method_type.lower() in [nfp_constants.CREATE,
                                        nfp_constants.DELETE]:
                 resp = rc.post(method_name, body, method_type.upper())
@@ -254,7 +321,7 @@ def send_request_to_configurator(conf, context, body,
         message = ("%s -> RPC request sent ! with body : %s " % (
             (method_name, body)))
         LOG.info(message)
-        rpcClient = RPCClient(conf.RPC.topic)
+        rpcClient = RPCClient.get(conf.RPC.topic)
         rpcClient.cctxt.cast(context, method_name,
                              body=body)
 
@@ -275,8 +342,7 @@ def get_response_from_configurator(conf):
     # method (tcp_rest/ unix_rest/ rpc) for get response from configurator.
     if conf.backend == TCP_REST:
         try:
-            rc = RestApi(conf.REST.rest_server_address,
-                         conf.REST.rest_server_port)
+            rc = _get_rest_api(conf)
             resp = rc.get('get_notifications')
             rpc_cbs_data = jsonutils.loads(resp.content)
             return rpc_cbs_data
@@ -320,7 +386,7 @@ def get_response_from_configurator(conf):
     else:
         rpc_cbs_data = []
         try:
-            rpcClient = RPCClient(conf.RPC.topic)
+            rpcClient = RPCClient.get(conf.RPC.topic)
             context = n_context.Context(
                 'config_agent_user', 'config_agent_tenant')
             rpc_cbs_data = rpcClient.cctxt.call(context,
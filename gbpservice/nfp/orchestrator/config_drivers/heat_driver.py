@@ -102,16 +102,21 @@ class HeatDriver(object):
             self.v2client, "admin", keystone_version)
         self.heat_role = self._get_role_by_name(
             self.v2client, "heat_stack_owner", keystone_version)
+        self.resource_owner_tenant_id = None
 
     def _resource_owner_tenant_id(self):
+        # Tokens are cached by the keystone client, the tenant id
+        # of the resource owner is looked up only once.
+        if self.resource_owner_tenant_id:
+            return self.resource_owner_tenant_id
         auth_token = self.keystoneclient.get_scoped_keystone_token(
             self.keystone_conf.admin_user,
             self.keystone_conf.admin_password,
             self.keystone_conf.admin_tenant_name)
         try:
-            tenant_id = self.keystoneclient.get_tenant_id(
+            self.resource_owner_tenant_id = self.keystoneclient.get_tenant_id(
                 auth_token, self.keystone_conf.admin_tenant_name)
-            return tenant_id
+            return self.resource_owner_tenant_id
         except k_exceptions.NotFound:
             with excutils.save_and_reraise_exception(reraise=True):
                 LOG.error(_LE('No tenant with name %s exists.'),
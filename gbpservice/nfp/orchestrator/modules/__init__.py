@@ -37,6 +37,10 @@ openstack_opts = [
                        default='v2.0', help='Auth protocol used.'),
     oslo_config.StrOpt('auth_uri',
                        default='', help='Auth URI.'),
+    oslo_config.IntOpt('token_refresh_margin',
+                       default=300,
+                       help='Seconds before expiry at which a cached '
+                            'token is refreshed.'),
 ]
 
 oslo_config.CONF.register_opts(openstack_opts, "nfp_keystone_authtoken")
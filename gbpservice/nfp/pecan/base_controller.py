@@ -26,8 +26,10 @@ class ZipperHook(PecanHook):
     def before(self, state):
         if state.request.method.upper() != 'GET':
             try:
-                zippedBody = state.request.body
-                body = zlib.decompress(zippedBody)
+                body = state.request.body
+                # Small bodies are sent as plain json, uncompressed
+                if state.request.content_type != 'application/json':
+                    body = zlib.decompress(body)
                 body = jsonutils.loads(body)
                 state.request.json_body = body
                 state.request.content_type = "application/json"
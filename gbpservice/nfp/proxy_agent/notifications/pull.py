@@ -48,7 +48,7 @@ class PullNotification(nfp_api.NfpEventHandler):
             requester = notification['info']['context']['requester']
             topic = ResourceMap[requester]
             context = notification['info']['context']['neutron_context']
-            rpcClient = transport.RPCClient(topic)
+            rpcClient = transport.RPCClient.get(topic)
             rpc_ctx = n_context.Context.from_dict(context)
             rpcClient.cctxt.cast(rpc_ctx,
                                  'network_function_notification',
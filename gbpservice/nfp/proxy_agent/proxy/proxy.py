@@ -13,10 +13,12 @@
 import eventlet
 eventlet.monkey_patch()
 
+import errno
 from gbpservice.nfp.core import log as nfp_logging
 import os
 from oslo_config import cfg as oslo_config
 from oslo_log import log as oslo_logging
+import select
 import socket
 import sys
 import time
@@ -26,9 +28,6 @@ oslo_logging.register_options(oslo_config.CONF)
 
 LOG = nfp_logging.getLogger(__name__)
 
-# Queue of proxy connections which workers will handle
-ConnQ = eventlet.queue.Queue(maxsize=0)
-
 tcp_open_connection_count = 0
 tcp_close_connection_count = 0
 
@@ -55,6 +54,7 @@ class Configuration(object):
         self.connect_max_wait_timeout = conf.proxy.connect_max_wait_timeout
         self.idle_max_wait_timeout = conf.proxy.idle_max_wait_timeout
         self.idle_min_wait_timeout = conf.proxy.idle_min_wait_timeout
+        self.buffer_size = conf.proxy.buffer_size
         self.rest_server_address = conf.proxy.nfp_controller_ip
         self.rest_server_port = conf.proxy.nfp_controller_port
 
@@ -130,66 +130,76 @@ class Connection(object):
 
     def __init__(self, conf, socket, type='unix'):
         self._socket = socket
-        self._idle_wait = conf.idle_min_wait_timeout
+        self._socket.setblocking(0)
+        self._buffer_size = conf.buffer_size
         self._idle_timeout = conf.idle_max_wait_timeout
-        self._idle_count_max = (self._idle_timeout / self._idle_wait)
-        self._idle_count = 0
         self._start_time = time.time()
         self._end_time = time.time()
         self.type = type
         self.socket_id = self._socket.fileno()
+        # Set once the peer has closed its side of the connection
+        self.eof = False
 
-    def _tick(self):
-        self._idle_count += 1
+    def fileno(self):
+        return self.socket_id
 
-    def _timedout(self):
-        if self._idle_count > self._idle_count_max:
-            self._end_time = time.time()
+    def _timedout(self, now):
+        if now - self._start_time > self._idle_timeout:
+            self._end_time = now
             raise ConnectionIdleTimeOut(
                 "Connection (%d) - stime (%s) - etime (%s) - "
-                "idle_count (%d) idle_count_max(%d)" % (
+                "idle_timeout (%s)" % (
                     self.identify(), self._start_time,
-                    self._end_time, self._idle_count, self._idle_count_max))
+                    self._end_time, self._idle_timeout))
 
-    def idle(self):
-        self._tick()
-        self._timedout()
+    def idle(self, now=None):
+        self._timedout(now or time.time())
 
     def idle_reset(self):
-        self._idle_count = 0
         self._start_time = time.time()
 
-    def _wait(self, timeout):
-        if self.type == 'unix':
-            eventlet.sleep(timeout)
-            self._socket.setblocking(0)
-        else:
-            self._socket.settimeout(timeout)
-
     def recv(self):
-        self._wait(self._idle_wait)
+        """Read whatever is available on the socket.
+
+            To be called once the socket is readable, returns None
+            if there is nothing to read after all and an empty
+            string once the peer has closed the connection.
+        """
         try:
-            data = self._socket.recv(1024)
-            if data and len(data):
-                self.idle_reset()
-                return data
-            self.idle()
-        except socket.timeout:
-            self.idle()
-        except socket.error:
-            self.idle()
-        return None
+            data = self._socket.recv(self._buffer_size)
+        except socket.error as exc:
+            if exc.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return None
+            raise
+        if data:
+            self.idle_reset()
+        else:
+            self.eof = True
+        return data
 
     def send(self, data):
         self._socket.setblocking(1)
         self._socket.sendall(data)
         self._socket.setblocking(0)
 
+    def shutdown(self):
+        """Propagate the end of the stream to the peer. """
+        try:
+            self._socket.shutdown(socket.SHUT_WR)
+        except socket.error as exc:
+            message = "%s - exception while shutting down - %s" % (
+                self.identify(), str(exc))
+            LOG.debug(message)
+
     def close(self):
         message = "Closing Socket - %d" % (self.identify())
         LOG.debug(message)
         try:
-            self._socket.shutdown(socket.SHUT_RDWR)
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                # Already shut down by the peer
+                pass
             self._socket.close()
         except Exception as exc:
             message = "%s - exception while closing - %s" % (
@@ -212,10 +222,19 @@ class ProxyConnection(object):
     def __init__(self, conf, unix_socket, tcp_socket):
         self._unix_conn = Connection(conf, unix_socket, type='unix')
         self._tcp_conn = Connection(conf, tcp_socket, type='tcp')
+        self._peers = {self._unix_conn: self._tcp_conn,
+                       self._tcp_conn: self._unix_conn}
         message = "New Proxy - Unix - %d, TCP - %d" % (
             self._unix_conn.identify(), self._tcp_conn.identify())
         LOG.debug(message)
 
+    def connections(self, readable=True):
+        """Connections of the pair, only the ones still to be read from
+            unless readable is False.
+        """
+        return [conn for conn in self._peers
+                if not (readable and conn.eof)]
+
     def close(self):
         self._unix_conn.close()
         self._tcp_conn.close()
@@ -224,17 +243,42 @@ class ProxyConnection(object):
         data = rxconn.recv()
         if data:
             txconn.send(data)
+            # Traffic in either direction keeps the pair alive
+            txconn.idle_reset()
+        elif rxconn.eof:
+            txconn.shutdown()
 
-    def run(self):
+    def splice(self, rxconn):
+        """Forward the data available on rxconn to its peer.
+
+            Returns False once the proxy connection is closed,
+            either on error or when both peers are done sending.
+        """
         try:
-            self._proxy(self._unix_conn, self._tcp_conn)
-            self._proxy(self._tcp_conn, self._unix_conn)
+            self._proxy(rxconn, self._peers[rxconn])
+            if not self.connections():
+                self.close()
+                return False
             return True
         except Exception as exc:
             message = "%s" % (exc)
             LOG.debug(message)
-            self._unix_conn.close()
-            self._tcp_conn.close()
+            self.close()
+            return False
+
+    def idle(self, now):
+        """Close the proxy connection if it has been idle for too long.
+
+            Returns False once the proxy connection is closed.
+        """
+        try:
+            self._unix_conn.idle(now)
+            self._tcp_conn.idle(now)
+            return True
+        except ConnectionIdleTimeOut as exc:
+            message = "%s" % (exc)
+            LOG.debug(message)
+            self.close()
             return False
 
     def identify(self):
@@ -243,6 +287,30 @@ class ProxyConnection(object):
             self._tcp_conn.identify())
 
 
+"""
+Waits for sockets to be readable.
+Only select is used: eventlet monkey patching replaces select.select
+with a green version but leaves select.poll in place, which would
+block the hub and every other green thread while waiting.
+"""
+
+
+class Poller(object):
+
+    def __init__(self):
+        self._fds = set()
+
+    def register(self, fd):
+        self._fds.add(fd)
+
+    def unregister(self, fd):
+        self._fds.discard(fd)
+
+    def poll(self, timeout):
+        readable, _, _ = select.select(list(self._fds), [], [], timeout)
+        return readable
+
+
 """
 ADT for proxy Worker
 """
@@ -250,24 +318,76 @@ ADT for proxy Worker
 
 class Worker(object):
 
+    def __init__(self, conf):
+        self._idle_wait = conf.idle_min_wait_timeout
+        self._poller = Poller()
+        # Readable fd -> (connection, proxy connection it belongs to)
+        self._connections = {}
+        self._proxy_connections = set()
+        self._new_connections = []
+        # Pipe to wake up the worker when a connection is handed over
+        self._wakeup_rx, self._wakeup_tx = os.pipe()
+        self._poller.register(self._wakeup_rx)
+
+    def load(self):
+        return len(self._proxy_connections) + len(self._new_connections)
+
+    def add(self, pc):
+        self._new_connections.append(pc)
+        os.write(self._wakeup_tx, b'x')
+
+    def _accept_connections(self):
+        new_connections, self._new_connections = self._new_connections, []
+        for pc in new_connections:
+            self._proxy_connections.add(pc)
+            for conn in pc.connections():
+                self._connections[conn.fileno()] = (conn, pc)
+                self._poller.register(conn.fileno())
+
+    def _unregister(self, conn):
+        self._connections.pop(conn.fileno(), None)
+        self._poller.unregister(conn.fileno())
+
+    def _remove(self, pc):
+        self._proxy_connections.discard(pc)
+        for conn in pc.connections(readable=False):
+            self._unregister(conn)
+
+    def _splice(self, fd):
+        if fd not in self._connections:
+            return
+        conn, pc = self._connections[fd]
+        if not pc.splice(conn):
+            self._remove(pc)
+        elif conn.eof:
+            self._unregister(conn)
+
+    def _sweep_idle(self):
+        now = time.time()
+        for pc in list(self._proxy_connections):
+            if not pc.idle(now):
+                self._remove(pc)
+
     def run(self):
         """
-        Worker thread will pop the Proxy Connection Object
-        from Connection Queue and Perform send and receive
-        operations. If the connection is ideal upto ideal_max_timeout
-        it will not push the Object into connection queue so Proxy Connection
-        Object is automatically destroy, otherwise it will again
-        push the Object in connection Queue
+        Worker thread waits for any of the sockets of the Proxy
+        Connection Objects handed over to it to be readable, and
+        forwards what is available to the other end. Proxy Connection
+        Objects idle for more than idle_max_wait_timeout are closed
+        and dropped, the others stay with the worker until both ends
+        are done.
         """
+        last_sweep = time.time()
         while True:
-            try:
-                pc = ConnQ.get()
-                call = True
-                while call:
-                    call = pc.run()
-            except eventlet.queue.Empty:
-                pass
-            eventlet.sleep(0)
+            self._accept_connections()
+            for fd in self._poller.poll(self._idle_wait):
+                if fd == self._wakeup_rx:
+                    os.read(self._wakeup_rx, 4096)
+                else:
+                    self._splice(fd)
+            if time.time() - last_sweep >= self._idle_wait:
+                self._sweep_idle()
+                last_sweep = time.time()
 
 
 """
@@ -286,12 +406,15 @@ class Proxy(object):
         # Be a server and wait for connections from the client
         self.server = UnixServer(conf, self)
         self.client = TcpClient(conf, self)
+        self.workers = []
 
     def start(self):
         """Run each worker in new thread"""
 
         for i in range(self.conf.worker_threads):
-            eventlet.spawn_n(Worker().run)
+            worker = Worker(self.conf)
+            self.workers.append(worker)
+            eventlet.spawn_n(worker.run)
         while True:
             self.server.listen()
 
@@ -306,7 +429,8 @@ class Proxy(object):
             tcpsocket.close()
         else:
             pc = ProxyConnection(self.conf, unixsocket, tcpsocket)
-            ConnQ.put(pc)
+            # Hand over to the least loaded worker
+            min(self.workers, key=lambda worker: worker.load()).add(pc)
 
 PROXY_OPTS = [
     oslo_config.IntOpt(
@@ -332,7 +456,12 @@ PROXY_OPTS = [
     oslo_config.FloatOpt(
         'idle_min_wait_timeout',
         default=10,
-        help='Minimum time to wait on idle channel.'
+        help='Interval at which channels are checked for being idle.'
+    ),
+    oslo_config.IntOpt(
+        'buffer_size',
+        default=65536,
+        help='Max num of bytes read from a channel at once.'
     ),
     oslo_config.StrOpt(
         'unix_bind_path',